@@ -107,6 +107,11 @@ export default function RiderPicker({ value, onChange, disabled, season }) {
                 <div className="flex-1 min-w-0">
                   <div className="font-medium text-slate-900 truncate">{r.rider_name}</div>
                   <div className="text-xs text-slate-500 truncate">{r.team_name}</div>
+                  {r.ownerCount > 0 && (
+                    <div className="text-xs text-slate-400 truncate">
+                      Choisi par {r.ownerCount} équipe{r.ownerCount > 1 ? "s" : ""} ({r.ownerPct}%)
+                    </div>
+                  )}
                 </div>
 
                 <div className="text-right">
@@ -7,6 +7,7 @@ export { getAuthToken, setAuthToken, parseJwt };
 
 // --- CONFIG ---
 const OFFLINE_MODE = process.env.REACT_APP_OFFLINE === "true";
+export const SEASON = Number(process.env.REACT_APP_SEASON || 2026);
 export const LOCK_DATE = "2026-02-27T00:00:00+01:00";
 export const REVEAL_DATE = "2026-02-27T00:00:00+01:00";
 
@@ -100,17 +101,42 @@ export async function updateMe(payload) {
 }
 
 
+// Read models: snapshots published by the ingestion worker after each sync.
+// Returns the payload, or null when no snapshot exists (callers fall back to live queries).
+// Team writes drop the team's snapshot and the leaderboard (trigger in supabase/schema.sql),
+// so an edited team reads live until the next sync.
+async function getReadModel(modelKey, season = null) {
+  let query = getSupabase()
+    .from("read_models")
+    .select("payload, version")
+    .eq("model_key", modelKey);
+  if (season !== null) query = query.eq("season_year", season);
+
+  const { data, error } = await query.maybeSingle();
+  if (error || !data) {
+    if (error) debugLog("getReadModel error", modelKey, error);
+    return null;
+  }
+  return data.payload;
+}
+
+
 // 3. Races: Public Read
-export async function getLatestRace() {
+export async function getLatestRace(season = SEASON) {
   if (OFFLINE_MODE) return MockApi.mockLatestRace();
 
+  const snapshot = await getReadModel("latest_race", season);
+  if (snapshot) return snapshot;
+
   const today = new Date().toISOString().slice(0, 10);
+  const seasonEnd = `${season}-12-31`;
 
   // Latest race
   const { data: race, error: raceErr } = await getSupabase()
     .from("races")
     .select("id, name, race_date")
-    .lte("race_date", today)
+    .gte("race_date", `${season}-01-01`)
+    .lte("race_date", today < seasonEnd ? today : seasonEnd)
     .order("race_date", { ascending: false })
     .limit(1)
     .maybeSingle();
@@ -163,7 +189,7 @@ export async function getNextRace() {
 
 
 // 4. Teams & Leaderboard
-export async function getMyTeam(season = 2026) {
+export async function getMyTeam(season = SEASON) {
   if (OFFLINE_MODE) return MockApi.mockMyTeam(season);
 
   const token = getAuthToken();
@@ -227,7 +253,7 @@ function checkLockDate() {
   }
 }
 
-export async function createMyTeam(payload, season = 2026) {
+export async function createMyTeam(payload, season = SEASON) {
   if (OFFLINE_MODE) return; // Mocks don't persist
   checkLockDate();
 
@@ -286,7 +312,7 @@ export async function createMyTeam(payload, season = 2026) {
   return team;
 }
 
-export async function updateMyTeam(teamId, payload, season = 2026) {
+export async function updateMyTeam(teamId, payload, season = SEASON) {
   if (OFFLINE_MODE) return;
   checkLockDate();
 
@@ -346,9 +372,12 @@ export async function updateMyTeam(teamId, payload, season = 2026) {
   return { id: teamId, total_cost: totalCost };
 }
 
-export async function getCurrentLeaderboard(season = 2026) {
+export async function getCurrentLeaderboard(season = SEASON) {
   if (OFFLINE_MODE) return MockApi.mockLeaderboard();
 
+  const snapshot = await getReadModel("leaderboard", season);
+  if (snapshot) return snapshot;
+
   const { data, error } = await getSupabase()
     .from("teams")
     .select("id, team_name, points, users(display_name)")
@@ -368,9 +397,12 @@ export async function getCurrentLeaderboard(season = 2026) {
   };
 }
 
-export async function getTeamById(teamId, season = 2026) {
+export async function getTeamById(teamId, season = SEASON) {
   if (OFFLINE_MODE) return null;
 
+  const snapshot = await getReadModel(`team:${teamId}`);
+  if (snapshot) return snapshot;
+
   const { data: team, error } = await getSupabase()
     .from("teams")
     .select("*, users(display_name)")
@@ -417,14 +449,15 @@ export async function getTeamById(teamId, season = 2026) {
   };
 }
 
-export async function autocompleteRiders(query, season = 2026) {
+export async function autocompleteRiders(query, season = SEASON) {
   if (OFFLINE_MODE) return [];
 
   const { data, error } = await getSupabase()
     .from("riders")
     .select(`
       *,
-      rider_prices(season_year, price)
+      rider_prices(season_year, price),
+      rider_ownership(season_year, owner_count, owner_pct)
     `)
     .ilike("rider_name", `%${query}%`)
     .limit(20); // increased limit
@@ -433,9 +466,12 @@ export async function autocompleteRiders(query, season = 2026) {
 
   const results = data.map(r => {
     const priceObj = r.rider_prices?.find(p => p.season_year === season);
+    const ownershipObj = r.rider_ownership?.find(o => o.season_year === season);
     return {
       ...r,
-      price: priceObj ? priceObj.price : 0
+      price: priceObj ? priceObj.price : 0,
+      ownerCount: ownershipObj ? ownershipObj.owner_count : 0,
+      ownerPct: ownershipObj ? Number(ownershipObj.owner_pct) : 0
     };
   });
 
@@ -444,7 +480,7 @@ export async function autocompleteRiders(query, season = 2026) {
   return results;
 }
 
-export async function getTopRiders(season = 2026) {
+export async function getTopRiders(season = SEASON) {
   if (OFFLINE_MODE) return [];
 
   // Fetch riders with their prices
@@ -452,16 +488,20 @@ export async function getTopRiders(season = 2026) {
     .from("riders")
     .select(`
       *,
-      rider_prices(season_year, price)
+      rider_prices(season_year, price),
+      rider_ownership(season_year, owner_count, owner_pct)
     `);
 
   if (error) return [];
 
   const results = data.map(r => {
     const priceObj = r.rider_prices?.find(p => p.season_year === season);
+    const ownershipObj = r.rider_ownership?.find(o => o.season_year === season);
     return {
       ...r,
-      price: priceObj ? priceObj.price : 0
+      price: priceObj ? priceObj.price : 0,
+      ownerCount: ownershipObj ? ownershipObj.owner_count : 0,
+      ownerPct: ownershipObj ? Number(ownershipObj.owner_pct) : 0
     };
   });
 
@@ -479,7 +519,7 @@ export async function getHistory() {
   return { podium: [], mostTitles: [] }; // placeholder
 }
 
-export async function getAllRaces(season = 2026) {
+export async function getAllRaces(season = SEASON) {
   if (OFFLINE_MODE) return [];
 
   const startYear = `${season}-01-01`;
@@ -496,7 +536,7 @@ export async function getAllRaces(season = 2026) {
   return races || [];
 }
 
-export async function getRaceLeaderboard(raceId, season = 2026) {
+export async function getRaceLeaderboard(raceId, season = SEASON) {
   if (OFFLINE_MODE) return [];
 
   // 1. Fetch race results
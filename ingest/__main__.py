@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sys
+
+# Single entrypoint for the ingestion jobs:
+#
+#   python -m ingest sync --season-year 2026 --sync-all
+#   python -m ingest yearly-refresh --season-year 2026 + sync --season-year 2026 --sync-all
+#
+# A job's module (and its heavy dependencies: supabase, httpx, selectolax, bs4, cloudscraper)
+# is imported only when that job runs, and Supabase secrets are only read when a job first
+# asks for the DB client. Jobs separated by `+` run in order in one process and one event
+# loop, sharing the PCS HTTP session (pcs_http.pcs_session) and the DB client (get_supabase);
+# each still writes its own run report. The chain stops at the first failing job.
+# A chain that writes holds the run lease (ingest/lease.py) from its first job to its last,
+# so overlapping runs (an overrunning cron) skip or wait instead of racing each other.
+
+CHAIN_SEP = "+"
+
+# command -> (module, run report job name, help)
+COMMANDS: dict[str, tuple[str, str, str]] = {
+    "sync": ("daily_sync", "daily_sync", "Sync race results, recompute points and read models."),
+    "yearly-refresh": ("yearly_refresh", "yearly_refresh", "Refresh riders and seed prices for a season."),
+    "backfill": ("backfill", "backfill", "Resumable multi-season history backfill."),
+    "import-teams": ("import_teams_cleaned_2025", "import_teams", "Import teams from the cleaned mapping CSV."),
+    "ownership": ("ownership", "ownership", "Rebuild the rider -> teams ownership index."),
+    "reparse": ("reparse", "reparse", "Reparse and rescore a season from the PCS page archive (no fetching)."),
+    "archive": ("page_archive", "page_archive", "Inspect the PCS page archive (stats, cat)."),
+    "history": ("points_history", "points_history", "Print rider or team standings on a past day."),
+    "invites": ("provision_invites", "provision_invites", "Create league invites (access codes + placeholder users) in bulk."),
+    "rider-images": ("fetch_rider_images", "fetch_rider_images", "Fill missing rider photos from PCS (--refresh: revalidate all)."),
+    "local-db": ("local_backend", "local_db", "Create or seed the offline SQLite backend."),
+}
+
+# Read-only / local commands that do not take the run lease.
+UNLEASED = {"history", "archive", "local-db"}
+
+
+def usage() -> str:
+    lines = [
+        "usage: python -m ingest <command> [args...] [+ <command> [args...]]...",
+        "",
+        "commands:",
+    ]
+    lines += [f"  {name:16s} {help_}" for name, (_, _, help_) in COMMANDS.items()]
+    lines += ["", "Run `python -m ingest <command> --help` for a command's options."]
+    return "\n".join(lines)
+
+
+def split_chain(argv: list[str]) -> list[tuple[str, list[str]]]:
+    """
+    ["a", "--x", "+", "b"] -> [("a", ["--x"]), ("b", [])]. Raises SystemExit on unknown commands.
+    """
+    chain: list[tuple[str, list[str]]] = []
+    cur: list[str] = []
+    for tok in argv + [CHAIN_SEP]:
+        if tok != CHAIN_SEP:
+            cur.append(tok)
+            continue
+        if not cur:
+            raise SystemExit(f"empty command in chain\n\n{usage()}")
+        if cur[0] not in COMMANDS:
+            raise SystemExit(f"unknown command: {cur[0]}\n\n{usage()}")
+        chain.append((cur[0], cur[1:]))
+        cur = []
+    return chain
+
+
+async def run_chain(chain: list[tuple[str, list[str]]]) -> None:
+    import importlib
+    import inspect
+
+    from contextlib import nullcontext
+
+    from .metrics import run_report
+
+    leased = [(name, args) for name, args in chain if name not in UNLEASED]
+    if leased:
+        from .lease import LEASE_NAME, job_lease, lease_spec
+
+        # A sharded or watching sync holds its own lease instead of the main one.
+        specs = [lease_spec(args) for _, args in leased]
+        lease_name = next((n for n, _ in specs if n != LEASE_NAME), LEASE_NAME)
+        conflicts = tuple(sorted({c for n, cs in specs if n == lease_name for c in cs}))
+        lease_cm = job_lease(CHAIN_SEP.join(name for name, _ in leased), name=lease_name, conflicts=conflicts)
+    else:
+        lease_cm = nullcontext()
+    try:
+        with lease_cm as lease:
+            for name, args in chain:
+                module, job, _ = COMMANDS[name]
+                main = importlib.import_module(f".{module}", __package__).main
+                with run_report(job):
+                    out = main(args)
+                    if inspect.isawaitable(out):
+                        await out
+                    if lease is not None:
+                        lease.check()
+    finally:
+        pcs_http = sys.modules.get(f"{__package__}.pcs_http")
+        if pcs_http is not None:
+            await pcs_http.close_session()
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    chain = split_chain(argv)
+
+    import asyncio
+
+    asyncio.run(run_chain(chain))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .daily_sync import RacePage, fetch_races_listing, race_stages, recompute_season, removed_rider_ids
+from .lease import job_lease
+from .metrics import run_report
+from .parse_pool import ParseExecutor
+from .pipeline import run_pipeline
+from .records import RaceListing
+from .season_rules import load_season_rules
+from .supabase_client import get_supabase
+from .sync_plan import plan_sync, race_pcs_slug
+from .utils import cache_dir
+
+# Multi-season historical backfill with checkpoint/resume.
+#
+#   python -m ingest.backfill --from-year 2021 --to-year 2025
+#
+# All race pages across the seasons go through one bounded pipeline (see daily_sync).
+# After each race's results are committed, a line is appended (and fsync'ed) to a JSONL
+# journal; a season line is appended once its points are recomputed. Rerunning the same
+# command skips everything already journaled, so an interrupted run resumes where it stopped.
+
+
+class BackfillJournal:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def entries(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        out = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                # Torn last line from a crash mid-write: ignore it, the race is redone.
+                continue
+        return out
+
+    def done_races(self) -> set[tuple[int, str]]:
+        return {(e["season_year"], e["race_key"]) for e in self.entries() if e.get("type") == "race"}
+
+    def recomputed_seasons(self) -> set[int]:
+        return {e["season_year"] for e in self.entries() if e.get("type") == "season"}
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        entry["at"] = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_race(self, page: RacePage) -> None:
+        self._append({"type": "race", "season_year": page.season_year, "race_key": page.race_key, "rows": len(page.rr_rows)})
+
+    def record_season(self, season_year: int) -> None:
+        self._append({"type": "season", "season_year": season_year})
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+async def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--from-year", type=int, required=True)
+    ap.add_argument("--to-year", type=int, required=True, help="Inclusive.")
+    ap.add_argument("--concurrency", type=int, default=4, help="Concurrent PCS fetches.")
+    ap.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        help="Checkpoint journal path (default: .cache/backfill/<from>-<to>.jsonl).",
+    )
+    ap.add_argument("--restart", action="store_true", help="Ignore and reset the journal.")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    def log(msg: str) -> None:
+        if args.verbose:
+            print(msg, flush=True)
+
+    if args.to_year < args.from_year:
+        raise SystemExit("--to-year must be >= --from-year")
+    seasons = list(range(args.from_year, args.to_year + 1))
+    journal = BackfillJournal(
+        Path(args.journal) if args.journal else cache_dir("backfill") / f"{args.from_year}-{args.to_year}.jsonl"
+    )
+    if args.restart:
+        journal.reset()
+    done = journal.done_races()
+    recomputed = journal.recomputed_seasons()
+
+    sb = get_supabase()
+    today = datetime.utcnow().date()
+    rules_by_season = {y: load_season_rules(y) for y in seasons}
+    listing_by_season: dict[int, dict[str, RaceListing]] = {}
+
+    # Plan every race page across seasons (future races are skipped, journaled ones resumed).
+    jobs: list[tuple[int, str, str]] = []
+    for year in seasons:
+        listing_by_season[year] = await fetch_races_listing(year, log)
+        plan = plan_sync(rules_by_season[year].races, today, listing_by_season[year], calendar=rules_by_season[year].race_dates)
+        todo = [p.race_key for p in plan if p.action != "skip_future" and (year, p.race_key) not in done]
+        print(f"[backfill] {year}: races={len(plan)} done={sum(1 for p in plan if (year, p.race_key) in done)} todo={len(todo)}")
+        jobs.extend((year, k, race_pcs_slug(k, year)) for k in todo)
+
+    with ParseExecutor.for_batch(len(jobs)) as parser:
+        stages = race_stages(
+            sb,
+            rules_by_season.__getitem__,
+            lambda year, race_key: listing_by_season.get(year, {}).get(race_key),
+            log,
+            args.concurrency,
+            parser,
+            on_written=journal.record_race,
+        )
+        written = await run_pipeline(jobs, stages)
+
+    # Recompute each season whose results changed in this run or that never finished recomputing.
+    changed = {p.season_year for p in written}
+    for year in seasons:
+        if year in changed or year not in recomputed:
+            # Past seasons are rebuilt in one go: no day-by-day history to record.
+            recompute_season(sb, year, log, removed_rider_ids([p for p in written if p.season_year == year]), history=False)
+            journal.record_season(year)
+    print(f"[backfill] races written={len(written)} failed={len(jobs) - len(written)} journal={journal.path}")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    with job_lease("backfill"), run_report("backfill"):
+        asyncio.run(main())
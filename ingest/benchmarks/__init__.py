@@ -0,0 +1,2 @@
+# Offline benchmarks for the ingestion worker (synthetic PCS pages, no network).
+# Run one with: python -m ingest.benchmarks.<name> --help
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from ..pcs_parse import parse_rankings_php_uci_one_day
+from .pages import ranking_page
+
+# Large ranking pages parsed from the response body as bytes (fetch_pcs_bytes) vs the
+# str path (fetch_pcs_html: decode to str, which selectolax re-encodes to UTF-8).
+# The decode step uses httpx's Response.text when httpx is installed.
+#   python -m ingest.benchmarks.bytes_parse --pages 50 --rows 1000
+
+
+def _to_text(body: bytes) -> str:
+    try:
+        import httpx
+    except ImportError:
+        return body.decode("utf-8")
+    return httpx.Response(200, content=body, headers={"content-type": "text/html"}).text
+
+
+def _run(bodies: list[bytes], as_text: bool) -> tuple[float, int, int]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n = 0
+    for body in bodies:
+        n += len(parse_rankings_php_uci_one_day(_to_text(body) if as_text else body))
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=50)
+    ap.add_argument("--rows", type=int, default=1000, help="Rows per page (PCS pages carry 100; more = larger pages).")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    # Non-ASCII names so decoding is not an ASCII fast path.
+    bodies = [ranking_page(i * args.rows, args.rows).replace("First", "Pogačar").encode("utf-8") for i in range(args.pages)]
+    print(f"pages={len(bodies)} size={sum(map(len, bodies)) / 1e6:.1f}MB")
+    for name, as_text in (("str (r.text)", True), ("bytes", False)):
+        best = min(_run(bodies, as_text) for _ in range(args.repeat))
+        seconds, peak, n = best
+        print(f"{name:14s} {seconds:6.3f}s  rows={n}  peak={peak / 1e6:6.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
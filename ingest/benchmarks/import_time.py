@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from ..__main__ import COMMANDS
+
+# Import cost of the `python -m ingest` dispatcher and of each job module, measured in a
+# fresh interpreter with `-X importtime`. Lists the heavy third-party packages each import
+# pulls in. With --max-ms, exits non-zero when the dispatcher import exceeds the budget
+# or pulls in a heavy package (usable as a CI check).
+#   python -m ingest.benchmarks.import_time --max-ms 50
+
+HEAVY = ("supabase", "httpx", "selectolax", "bs4", "cloudscraper", "dotenv")
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def measure(module: str) -> tuple[float | None, list[str], str]:
+    """
+    (cumulative import ms or None on failure, heavy packages loaded, error line).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    total_us = None
+    loaded: set[str] = set()
+    errors = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = [p.strip() for p in line[len("import time:") :].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        name = parts[2]
+        if name.split(".")[0] in HEAVY:
+            loaded.add(name.split(".")[0])
+        if name == module:
+            total_us = int(parts[1])
+    if proc.returncode != 0:
+        return None, sorted(loaded), (errors[-1] if errors else f"exit {proc.returncode}")
+    return (total_us / 1000 if total_us is not None else None), sorted(loaded), ""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-ms", type=float, default=None, help="Fail when the dispatcher import exceeds this.")
+    args = ap.parse_args()
+
+    targets = ["ingest.__main__"] + [f"ingest.{module}" for module, _, _ in COMMANDS.values()]
+    failed = False
+    for target in targets:
+        ms, heavy, err = measure(target)
+        shown = f"{ms:8.1f} ms" if ms is not None else "  failed  "
+        print(f"{target:38s} {shown}  heavy={','.join(heavy) or '-'}  {err}")
+        if target == "ingest.__main__" and args.max_ms is not None:
+            failed = ms is None or ms > args.max_ms or bool(heavy)
+    if failed:
+        raise SystemExit(f"dispatcher import over budget ({args.max_ms} ms) or loads heavy packages")
+
+
+if __name__ == "__main__":
+    main()
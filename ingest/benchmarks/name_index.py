@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from ..name_index import RiderNameIndex, fold
+
+# Throughput and accuracy of the fuzzy rider-name index on synthetic names mangled the way
+# team CSVs mangle them (surname-first caps, dropped accents, camel case, bare surnames,
+# initials, one-letter typos).
+#   python -m ingest.benchmarks.name_index --riders 5000 --names 20000
+
+_SYLLABLES = ["ba", "ver", "mo", "lan", "ti", "ko", "ra", "sen", "de", "lu", "pog", "ač", "ar", "vi", "ng", "gaard", "é", "ros", "ne", "ø"]
+_FIRST = ["Tadej", "Jonas", "Wout", "Mathieu", "Remco", "Primož", "Arnaud", "Tom", "Mads", "Julian", "Søren", "Egan", "Juan", "Marc", "Ben"]
+
+
+def _surname(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _slugify(text: str) -> str:
+    return "-".join(fold(text).lower().split())
+
+
+def _mangle(rng: random.Random, first: str, last: str) -> str:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"{last.upper()}{first}"
+    if kind == 1:
+        return f"{first}{last}"
+    if kind == 2:
+        return last
+    if kind == 3:
+        return f"{first[0]}.{last}"
+    i = rng.randrange(len(last))
+    return f"{first} {last[:i]}{rng.choice('aeiou')}{last[i + 1:]}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--riders", type=int, default=5000)
+    ap.add_argument("--names", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    riders = []
+    seen: set[str] = set()
+    while len(riders) < args.riders:
+        first, last = rng.choice(_FIRST), _surname(rng)
+        slug = f"rider/{_slugify(f'{first} {last}')}"
+        if slug in seen:
+            continue
+        seen.add(slug)
+        riders.append({"id": str(len(riders)), "pcs_slug": slug, "rider_name": f"{last.upper()} {first}", "first": first, "last": last})
+
+    t0 = time.perf_counter()
+    index = RiderNameIndex.from_rows(riders)
+    build = time.perf_counter() - t0
+
+    queries = [(r, _mangle(rng, r["first"], r["last"])) for r in (rng.choice(riders) for _ in range(args.names))]
+    t0 = time.perf_counter()
+    matches = [(r, index.resolve(raw)) for r, raw in queries]
+    seconds = time.perf_counter() - t0
+
+    right = sum(1 for r, m in matches if not m.ambiguous and m.pcs_slug == r["pcs_slug"])
+    wrong = sum(1 for r, m in matches if not m.ambiguous and m.pcs_slug != r["pcs_slug"])
+    ambiguous = sum(1 for _, m in matches if m.ambiguous)
+    print(f"riders={len(index)} build={build:.2f}s")
+    print(
+        f"names={len(matches)} {len(matches) / seconds:,.0f} names/s "
+        f"mapped={right} wrong={wrong} ambiguous={ambiguous}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# End-to-end ingestion timing with no network and no Supabase project:
+# SQLite stand-in (local_backend) + synthetic PCS pages (pages.synthetic_source).
+# Runs yearly_refresh -> team import -> daily_sync --sync-all -> daily_sync again
+# (steady state: nothing new to fetch) and prints wall time and DB round trips per job.
+#   python -m ingest.benchmarks.offline --riders 3000 --teams 400
+
+
+def _write_teams_csv(path: Path, n_teams: int, n_riders: int, roster: int) -> None:
+    with path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["team_name", "owner", "position", "standardized_rider", "points"])
+        for t in range(n_teams):
+            for slot in range(1, roster + 1):
+                rider = (t * 7 + slot * 13) % n_riders
+                w.writerow([f"Team #{t}", f"Owner {t}", slot, f"rider/rider-{rider}", max(0, 5000 - rider)])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season-year", type=int, default=2026)
+    ap.add_argument("--riders", type=int, default=2000, help="Riders in the synthetic ranking.")
+    ap.add_argument("--teams", type=int, default=200)
+    ap.add_argument("--roster-size", type=int, default=12)
+    ap.add_argument("--results-per-race", type=int, default=175)
+    ap.add_argument("--db", type=str, default=None, help="SQLite path (default: a temporary file).")
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db = args.db or str(Path(tmp.name) / "bench.sqlite3")
+    os.environ["MEGABIKE_LOCAL_DB"] = db
+    os.environ.setdefault("MEGABIKE_METRICS_DIR", str(Path(tmp.name) / "metrics"))
+
+    from .. import daily_sync, import_teams_cleaned_2025, yearly_refresh
+    from ..metrics import run_report
+    from ..pcs_http import set_page_source
+    from ..season_rules import load_season_rules
+    from ..supabase_client import record_queries
+    from .pages import synthetic_source
+
+    year = args.season_year
+    race_keys = list(load_season_rules(year).races)
+    set_page_source(synthetic_source(year, race_keys, n_ranked=args.riders, results_per_race=args.results_per_race))
+    teams_csv = Path(tmp.name) / "teams.csv"
+    _write_teams_csv(teams_csv, args.teams, min(args.riders, 5000), args.roster_size)
+
+    jobs = [
+        ("yearly_refresh", yearly_refresh.main, ["--season-year", str(year), "--date", f"{year}-01-01", "--limit", str(args.riders)]),
+        ("import_teams", import_teams_cleaned_2025.main, ["--season-year", str(year), "--csv", str(teams_csv), "--max-riders", str(args.roster_size)]),
+        ("daily_sync", daily_sync.main, ["--season-year", str(year), "--sync-all", "--full", "--today", f"{year}-12-31"]),
+        ("daily_sync (steady)", daily_sync.main, ["--season-year", str(year), "--sync-all", "--today", f"{year}-12-31"]),
+    ]
+    print(f"db={db} races={len(race_keys)} riders={args.riders} teams={args.teams}")
+    for name, fn, argv in jobs:
+        with run_report(name.split()[0]), record_queries() as rec:
+            t0 = time.perf_counter()
+            asyncio.run(fn(argv))
+            wall = time.perf_counter() - t0
+        print(f"{name:22s} {wall:8.2f}s  round_trips={rec.round_trips}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
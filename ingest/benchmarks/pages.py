@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+# Synthetic PCS-like pages shaped like the markup `pcs_parse` expects.
+
+
+def result_page(race_key: str, year: int, n_rows: int = 175, seed: int = 0) -> str:
+    rnd = random.Random(f"{race_key}/{year}/{seed}")
+    rows = []
+    for rank in range(1, n_rows + 1):
+        rid = rnd.randrange(5000)
+        rows.append(
+            f"<tr><td>{rank}</td><td>{rnd.randrange(200)}</td>"
+            f'<td><span class="flag be"></span><a href="rider/rider-{rid}">RIDER{rid} First{rid}</a></td>'
+            f'<td><a href="team/team-{rid % 40}-{year}">Team {rid % 40}</a></td>'
+            f"<td>{rnd.randrange(30)}</td><td>5:{rnd.randrange(60):02d}:{rnd.randrange(60):02d}</td></tr>"
+        )
+    return (
+        "<html><head><title>x</title></head><body>"
+        f'<div class="page-title"><h1>{race_key} {year}</h1></div>'
+        '<ul class="list keyvalueList fs14">'
+        f'<li><div class="title ">Startdate: </div><div class=" value">{year}-03-22</div></li>'
+        "<li><div class=\"title \">Distance: </div><div class=\" value\">289 km</div></li></ul>"
+        "<table><tr><th>Rnk</th><th>BIB</th><th>Rider</th><th>Team</th><th>UCI</th><th>Time</th></tr>"
+        + "".join(rows)
+        + "</table>"
+        + ("<p>" + "filler " * 200 + "</p>") * 20
+        + "</body></html>"
+    )
+
+
+def ranking_page(offset: int, n_rows: int = 100) -> str:
+    rows = []
+    for i in range(offset, offset + n_rows):
+        rows.append(
+            f"<tr><td>{i + 1}</td><td>{i + 2}</td><td>-1</td>"
+            f'<td><a href="rider/rider-{i}">RIDER{i} First{i}</a></td>'
+            f'<td><a href="team/team-{i % 40}-2026">Team {i % 40}</a></td>'
+            f"<td>{max(0, 5000 - i)}</td></tr>"
+        )
+    return (
+        "<html><body><table><tr><th>#</th><th>Prev.</th><th>Diff.</th><th>Rider</th><th>Team</th><th>Points</th></tr>"
+        + "".join(rows)
+        + "</table></body></html>"
+    )
+
+
+def races_listing_page(year: int, race_keys: list[str]) -> str:
+    rows = []
+    for i, key in enumerate(race_keys):
+        d = date(year, 1, 20) + timedelta(days=(i * 280) // max(1, len(race_keys)))
+        rows.append(
+            f"<tr><td>{d.day:02d}.{d.month:02d}</td><td></td>"
+            f'<td><a href="race/{key}/{year}/result">{key.replace("-", " ").title()}</a></td><td>1.UWT</td></tr>'
+        )
+    return "<html><body><table><tr><th>Date</th><th></th><th>Race</th><th>Class</th></tr>" + "".join(rows) + "</table></body></html>"
+
+
+def synthetic_source(year: int, race_keys: list[str], n_ranked: int = 1000, results_per_race: int = 175):
+    """
+    Page source for `pcs_http.set_page_source`: serves the races listing, rankings.php
+    offsets and result pages for `race_keys`; anything else is a 404.
+    """
+
+    async def source(url: str) -> tuple[int, str]:
+        path = url.split("procyclingstats.com/", 1)[-1]
+        if path.startswith("races.php"):
+            return 200, races_listing_page(year, race_keys)
+        if path.startswith("rankings.php"):
+            offset = int(parse_qs(urlsplit(url).query).get("offset", ["0"])[0])
+            return 200, ranking_page(offset, max(0, min(100, n_ranked - offset)))
+        parts = path.split("/")
+        if len(parts) == 4 and parts[0] == "race" and parts[1] in race_keys and parts[3] == "result":
+            return 200, result_page(parts[1], int(parts[2]), n_rows=results_per_race)
+        return 404, "<html><body>Page not found</body></html>"
+
+    return source
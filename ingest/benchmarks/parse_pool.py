@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from ..megabike_rules import RACES
+from ..parse_pool import ParseExecutor
+from .pages import result_page
+
+# Multi-season backfill parse throughput: inline (event loop) vs process pool
+# at increasing worker counts.
+#   python -m ingest.benchmarks.parse_pool --seasons 5
+
+
+async def _run(pages: list[bytes], executor: ParseExecutor, concurrency: int) -> int:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(p: bytes) -> int:
+        async with sem:
+            _, _, rows = await executor.parse("result_page", p)
+            return len(rows)
+
+    return sum(await asyncio.gather(*(one(p) for p in pages)))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seasons", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=175, help="Result rows per race page.")
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    pages = [
+        result_page(race_key, year, n_rows=args.rows).encode("utf-8")
+        for year in range(2026 - args.seasons, 2026)
+        for race_key in RACES
+    ]
+    mb = sum(len(p) for p in pages) / 1e6
+    print(f"pages={len(pages)} size={mb:.1f}MB rows_per_page={args.rows}")
+
+    worker_counts = [0] + [w for w in (1, 2, 4, 8, 16, 32) if w <= args.max_workers]
+    baseline = None
+    for workers in worker_counts:
+        executor = ParseExecutor(use_pool=workers > 0, max_workers=workers or None)
+        with executor:
+            if workers:
+                asyncio.run(_run(pages[: workers * 2], executor, workers))  # warm up worker processes
+            t0 = time.perf_counter()
+            rows = asyncio.run(_run(pages, executor, executor.concurrency))
+            dt = time.perf_counter() - t0
+        baseline = baseline or dt
+        label = "inline" if workers == 0 else f"pool x{workers}"
+        print(
+            f"{label:>10}: {dt:6.2f}s  {len(pages) / dt:7.1f} pages/s  {rows / dt:9.0f} rows/s  "
+            f"speedup={baseline / dt:4.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from ..pcs_parse import parse_rankings_php_uci_one_day
+from .pages import ranking_page
+
+# Retained memory of a parsed ranking pull: RankingRow records (what the parsers return)
+# vs the dict-per-row shape they used to return.
+#   python -m ingest.benchmarks.row_memory --rows 10000
+
+
+def _retained(build) -> tuple[int, float, list]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = build()
+    seconds = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, seconds, rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10_000)
+    args = ap.parse_args()
+
+    pages = [ranking_page(offset) for offset in range(0, args.rows, 100)]
+
+    def records() -> list:
+        out = []
+        for html in pages:
+            out.extend(parse_rankings_php_uci_one_day(html))
+        return out
+
+    def dicts() -> list:
+        out = []
+        for html in pages:
+            out.extend(r._asdict() for r in parse_rankings_php_uci_one_day(html))
+        return out
+
+    for name, build in (("RankingRow", records), ("dict", dicts)):
+        nbytes, seconds, rows = _retained(build)
+        print(f"{name:12s} rows={len(rows)} retained={nbytes / 1e6:6.2f} MB ({nbytes / len(rows):5.0f} B/row) {seconds:.2f}s")
+        del rows
+
+
+if __name__ == "__main__":
+    main()
@@ -1,245 +1,352 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
-from datetime import datetime
-from typing import Any
-
-from .pcs_async import run_blocking
-from .megabike_rules import RACES, RACES_RANK, RANK_POINTS
-from .pcs_http import fetch_pcs_html
-from .pcs_parse import parse_race_result_table, parse_races_php_one_day
-from .races_list import load_race_keys_from_races_txt
-from .scoring import points_for_rank
+from dataclasses import dataclass, field
+from datetime import datetime, time, timezone
+from typing import Any, Callable
+
+from .lease import EXIT_BUSY, SHARD_LEASES, LeaseBusy, active_leases, job_lease, lease_enabled, lease_spec
+from .metrics import METRICS, run_report
+from .negative_cache import race_page_expiry
+from .ownership import (
+    build_ownership_index,
+    load_team_rosters,
+    refresh_rider_ownership,
+    team_points_from_index,
+    teams_owning,
+)
+from .parse_pool import ParseExecutor
+from .pcs_async import to_thread
+from .pcs_http import fetch_pcs_bytes
+from .pcs_parse import parse_race_details, parse_races_php_one_day
+from .pipeline import Stage, run_pipeline
+from .points_history import record_points
+from .race_watch import watch_races
+from .read_models import publish_read_models
+from .records import RaceListing, ResultRow
+from .result_diff import ResultDiff, sync_race_results
+from .season_rules import SeasonRules, load_season_rules
 from .supabase_client import get_supabase
-
-
-from .utils import stable_rider_slug
-
-
-async def _fetch_html(slug: str) -> tuple[int, str]:
-    return await fetch_pcs_html(f"https://www.procyclingstats.com/{slug}")
-
-
-async def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
-    ap.add_argument(
-        "--verbose",
-        action="store_true",
-        help="Print debug logs (HTTP status, parsed counts, and skipped reasons).",
-    )
-    ap.add_argument(
-        "--race-slug",
-        type=str,
-        default=None,
-        help="Optional: PCS race slug to sync (e.g., 'race/tour-de-france/2025').",
-    )
-    ap.add_argument(
-        "--sync-all",
-        action="store_true",
-        help="Sync all Megabike races from Races.txt for this season (recommended).",
-    )
-    args = ap.parse_args()
-
-    sb = get_supabase()
-
-    def log(msg: str) -> None:
-        if args.verbose:
-            print(msg, flush=True)
-
-    # Decide what to sync
-    slugs: list[tuple[str, str]] = []
-    if args.sync_all:
-        # Use the selected race list from repo root `Races.txt` (or Races_2026.txt)
-        # Note: We look in "references" folder if that's where they live? 
-        # The previous code used ".", but user context showed `references/Races.txt`.
-        # We'll try "." first, then "references" if needed? 
-        # Actually daily_sync used "." and it worked? Maybe the container/runner cwd is different.
-        # But I see `references/Races.txt` in file list. 
-        # I'll stick to "." but if it fails I might need to adjust.
-        # Wait, if I created `references/Races_2026.txt`, passing "." might fail if script is run from root 
-        # and "." is root but file is in references. 
-        # However, line 55 was `load_race_keys_from_races_txt(".")`.
-        # I will change it to look in `references` if the file exists there.
-        import os
-        search_path = "."
-        if os.path.isdir("references"):
-            search_path = "references"
-        
-        race_keys = load_race_keys_from_races_txt(search_path, args.season_year)
-        for race_key in race_keys:
-            slugs.append((race_key, f"race/{race_key}/{args.season_year}"))
-    elif args.race_slug:
-        slugs.append(("_custom_", args.race_slug))
-    else:
-        return
-
-    # If syncing many races, seed race name/date from PCS listing page.
-    listing_by_key: dict[str, dict[str, Any]] = {}
-    if args.sync_all:
-        # Dynamic listing fetching for any season
-        list_url = f"https://www.procyclingstats.com/races.php?s=&year={args.season_year}&circuit=1&class=&filter=Filter"
-        log(f"[pcs] fetch races listing: {list_url}")
-        status, html = await fetch_pcs_html(list_url)
-        log(f"[pcs] races listing http status: {status} (len={len(html)})")
-        if status == 200:
-            listing_by_key = parse_races_php_one_day(html, args.season_year)
-
-    # Process races: upsert race + results + riders, then recompute season totals idempotently.
-    for race_key, slug in slugs:
-        # 1) Preferred: one-day results page HTML (custom parser)
-        result_slug = slug
+from .sync_plan import load_stored_state, parse_shard, plan_sync, race_pcs_slug, shard_races
+from .utils import chunked, select_in
+
+Log = Callable[[str], None]
+
+
+async def _fetch_page(slug: str, race_date: str | None = None) -> tuple[int, bytes]:
+    # Raw bytes: pages only go to the parsers, so skip decoding them to str.
+    # A missing page for a race with a known date stays suppressed until that date.
+    return await fetch_pcs_bytes(f"https://www.procyclingstats.com/{slug}", not_found_until=race_page_expiry(race_date))
+
+
+async def fetch_races_listing(season_year: int, log: Log) -> dict[str, RaceListing]:
+    """
+    PCS one-day races listing for the season (race name/date keyed by race_key).
+    """
+    list_url = f"https://www.procyclingstats.com/races.php?s=&year={season_year}&circuit=1&class=&filter=Filter"
+    log(f"[pcs] fetch races listing: {list_url}")
+    status, html = await fetch_pcs_bytes(list_url)
+    log(f"[pcs] races listing http status: {status} (len={len(html)})")
+    if status != 200:
+        return {}
+    return parse_races_php_one_day(html, season_year)
+
+
+async def fetch_race_page(
+    race_key: str, slug: str, season_year: int, log: Log, race_date: str | None = None
+) -> tuple[str, int, bytes]:
+    """
+    Fetch the results page for a race, trying the slug without year as fallback.
+    Returns (result_slug, status, html). `race_key` is "_custom_" for an explicit --race-slug.
+    `race_date` (when known) sets how long a 404 is remembered (see negative_cache).
+    """
+    # 1) Preferred: one-day results page HTML (custom parser)
+    result_slug = slug
+    if race_key != "_custom_":
+        result_slug = f"race/{race_key}/{season_year}/result"
+
+    log(f"[pcs] fetch results: {result_slug}")
+    status, html = await _fetch_page(result_slug, race_date)
+    log(f"[pcs] http status: {status} (len={len(html)})")
+
+    if status != 200:
+        # Fallback: some pages exist without year segment
         if race_key != "_custom_":
-            result_slug = f"race/{race_key}/{args.season_year}/result"
-
-        log(f"[pcs] fetch results: {result_slug}")
-        status, html = await _fetch_html(result_slug)
-        log(f"[pcs] http status: {status} (len={len(html)})")
-
+            fallback_slug = f"race/{race_key}/result"
+            log(f"[pcs] fetch fallback results: {fallback_slug}")
+            status, html = await _fetch_page(fallback_slug, race_date)
+            log(f"[pcs] http status: {status} (len={len(html)})")
+            result_slug = fallback_slug
+    return result_slug, status, html
+
+
+@dataclass
+class RacePage:
+    """
+    One race flowing through the ingestion stages (fetch -> parse -> resolve -> score -> write).
+    """
+
+    race_key: str
+    result_slug: str
+    html: bytes = b""
+    race_slug: str = ""
+    race_name: str = ""
+    race_date: str = ""
+    results: list[ResultRow] = field(default_factory=list)
+    race_id: str = ""
+    id_by_slug: dict[str, str] = field(default_factory=dict)
+    rr_rows: list[dict[str, Any]] = field(default_factory=list)
+    season_year: int = 0
+    diff: ResultDiff | None = None
+
+
+async def parse_race_page(
+    page: RacePage,
+    rules: SeasonRules,
+    season_year: int,
+    listing_meta: RaceListing | None,
+    log: Log,
+    parser: ParseExecutor | None = None,
+) -> RacePage:
+    """
+    Parse race name, date and result rows from a fetched results page
+    (in a worker process when `parser` has its pool enabled).
+    """
+    result_slug, html = page.result_slug, page.html
+    title, startdate, rows = await (parser or ParseExecutor()).parse("result_page", html)
+    race_name: str = result_slug
+    race_date: str | None = rules.race_dates.get(page.race_key)
+
+    # Prefer race name/date from listing page when available.
+    if listing_meta:
+        if listing_meta.name:
+            race_name = listing_meta.name
+        if listing_meta.date:
+            race_date = listing_meta.date
+
+    if title:
+        race_name = title
+
+    if startdate:
+        race_date = startdate
+    elif not race_date and "/result" in result_slug:
+        # Fallback: if neither the results page nor the listing had a date, try overview page
+        # Result slug: race/foo/2025/result -> Overview: race/foo/2025
+        overview_slug = result_slug.replace("/result", "")
+        log(f"[pcs] date missing, try overview: {overview_slug}")
+        st_ov, html_ov = await _fetch_page(overview_slug)
+        if st_ov == 200:
+            details_ov = parse_race_details(html_ov)
+            if details_ov.get("startdate"):
+                race_date = details_ov["startdate"]
+                log(f"[pcs] found date in overview: {race_date}")
+
+    page.race_name = race_name
+    page.race_date = race_date or datetime.utcnow().date().isoformat()
+    page.results = rows
+    page.html = b""  # release the page once parsed
+    page.race_slug = result_slug if page.race_key == "_custom_" else race_pcs_slug(page.race_key, season_year)
+    log(f"[pcs] {page.race_key}: parsed results rows: {len(page.results)}")
+    if not page.results:
+        log(f"[sync] {page.race_key}: no results rows; upserting race definition only")
+    return page
+
+
+def resolve_race_ids(sb, page: RacePage) -> RacePage:
+    """
+    Upsert the race and its riders, then map rider slugs to ids.
+    """
+    sb.table("races").upsert(
+        {
+            "pcs_slug": page.race_slug,
+            "name": page.race_name,
+            "race_date": page.race_date,
+        },
+        on_conflict="pcs_slug",
+    ).execute()
+
+    race_row = sb.table("races").select("id, pcs_slug").eq("pcs_slug", page.race_slug).single().execute().data
+    page.race_id = race_row["id"]
+
+    # Upsert riders from results (so we don't rely on a separate yearly seed)
+    riders_to_upsert = [
+        {
+            "pcs_slug": row.rider_url,
+            "rider_name": row.rider_name,
+            "team_name": row.team_name,
+            "nationality": None,
+            "active": True,
+        }
+        for row in page.results
+    ]
+
+    if riders_to_upsert:
+        sb.table("riders").upsert(riders_to_upsert, on_conflict="pcs_slug").execute()
+
+    # Fetch rider ids for mapping
+    slugs_for_lookup = [r["pcs_slug"] for r in riders_to_upsert]
+    fetched = (
+        sb.table("riders")
+        .select("id, pcs_slug")
+        .in_("pcs_slug", slugs_for_lookup)
+        .execute()
+        .data
+        or []
+    )
+    page.id_by_slug = {r["pcs_slug"]: r["id"] for r in fetched}
+    return page
+
+
+def score_race(rules: SeasonRules, page: RacePage) -> RacePage:
+    """
+    Build race_results rows (rank + Megabike points) for every resolved rider.
+    """
+    rr_rows = []
+    for row in page.results:
+        rider_id = page.id_by_slug.get(row.rider_url)
+        if not rider_id:
+            continue
+        pts = rules.points_for(page.race_key, row.rank)
+        rr_rows.append({"race_id": page.race_id, "rider_id": rider_id, "rank": row.rank, "points_awarded": pts})
+    page.rr_rows = rr_rows
+    return page
+
+
+def write_results(sb, page: RacePage) -> RacePage:
+    """
+    Bring the race's stored results in line with `rr_rows`: only inserts, rank/points
+    updates and deletions are written (see result_diff).
+    """
+    page.diff = sync_race_results(sb, page.race_id, page.rr_rows)
+    return page
+
+
+async def store_race(
+    sb,
+    rules: SeasonRules,
+    season_year: int,
+    race_key: str,
+    result_slug: str,
+    html: bytes,
+    listing_meta: RaceListing | None,
+    log: Log,
+) -> tuple[str, list[str]]:
+    """
+    Parse a fetched results page and store it: upsert race + riders, diff the results.
+    Returns (race_id, rider_ids whose result was inserted, changed or deleted).
+    """
+    page = await parse_race_page(RacePage(race_key, result_slug, html), rules, season_year, listing_meta, log)
+    page = write_results(sb, score_race(rules, resolve_race_ids(sb, page)))
+    log(f"[sync] {race_key}: results {page.diff.summary()}")
+    return page.race_id, page.diff.affected_rider_ids
+
+
+def race_stages(
+    sb,
+    rules_for: Callable[[int], SeasonRules],
+    listing_for: Callable[[int, str], RaceListing | None],
+    log: Log,
+    fetch_concurrency: int,
+    parser: ParseExecutor,
+    on_written: Callable[[RacePage], None] | None = None,
+) -> list[Stage]:
+    """
+    fetch -> parse -> resolve -> score -> write stages for `run_pipeline`.
+    Input items are (season_year, race_key, slug), so one pipeline can span seasons.
+    `on_written` runs (in the write worker thread) after each race's results are stored.
+    """
+
+    async def fetch(item: tuple[int, str, str]) -> RacePage | None:
+        season_year, race_key, slug = item
+        listing = listing_for(season_year, race_key)
+        race_date = (listing.date if listing else None) or rules_for(season_year).race_dates.get(race_key)
+        result_slug, status, html = await fetch_race_page(race_key, slug, season_year, log, race_date)
         if status != 200:
-            # Fallback: some pages exist without year segment
-            if race_key != "_custom_":
-                fallback_slug = f"race/{race_key}/result"
-                log(f"[pcs] fetch fallback results: {fallback_slug}")
-                status, html = await _fetch_html(fallback_slug)
-                log(f"[pcs] http status: {status} (len={len(html)})")
-                result_slug = fallback_slug
-            if status != 200:
-                log("[pcs] could not fetch results page (likely blocked); skipping")
-                continue
-
-        race_name: str = result_slug
-        race_date: str = datetime.utcnow().date().isoformat()
-
-        # Prefer race name/date from listing page when available.
-        if race_key != "_custom_" and listing_by_key.get(race_key):
-            meta = listing_by_key[race_key]
-            if meta.get("name"):
-                race_name = str(meta["name"])
-            if meta.get("date"):
-                race_date = str(meta["date"])
-
-        # Race title (best effort)
-        try:
-            from selectolax.parser import HTMLParser
-
-            tree = HTMLParser(html)
-            h1 = tree.css_first(".page-title h1")
-            if h1 is not None:
-                race_name = " ".join(h1.text().split())
-        except Exception:
-            pass
-
-        # Parse details (date)
-        from .pcs_parse import parse_race_details
-        details = parse_race_details(html)
-        if details.get("startdate"):
-            race_date = details["startdate"]
-        else:
-            # Fallback: if results page didn't have date, try overview page
-            # Result slug: race/foo/2025/result -> Overview: race/foo/2025
-            if "/result" in result_slug:
-                overview_slug = result_slug.replace("/result", "")
-                log(f"[pcs] date missing, try overview: {overview_slug}")
-                st_ov, html_ov = await _fetch_html(overview_slug)
-                if st_ov == 200:
-                    details_ov = parse_race_details(html_ov)
-                    if details_ov.get("startdate"):
-                        race_date = details_ov["startdate"]
-                        log(f"[pcs] found date in overview: {race_date}")
-
-        results = parse_race_result_table(html)
-        log(f"[pcs] parsed results rows: {len(results)}")
-
-        if not results:
-            log("[sync] no results rows; upserting race definition only")
-
-        # Upsert race
-        sb.table("races").upsert(
-            {
-                "pcs_slug": result_slug if race_key == "_custom_" else f"race/{race_key}/{args.season_year}",
-                "name": race_name,
-                "race_date": race_date,
-            },
-            on_conflict="pcs_slug",
-        ).execute()
-
-        race_row = (
-            sb.table("races")
-            .select("id, pcs_slug")
-            .eq("pcs_slug", result_slug if race_key == "_custom_" else f"race/{race_key}/{args.season_year}")
-            .single()
-            .execute()
-            .data
+            log(f"[pcs] {race_key}/{season_year}: could not fetch results page (likely blocked); skipping")
+            return None
+        return RacePage(race_key, result_slug, html, season_year=season_year)
+
+    async def parse(page: RacePage) -> RacePage:
+        return await parse_race_page(
+            page,
+            rules_for(page.season_year),
+            page.season_year,
+            listing_for(page.season_year, page.race_key),
+            log,
+            parser,
         )
-        race_id = race_row["id"]
-
-        # Determine tier and points
-        tier = RACES_RANK.get(race_key, 1) if race_key != "_custom_" else 1
-
-        # Upsert riders from results (so we don't rely on a separate yearly seed)
-        riders_to_upsert = []
-        for row in results:
-            if not isinstance(row, dict):
-                continue
-            name = row.get("rider_name") or row.get("rider") or row.get("name")
-            if not name:
-                continue
-            rider_slug = row.get("rider_url") or row.get("rider") or row.get("url") or stable_rider_slug(str(name), nationality)
-            team_name = row.get("team") or row.get("team_name")
-            nationality = row.get("nationality")
-            riders_to_upsert.append(
-                {
-                    "pcs_slug": rider_slug,
-                    "rider_name": name,
-                    "team_name": team_name,
-                    "nationality": nationality,
-                    "active": True,
-                }
-            )
 
-        if riders_to_upsert:
-            sb.table("riders").upsert(riders_to_upsert, on_conflict="pcs_slug").execute()
-
-        # Fetch rider ids for mapping
-        slugs_for_lookup = [r["pcs_slug"] for r in riders_to_upsert]
-        fetched = (
-            sb.table("riders")
-            .select("id, pcs_slug")
-            .in_("pcs_slug", slugs_for_lookup)
-            .execute()
-            .data
-            or []
+    async def resolve(page: RacePage) -> RacePage:
+        return await to_thread(lambda: resolve_race_ids(sb, page))
+
+    async def score(page: RacePage) -> RacePage:
+        return score_race(rules_for(page.season_year), page)
+
+    def write_one(page: RacePage) -> RacePage:
+        write_results(sb, page)
+        if on_written is not None:
+            on_written(page)
+        return page
+
+    async def write(page: RacePage) -> RacePage:
+        page = await to_thread(lambda: write_one(page))
+        log(f"[sync] {page.race_key}/{page.season_year}: results {page.diff.summary()}")
+        return page
+
+    return [
+        Stage("fetch", fetch, concurrency=fetch_concurrency),
+        Stage("parse", parse, concurrency=parser.concurrency),
+        Stage("resolve", resolve),
+        Stage("score", score),
+        Stage("write", write),
+    ]
+
+
+async def sync_races(
+    sb,
+    rules: SeasonRules,
+    season_year: int,
+    slugs: list[tuple[str, str]],
+    listing_by_key: dict[str, RaceListing],
+    log: Log,
+    fetch_concurrency: int = 4,
+) -> list[RacePage]:
+    """
+    Sync many races of one season through the bounded stages, so PCS fetches overlap
+    with Supabase writes. Supabase calls are blocking and run in worker threads;
+    parsing moves to a process pool for large batches. Returns the written pages.
+    """
+    with ParseExecutor.for_batch(len(slugs)) as parser:
+        stages = race_stages(
+            sb,
+            lambda _year: rules,
+            lambda _year, race_key: listing_by_key.get(race_key),
+            log,
+            fetch_concurrency,
+            parser,
         )
-        id_by_slug = {r["pcs_slug"]: r["id"] for r in fetched}
-
-        rr_rows = []
-        for row in results:
-            if not isinstance(row, dict):
-                continue
-            name = row.get("rider_name") or row.get("rider") or row.get("name")
-            if not name:
-                continue
-            rider_slug = row.get("rider_url") or row.get("rider") or row.get("url") or stable_rider_slug(str(name), row.get("nationality"))
-            rider_id = id_by_slug.get(rider_slug)
-            if not rider_id:
-                continue
-            rank = row.get("rank") or row.get("position")
-            try:
-                rank_int = int(rank)
-            except Exception:
-                continue
-
-            pts = points_for_rank(rank_int, tier, RANK_POINTS)
-            rr_rows.append({"race_id": race_id, "rider_id": rider_id, "rank": rank_int, "points_awarded": pts})
-
-        if rr_rows:
-            sb.table("race_results").upsert(rr_rows, on_conflict="race_id,rider_id").execute()
+        return await run_pipeline([(season_year, k, slug) for k, slug in slugs], stages)
+
 
+def removed_rider_ids(pages: list[RacePage]) -> list[str]:
+    """
+    Riders whose result was deleted from one of `pages` (their points must be recomputed
+    even when they have no result left).
+    """
+    return sorted({rid for p in pages if p.diff for rid in p.diff.deletes})
+
+
+def recompute_season(
+    sb, season_year: int, log: Log, removed: list[str] | tuple[str, ...] = (), history: bool = True
+) -> None:
+    """
+    Idempotent recompute of rider_points and team points for the season, then
+    republish the read models. `removed` riders are reset to 0 when no result is left.
+    With `history`, today's values are recorded in points_history.
+    """
     # Idempotent recompute of rider_points for the season (sum all race_results in the season year)
-    start = f"{args.season_year}-01-01"
-    end = f"{args.season_year}-12-31"
+    start = f"{season_year}-01-01"
+    end = f"{season_year}-12-31"
     # NOTE: Filtering on embedded resources (races.race_date) is not reliable across
     # PostgREST client versions. Instead: fetch race ids for the season, then filter
     # race_results by race_id.
@@ -277,36 +384,395 @@ async def main() -> None:
         pts = int(row.get("points_awarded") or 0)
         if rid:
             totals[rid] = totals.get(rid, 0) + pts
+    for rid in removed:
+        totals.setdefault(rid, 0)
 
-    rp_rows = [{"season_year": args.season_year, "rider_id": rid, "points": pts} for rid, pts in totals.items()]
+    rp_rows = [{"season_year": season_year, "rider_id": rid, "points": pts} for rid, pts in totals.items()]
     if rp_rows:
         sb.table("rider_points").upsert(rp_rows, on_conflict="season_year,rider_id").execute()
 
-    # Recompute team totals for the season
-    teams = sb.table("teams").select("id").eq("season_year", args.season_year).execute().data or []
-    for t in teams:
-        team_id = t["id"]
-        roster = sb.table("team_riders").select("rider_id").eq("team_id", team_id).execute().data or []
-        rids = [r["rider_id"] for r in roster]
-        if not rids:
-            sb.table("teams").update({"points": 0}).eq("id", team_id).execute()
-            continue
-        pts_rows = (
+    # Recompute team totals for the season from the rider -> teams ownership index
+    # (one roster query for the whole season instead of two queries per team).
+    rosters = load_team_rosters(sb, season_year)
+    index = refresh_rider_ownership(sb, season_year, rosters)
+    team_totals = team_points_from_index(index, totals, rosters.keys())
+    current = sb.table("teams").select("id, points").eq("season_year", season_year).execute().data or []
+    for t in current:
+        total = team_totals.get(t["id"], 0)
+        if int(t.get("points") or 0) != total:
+            sb.table("teams").update({"points": total}).eq("id", t["id"]).execute()
+
+    if history:
+        n_rider = record_points(sb, season_year, "rider", totals)
+        n_team = record_points(sb, season_year, "team", {t["id"]: team_totals.get(t["id"], 0) for t in current})
+        log(f"[sync] points history: rider_rows={n_rider} team_rows={n_team}")
+
+    # Publish denormalized snapshots for the frontend (one fetch per page view).
+    n_models = publish_read_models(sb, season_year)
+    log(f"[sync] published read models: {n_models}")
+
+
+def recompute_riders(sb, season_year: int, rider_ids: list[str], log: Log) -> None:
+    """
+    Incremental recompute after a single race changed: refresh rider_points for
+    `rider_ids` only, then the totals of the teams owning them, then the read models.
+    """
+    if not rider_ids:
+        return
+    races_in_season = (
+        sb.table("races")
+        .select("id")
+        .gte("race_date", f"{season_year}-01-01")
+        .lte("race_date", f"{season_year}-12-31")
+        .execute()
+        .data
+        or []
+    )
+    race_ids = [r["id"] for r in races_in_season if r.get("id")]
+    totals: dict[str, int] = {rid: 0 for rid in rider_ids}
+    limit = 1000
+    for batch in chunked(rider_ids, 100):
+        # A batch can have up to len(batch) * len(race_ids) rows: page past the 1000-row cap.
+        start_idx = 0
+        while True:
+            rows = (
+                sb.table("race_results")
+                .select("rider_id, points_awarded")
+                .in_("race_id", race_ids)
+                .in_("rider_id", batch)
+                .order("race_id")
+                .order("rider_id")
+                .range(start_idx, start_idx + limit - 1)
+                .execute()
+                .data
+                or []
+            )
+            for row in rows:
+                totals[row["rider_id"]] = totals.get(row["rider_id"], 0) + int(row.get("points_awarded") or 0)
+            if len(rows) < limit:
+                break
+            start_idx += limit
+    rp_rows = [{"season_year": season_year, "rider_id": rid, "points": pts} for rid, pts in totals.items()]
+    sb.table("rider_points").upsert(rp_rows, on_conflict="season_year,rider_id").execute()
+
+    rosters = load_team_rosters(sb, season_year)
+    index = build_ownership_index(rosters)
+    affected = teams_owning(index, rider_ids)
+    log(f"[sync] incremental recompute: riders={len(rider_ids)} teams={len(affected)}")
+    if affected:
+        roster_riders = sorted({rid for tid in affected for rid in rosters.get(tid, [])})
+        points_by_rider = {
+            r["rider_id"]: int(r.get("points") or 0)
+            for r in select_in(sb, "rider_points", "rider_id, points", "rider_id", roster_riders, season_year=season_year)
+        }
+        team_totals = team_points_from_index(index, points_by_rider, affected)
+        for tid, total in team_totals.items():
+            sb.table("teams").update({"points": total}).eq("id", tid).execute()
+        record_points(sb, season_year, "team", team_totals, full=False)
+    record_points(sb, season_year, "rider", totals, full=False)
+
+    n_models = publish_read_models(sb, season_year)
+    log(f"[sync] published read models: {n_models}")
+
+
+async def watch_today(sb, rules: SeasonRules, args: argparse.Namespace, log: Log) -> None:
+    """
+    `--watch`: poll only the races dated today and score each new result set incrementally.
+    """
+    today = datetime.fromisoformat(args.today).date() if args.today else datetime.utcnow().date()
+    listing_by_key = await fetch_races_listing(args.season_year, log)
+    race_keys = [
+        k
+        for k in rules.races
+        if (getattr(listing_by_key.get(k), "date", None) or rules.race_dates.get(k)) == today.isoformat()
+    ]
+    if not race_keys:
+        print(f"[watch] no Megabike race on {today.isoformat()}", flush=True)
+        return
+    print(f"[watch] watching {', '.join(race_keys)}", flush=True)
+
+    hh, mm = (int(x) for x in args.watch_until.split(":"))
+    deadline = datetime.combine(today, time(hh, mm), tzinfo=timezone.utc).timestamp()
+
+    async def fetch(race_key: str) -> tuple[str, int, bytes]:
+        result_slug = f"race/{race_key}/{args.season_year}/result"
+        status, html = await _fetch_page(result_slug, today.isoformat())
+        return result_slug, status, html
+
+    async def store(race_key: str, result_slug: str, html: bytes) -> bool:
+        # The scheduled jobs write the same results and points: store and score under the
+        # main lease (see ingest/lease.py), or retry at the next poll.
+        try:
+            with job_lease("daily_sync:watch", wait=args.watch_lease_wait, exit_busy=False):
+                _, rider_ids = await store_race(
+                    sb, rules, args.season_year, race_key, result_slug, html, listing_by_key.get(race_key), log
+                )
+                recompute_riders(sb, args.season_year, rider_ids, log)
+        except LeaseBusy as e:
+            print(f"[watch] {race_key}: {e}", flush=True)
+            return False
+        return True
+
+    watches = await watch_races(
+        race_keys,
+        fetch,
+        store,
+        budget=args.watch_budget,
+        idle_interval=args.watch_interval,
+        active_interval=args.watch_active_interval,
+        stable_after=args.watch_stable_polls,
+        deadline=deadline,
+        log=print,
+    )
+    for w in watches.values():
+        print(f"[watch] {w.race_key}: polls={w.polls} updates={w.updates} stable={w.done}", flush=True)
+
+
+def rider_ids_with_points(sb, season_year: int) -> list[str]:
+    """
+    Riders with a rider_points row for the season (paged).
+    """
+    out: list[dict[str, Any]] = []
+    while True:
+        batch = (
             sb.table("rider_points")
-            .select("rider_id, points")
-            .eq("season_year", args.season_year)
-            .in_("rider_id", rids)
+            .select("rider_id")
+            .eq("season_year", season_year)
+            .order("rider_id")
+            .range(len(out), len(out) + 999)
             .execute()
             .data
             or []
         )
-        total = sum(int(r.get("points") or 0) for r in pts_rows)
-        sb.table("teams").update({"points": total}).eq("id", team_id).execute()
+        out.extend(batch)
+        if len(batch) < 1000:
+            return [r["rider_id"] for r in out]
+
+
+def record_shard_done(sb, season_year: int, run_day: str, shard: tuple[int, int]) -> None:
+    """
+    Mark shard i/n of the day's run as finished (read by --finalize).
+    """
+    row = {"season_year": season_year, "run_day": run_day, "shards": shard[1], "shard": shard[0]}
+    sb.table("shard_runs").upsert(row, on_conflict="season_year,run_day,shards,shard").execute()
+
+
+def finished_shards(sb, season_year: int, run_day: str) -> dict[int, set[int]]:
+    """
+    {n: {i, ...}}: the shards i/n that finished on `run_day`.
+    """
+    rows = (
+        sb.table("shard_runs")
+        .select("shards, shard")
+        .eq("season_year", season_year)
+        .eq("run_day", run_day)
+        .execute()
+        .data
+        or []
+    )
+    out: dict[int, set[int]] = {}
+    for r in rows:
+        out.setdefault(int(r["shards"]), set()).add(int(r["shard"]))
+    return out
+
+
+async def finalize_shards(sb, season_year: int, run_day: str, wait: float, log: Log) -> None:
+    """
+    Season recompute after sharded runs. Requires every shard i/n of `run_day` to have
+    finished (shard_runs) and no shard to hold its lease, waiting up to `wait` seconds
+    (then exits with EXIT_BUSY): a shard that has not started or crashed is not done.
+    Shards do not report which riders lost a result, so every rider with stored points
+    is passed as `removed` and reset to 0 when no result is left.
+    """
+    import asyncio
+
+    deadline = asyncio.get_running_loop().time() + wait
+    while True:
+        running = await to_thread(lambda: active_leases(sb, SHARD_LEASES)) if lease_enabled() else []
+        done = await to_thread(lambda: finished_shards(sb, season_year, run_day))
+        # Every shard count seen that day must be complete (a rerun with another n included).
+        if done and all(ids >= set(range(1, n + 1)) for n, ids in done.items()) and not running:
+            break
+        if asyncio.get_running_loop().time() >= deadline:
+            if running:
+                print(f"[finalize] shards still running: {', '.join(r['name'] for r in running)}", flush=True)
+            for n, ids in sorted(done.items()):
+                missing = sorted(set(range(1, n + 1)) - ids)
+                if missing:
+                    print(f"[finalize] {run_day}: shards not finished: {', '.join(f'{i}/{n}' for i in missing)}", flush=True)
+            if not done:
+                print(f"[finalize] {run_day}: no shard finished", flush=True)
+            raise SystemExit(EXIT_BUSY)
+        await asyncio.sleep(5.0)
+    log(f"[finalize] {run_day}: shards {', '.join(f'{len(ids)}/{n}' for n, ids in sorted(done.items()))} finished")
+    with METRICS.stage("recompute"):
+        recompute_season(sb, season_year, log, rider_ids_with_points(sb, season_year))
+
+
+async def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
+    ap.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print debug logs (HTTP status, parsed counts, and skipped reasons).",
+    )
+    ap.add_argument(
+        "--race-slug",
+        type=str,
+        default=None,
+        help="Optional: PCS race slug to sync (e.g., 'race/tour-de-france/2025').",
+    )
+    ap.add_argument(
+        "--sync-all",
+        action="store_true",
+        help="Sync all Megabike races from Races.txt for this season (recommended).",
+    )
+    ap.add_argument(
+        "--full",
+        action="store_true",
+        help="With --sync-all: fetch every race, ignoring the calendar plan (future/frozen races).",
+    )
+    ap.add_argument(
+        "--recheck-days",
+        type=int,
+        default=3,
+        help="Re-fetch races with stored results for this many days after the race (corrections).",
+    )
+    ap.add_argument(
+        "--today",
+        type=str,
+        default=None,
+        help="Override today's date for planning, and the run day of --shard/--finalize (YYYY-MM-DD).",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent PCS fetches while syncing races (parse/DB stages run one at a time).",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Race-day mode: keep polling today's races and score results as soon as they appear.",
+    )
+    ap.add_argument("--watch-budget", type=int, default=120, help="Max PCS requests for the whole watch run.")
+    ap.add_argument("--watch-interval", type=float, default=600.0, help="Seconds between polls before results appear.")
+    ap.add_argument(
+        "--watch-active-interval",
+        type=float,
+        default=120.0,
+        help="Seconds between polls once results appear (doubles while unchanged).",
+    )
+    ap.add_argument("--watch-stable-polls", type=int, default=3, help="Unchanged polls before a race is considered final.")
+    ap.add_argument(
+        "--watch-lease-wait",
+        type=float,
+        default=60.0,
+        help="Seconds an update waits for the main lease (held by a scheduled job) before retrying at the next poll.",
+    )
+    ap.add_argument("--watch-until", type=str, default="23:00", help="Stop watching at this UTC time (HH:MM).")
+    ap.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="With --sync-all: sync only shard i of n (e.g. 1/4) and write race results only; run --finalize after all shards.",
+    )
+    ap.add_argument(
+        "--finalize",
+        action="store_true",
+        help="Recompute rider/team points, history and read models once after sharded runs (no PCS fetch).",
+    )
+    ap.add_argument(
+        "--wait-shards",
+        type=float,
+        default=0.0,
+        help="With --finalize: seconds to wait for shards that have not finished yet.",
+    )
+    args = ap.parse_args(argv)
+    shard: tuple[int, int] | None = None
+    if args.shard:
+        if not args.sync_all or args.watch or args.finalize:
+            ap.error("--shard requires --sync-all (and no --watch/--finalize)")
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            ap.error(str(e))
+
+    sb = get_supabase()
+    rules = load_season_rules(args.season_year)
+
+    def log(msg: str) -> None:
+        if args.verbose:
+            print(msg, flush=True)
+
+    if args.watch:
+        await watch_today(sb, rules, args, log)
+        return
+
+    # Shards and --finalize agree on the run through its day (pass the same --today when
+    # a run crosses midnight).
+    run_day = args.today or datetime.utcnow().date().isoformat()
+    if args.finalize:
+        await finalize_shards(sb, args.season_year, run_day, args.wait_shards, log)
+        return
+
+    # Decide what to sync
+    slugs: list[tuple[str, str]] = []
+    listing_by_key: dict[str, RaceListing] = {}
+    if args.sync_all:
+        # Seed race name/date from PCS listing page (also drives the calendar plan).
+        with METRICS.stage("listing"):
+            listing_by_key = await fetch_races_listing(args.season_year, log)
+        race_keys = list(rules.races)
+        if shard is not None:
+            race_keys = shard_races(race_keys, *shard)
+            print(f"[shard] {shard[0]}/{shard[1]}: {len(race_keys)} races", flush=True)
+        if not args.full:
+            today = datetime.fromisoformat(args.today).date() if args.today else datetime.utcnow().date()
+            plan = plan_sync(
+                race_keys,
+                today,
+                listing_by_key=listing_by_key,
+                stored=load_stored_state(sb, args.season_year),
+                calendar=rules.race_dates,
+                recheck_days=args.recheck_days,
+            )
+            for p in plan:
+                log(f"[plan] {p.race_key}: {p.action} ({p.reason})")
+            race_keys = [p.race_key for p in plan if p.fetch]
+            METRICS.incr("races_planned_fetch", len(race_keys))
+            METRICS.incr("races_planned_skip", len(plan) - len(race_keys))
+            counts: dict[str, int] = {}
+            for p in plan:
+                counts[p.action] = counts.get(p.action, 0) + 1
+            print(f"[plan] fetch={len(race_keys)} " + " ".join(f"{k}={v}" for k, v in sorted(counts.items())), flush=True)
+        for race_key in race_keys:
+            slugs.append((race_key, race_pcs_slug(race_key, args.season_year)))
+    elif args.race_slug:
+        slugs.append(("_custom_", args.race_slug))
+    else:
+        return
+
+    # Process races: upsert race + results + riders, then recompute season totals idempotently.
+    with METRICS.stage("sync_races"):
+        pages = await sync_races(sb, rules, args.season_year, slugs, listing_by_key, log, fetch_concurrency=args.concurrency)
+
+    if shard is not None:
+        # Results only; the season recompute runs once in --finalize.
+        METRICS.incr("shard_races_written", len(pages))
+        record_shard_done(sb, args.season_year, run_day, shard)
+        return
+
+    with METRICS.stage("recompute"):
+        recompute_season(sb, args.season_year, log, removed_rider_ids(pages))
 
 
 if __name__ == "__main__":
     import asyncio
 
-    asyncio.run(main())
-
+    import sys
 
+    lease_name, conflicts = lease_spec(sys.argv[1:])
+    with job_lease("daily_sync", name=lease_name, conflicts=conflicts), run_report("daily_sync"):
+        asyncio.run(main())
@@ -12,9 +12,16 @@ def require_env(name: str) -> str:
     return v
 
 
-# Supabase (server-side)
-SUPABASE_URL = require_env("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = require_env("SUPABASE_SERVICE_ROLE_KEY")
+# Supabase (server-side). Resolved on first access so offline runs (MEGABIKE_LOCAL_DB)
+# and PCS-only code paths don't need the secrets.
+_REQUIRED = ("SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY")
+
+
+def __getattr__(name: str) -> str:
+    if name in _REQUIRED:
+        return require_env(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Optional: if PCS blocks scraping (Cloudflare), you can supply a browser clearance cookie.
 # - PCS_COOKIE: Cookie header string, e.g. "cf_clearance=...; other=..."
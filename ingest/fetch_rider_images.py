@@ -1,24 +1,78 @@
-import os
-import cloudscraper
+import argparse
+import hashlib
+import json
+import re
+import threading
 import time
 import random
+from types import SimpleNamespace
 from bs4 import BeautifulSoup
-from supabase import create_client, Client
-from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Load env vars
-script_dir = os.path.dirname(os.path.abspath(__file__))
-env_path = os.path.join(script_dir, "..", ".env")
-load_dotenv(dotenv_path=env_path)
+import cloudscraper
+
+from .lease import job_lease
+from .metrics import METRICS, run_report
+from .negative_cache import negative_cache
+from .supabase_client import get_supabase
+from .utils import cache_dir
+
+# Env (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY) is loaded from the repo root .env by ingest.env
+supabase = get_supabase()
+
+
+# Refresh mode (--refresh) revisits every rider, not only those without a photo, and keeps
+# per-rider page validators from the last fetch in .cache/rider_images/validators.json:
+#   - the page URL actually used (after the search fallback), so it is not searched again
+#   - ETag / Last-Modified, sent back as If-None-Match / If-Modified-Since (304 = unchanged)
+#   - a hash of the photo block (every "images/riders/..." reference in the raw page)
+# A rider is re-parsed and updated only when the page changed and its photo block hash
+# differs, so a weekly full refresh costs a fraction of a cold run.
+
+PHOTO_SRC = re.compile(rb"images/riders/[^\"'\s<>]+")
+
+
+def photo_block_hash(content):
+    return hashlib.sha1(b"\n".join(PHOTO_SRC.findall(content))).hexdigest()
+
+
+class PageValidators:
+    def __init__(self, path=None):
+        self.path = path or cache_dir("rider_images") / "validators.json"
+        self._lock = threading.Lock()
+        try:
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, slug):
+        with self._lock:
+            return self._entries.get(slug)
 
-url = os.environ.get("SUPABASE_URL")
-key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    def put(self, slug, entry):
+        with self._lock:
+            self._entries[slug] = entry
 
-if not url or not key:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries, indent=0, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.path)
 
-supabase: Client = create_client(url, key)
+
+def _get(scraper, url, headers=None):
+    # Known-missing pages (see negative_cache) are answered locally with their cached status.
+    cache = negative_cache()
+    cached = cache.lookup(url) if cache is not None else None
+    if cached is not None:
+        METRICS.incr("http_suppressed")
+        return SimpleNamespace(status_code=cached, text="", content=b"")
+    t0 = time.perf_counter()
+    res = scraper.get(url, headers=headers or {})
+    METRICS.record_http(res.status_code, len(res.content), time.perf_counter() - t0)
+    if cache is not None:
+        cache.record(url, res.status_code)
+    return res
 
 def fetch_riders_needing_update():
     print("Fetching riders from DB...")
@@ -26,11 +80,46 @@ def fetch_riders_needing_update():
     response = supabase.table("riders").select("id, pcs_slug, rider_name, photo_url").is_("photo_url", "null").order("id").execute()
     return response.data
 
-def get_pcs_image_url(slug):
+def fetch_all_riders():
+    print("Fetching all riders from DB...")
+    riders = []
+    limit = 1000
+    while True:
+        batch = (
+            supabase.table("riders")
+            .select("id, pcs_slug, rider_name, photo_url")
+            .not_.is_("pcs_slug", "null")
+            .order("id")
+            .range(len(riders), len(riders) + limit - 1)
+            .execute()
+            .data
+            or []
+        )
+        riders.extend(batch)
+        if len(batch) < limit:
+            return riders
+
+def _conditional_headers(known):
+    headers = {}
+    if known and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known and known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+def get_pcs_image_url(slug, known=None):
+    """
+    Fetch a rider page and pick its photo.
+    Returns (changed, img_url, validators), or None when the page could not be fetched.
+    With `known` validators from a previous run, an unchanged page (304, or same photo
+    block hash) is not parsed: (False, None, validators).
+    """
     if not slug:
         return None
     
-    if not slug.startswith("rider/"):
+    if known and known.get("url"):
+        pcs_url = known["url"]
+    elif not slug.startswith("rider/"):
         pcs_url = f"https://www.procyclingstats.com/rider/{slug}"
     else:
         pcs_url = f"https://www.procyclingstats.com/{slug}"
@@ -41,8 +130,10 @@ def get_pcs_image_url(slug):
         
         # Create scraper per thread to avoid issues
         local_scraper = cloudscraper.create_scraper()
-        res = local_scraper.get(pcs_url)
-        
+        res = _get(local_scraper, pcs_url, _conditional_headers(known))
+        if res.status_code == 304:
+            METRICS.incr("photo_not_modified")
+            return False, None, {**known, "checked_at": int(time.time())}
         
         # If 404 or failed, try searching for the rider
         if res.status_code == 404:
@@ -50,20 +141,32 @@ def get_pcs_image_url(slug):
              clean_slug = slug.replace("rider/", "").split("/")[-1]
              # Search on PCS
              search_url = f"https://www.procyclingstats.com/search.php?term={clean_slug}"
-             res_search = local_scraper.get(search_url)
+             res_search = _get(local_scraper, search_url)
              if res_search.status_code == 200:
                  search_soup = BeautifulSoup(res_search.text, 'html.parser')
                  # Find first result
                  first_link = search_soup.select_one("ul.list a")
                  if first_link and first_link.get("href"):
-                     new_url = f"https://www.procyclingstats.com/{first_link['href']}"
-                     print(f"[{slug}] Redirecting to {new_url}")
-                     res = local_scraper.get(new_url)
+                     pcs_url = f"https://www.procyclingstats.com/{first_link['href']}"
+                     print(f"[{slug}] Redirecting to {pcs_url}")
+                     res = _get(local_scraper, pcs_url)
 
         
         if res.status_code != 200:
             return None
+
+        validators = {
+            "url": pcs_url,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "photo_hash": photo_block_hash(res.content),
+            "checked_at": int(time.time()),
+        }
+        if known and known.get("photo_hash") == validators["photo_hash"]:
+            METRICS.incr("photo_unchanged")
+            return False, None, validators
             
+        METRICS.incr("photo_parsed")
         soup = BeautifulSoup(res.text, 'html.parser')
         
         # Heuristic: Find any image looking like a rider photo
@@ -86,49 +189,70 @@ def get_pcs_image_url(slug):
         if not best_src and candidates:
             best_src = candidates[0]
 
-        if best_src:
-             if best_src.startswith("http"): return best_src
-             return f"https://www.procyclingstats.com/{best_src}"
+        if best_src and not best_src.startswith("http"):
+            best_src = f"https://www.procyclingstats.com/{best_src}"
+        return True, best_src, validators
 
     except Exception as e:
         print(f"[{slug}] Error: {e}")
         return None
-    
-    return None
 
-def process_rider(rider):
+def process_rider(rider, validators, refresh=False):
     slug = rider.get("pcs_slug")
     if not slug:
         return False
 
-    img_url = get_pcs_image_url(slug)
-    if img_url:
+    fetched = get_pcs_image_url(slug, validators.get(slug) if refresh else None)
+    if fetched is None:
+        return False
+    changed, img_url, page_validators = fetched
+    # Validators are stored only once the page's photo is in the DB: after a failed
+    # update, the next --refresh must not get a 304 and skip the page.
+    if changed and img_url:
         print(f"[{slug}] Found: {img_url}")
-        # Update even if it exists, to ensure we have the best one? 
-        # Or only if different? Let's update if different.
+        # Only write when the photo actually differs from the stored one.
         if img_url != rider.get("photo_url"):
             try:
                 supabase.table("riders").update({"photo_url": img_url}).eq("id", rider["id"]).execute()
-                print(f"Updated {rider['rider_name']}")
-                return True
             except Exception as e:
                 print(f"Error updating {rider['rider_name']}: {e}")
-    
+                return False
+            validators.put(slug, page_validators)
+            print(f"Updated {rider['rider_name']}")
+            return True
+    validators.put(slug, page_validators)
     return False
 
-def main():
-    riders = fetch_riders_needing_update()
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fill missing rider photos from PCS.")
+    ap.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate every rider's photo; only changed pages are re-parsed and updated.",
+    )
+    args = ap.parse_args(argv)
+    riders = fetch_all_riders() if args.refresh else fetch_riders_needing_update()
+    validators = PageValidators()
     print(f"Found {len(riders)} riders. Starting threads...")
     
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = [executor.submit(process_rider, rider) for rider in riders]
-        
-        count = 0
-        for future in as_completed(futures):
-            if future.result():
-                count += 1
+    try:
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(process_rider, rider, validators, args.refresh) for rider in riders]
+            
+            count = 0
+            for future in as_completed(futures):
+                if future.result():
+                    count += 1
+    finally:
+        validators.save()
             
-    print(f"Finished. Updated {count} riders.")
+    c = METRICS.counters
+    print(
+        f"Finished. Updated {count} riders "
+        f"(parsed={c.get('photo_parsed', 0)} unchanged={c.get('photo_unchanged', 0)} "
+        f"not_modified={c.get('photo_not_modified', 0)})."
+    )
 
 if __name__ == "__main__":
-    main()
+    with job_lease("fetch_rider_images"), run_report("fetch_rider_images"):
+        main()
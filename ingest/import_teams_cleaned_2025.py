@@ -9,8 +9,12 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable
 
+from .lease import job_lease
+from .metrics import run_report
+from .name_index import RiderNameIndex
+from .ownership import refresh_rider_ownership
 from .supabase_client import get_supabase
-from .pcs_http import fetch_pcs_html
+from .pcs_http import fetch_pcs_bytes, fetch_pcs_html
 from .pcs_parse import parse_rankings_php_uci_one_day
 
 
@@ -39,8 +43,9 @@ class TeamRow:
     team_name: str
     owner: str
     slot: int
-    rider_slug: str
+    rider_slug: str  # "" when the CSV only has original_name (resolved by the name index)
     price_hint: int
+    original_name: str = ""
 
 
 def _read_csv_rows(path: str) -> list[TeamRow]:
@@ -55,8 +60,9 @@ def _read_csv_rows(path: str) -> list[TeamRow]:
             owner = (r.get("owner") or "").strip()
             pos = (r.get("position") or "").strip()
             rider = (r.get("standardized_rider") or "").strip()
+            original_name = (r.get("original_name") or "").strip()
             pts = (r.get("points") or "").strip()
-            if not team_name or not owner or not pos or not rider:
+            if not team_name or not owner or not pos or not (rider or original_name):
                 continue
             try:
                 slot = int(float(pos))
@@ -66,10 +72,47 @@ def _read_csv_rows(path: str) -> list[TeamRow]:
                 price_hint = int(float(pts)) if pts != "" else 0
             except Exception:
                 price_hint = 0
-            rows.append(TeamRow(team_name=team_name, owner=owner, slot=slot, rider_slug=rider, price_hint=price_hint))
+            rows.append(
+                TeamRow(
+                    team_name=team_name,
+                    owner=owner,
+                    slot=slot,
+                    rider_slug=rider,
+                    price_hint=price_hint,
+                    original_name=original_name,
+                )
+            )
     return rows
 
 
+def _auto_map_riders(sb, rows: list[TeamRow], rider_id_by_slug: dict[str, str], min_confidence: float) -> int:
+    """
+    Resolve rows whose rider slug is blank or unknown from their original_name with the
+    fuzzy name index. Confident matches rewrite `rider_slug` in place; ambiguous names are
+    reported with their best candidates and left unresolved. Returns the mapped row count.
+    """
+    index = RiderNameIndex.from_db(sb, min_score=min_confidence)
+    print(f"[map] name index: {len(index)} riders")
+    matches = {}
+    mapped = 0
+    for r in rows:
+        raw = r.original_name or r.rider_slug
+        if raw not in matches:
+            m = index.resolve(raw)
+            matches[raw] = m
+            if m.ambiguous:
+                shown = ", ".join(f"{slug} ({score})" for slug, score in m.candidates[:3]) or "no candidates"
+                print(f"[map] ambiguous {raw!r}: {shown}")
+            else:
+                print(f"[map] {raw!r} -> {m.pcs_slug} ({m.method}, {m.score})")
+        m = matches[raw]
+        if not m.ambiguous:
+            r.rider_slug = m.pcs_slug
+            rider_id_by_slug[m.pcs_slug] = m.rider_id
+            mapped += 1
+    return mapped
+
+
 def _default_rank_date(season_year: int) -> str:
     # Keep this aligned with the date you used to seed prices/riders for 2025.
     if season_year == 2025:
@@ -102,22 +145,19 @@ async def _seed_missing_riders_and_prices(
             "https://www.procyclingstats.com/rankings.php?"
             f"p=uci-one-day-races&s={term}&date={rank_date}&nation=&age=&page=smallerorequal&team=&offset=0&filter=Filter"
         )
-        status, html = await fetch_pcs_html(url)
+        status, html = await fetch_pcs_bytes(url)
         if status != 200:
             continue
         rows = parse_rankings_php_uci_one_day(html)
-        row = next((r for r in rows if r.get("rider_url") == slug), None)
+        row = next((r for r in rows if r.rider_url == slug), None)
 
         rider_name = None
         team_name = None
         points_int = 0
         if row:
-            rider_name = row.get("rider_name")
-            team_name = row.get("team_name")
-            try:
-                points_int = int(row.get("points") or 0)
-            except Exception:
-                points_int = 0
+            rider_name = row.rider_name
+            team_name = row.team_name
+            points_int = row.points
 
         # If ranking search didn’t return the exact rider, fall back to scraping rider page name.
         if not rider_name:
@@ -298,7 +338,7 @@ def _compute_totals(sb, season_year: int, rider_ids: list[str]) -> tuple[int, in
     return total_cost, total_points, warnings
 
 
-async def main() -> None:
+async def main(argv: list[str] | None = None) -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--season-year", type=int, default=2025)
     ap.add_argument("--csv", type=str, default="references/teams_cleaned_mapped.csv")
@@ -313,20 +353,20 @@ async def main() -> None:
         help="If riders referenced in CSV are missing from Supabase, fetch from PCS and insert minimal rider + price.",
     )
     ap.add_argument("--rank-date", type=str, default=None, help="Rankings date for price seeding (YYYY-MM-DD).")
-    args = ap.parse_args()
+    ap.add_argument(
+        "--no-auto-map",
+        action="store_true",
+        help="Do not resolve blank or unknown rider slugs from original_name with the fuzzy name index.",
+    )
+    ap.add_argument("--min-confidence", type=float, default=0.65, help="Minimum name-match score for auto-mapping.")
+    args = ap.parse_args(argv)
 
     sb = get_supabase()
     rows = _read_csv_rows(args.csv)
     grouped = _group_teams(rows)
 
     # Resolve rider_id by pcs_slug for all riders referenced in CSV
-    slugs = sorted({r.rider_slug for r in rows})
-    # For pricing fallback only: take the maximum provided hint per slug (safe if repeated).
-    price_hint_by_slug: dict[str, int] = {}
-    for r in rows:
-        cur = price_hint_by_slug.get(r.rider_slug, 0)
-        if r.price_hint > cur:
-            price_hint_by_slug[r.rider_slug] = r.price_hint
+    slugs = sorted({r.rider_slug for r in rows if r.rider_slug})
     rider_id_by_slug: dict[str, str] = {}
     for batch in _chunk(slugs, 200):
         found = sb.table("riders").select("id, pcs_slug").in_("pcs_slug", batch).execute().data or []
@@ -343,7 +383,21 @@ async def main() -> None:
             found = sb.table("riders").select("id, pcs_slug").in_("pcs_slug", batch).execute().data or []
             for r in found:
                 rider_id_by_slug[str(r["pcs_slug"])] = str(r["id"])
-        missing_slugs = [s for s in slugs if s not in rider_id_by_slug]
+
+    # Blank slugs, and slugs still unknown after seeding, are resolved by name.
+    unresolved = [r for r in rows if r.rider_slug not in rider_id_by_slug]
+    if unresolved and not args.no_auto_map:
+        mapped = _auto_map_riders(sb, unresolved, rider_id_by_slug, args.min_confidence)
+        print(f"[map] auto-mapped {mapped}/{len(unresolved)} rows")
+    slugs = sorted({r.rider_slug for r in rows if r.rider_slug in rider_id_by_slug})
+    missing_slugs = sorted({r.rider_slug or r.original_name for r in rows if r.rider_slug not in rider_id_by_slug})
+
+    # For pricing fallback only: take the maximum provided hint per slug (safe if repeated).
+    price_hint_by_slug: dict[str, int] = {}
+    for r in rows:
+        cur = price_hint_by_slug.get(r.rider_slug, 0)
+        if r.price_hint > cur:
+            price_hint_by_slug[r.rider_slug] = r.price_hint
 
     if missing_slugs:
         print(f"Missing riders in Supabase (by pcs_slug): {len(missing_slugs)}")
@@ -430,15 +484,22 @@ async def main() -> None:
             sb.table("teams").update({"total_cost": total_cost, "points": total_points}).eq("id", team_id).execute()
         created += 1
 
+    # Rosters changed: rebuild the rider -> teams ownership index for the season.
+    owned_riders = 0
+    if not args.dry_run:
+        owned_riders = len(refresh_rider_ownership(sb, args.season_year))
+
     print(
         f"teams_processed={len(grouped)} created_or_updated={created} "
-        f"skipped_existing={skipped_existing} teams_with_warnings={warnings_count} dry_run={args.dry_run}"
+        f"skipped_existing={skipped_existing} teams_with_warnings={warnings_count} owned_riders={owned_riders} "
+        f"dry_run={args.dry_run}"
     )
 
 
 if __name__ == "__main__":
     import asyncio
 
-    asyncio.run(main())
+    with job_lease("import_teams"), run_report("import_teams"):
+        asyncio.run(main())
 
 
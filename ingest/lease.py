@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+from .metrics import METRICS
+
+# Run lease: keeps two ingestion runs from overlapping (e.g. a cron-triggered daily_sync
+# starting while the previous one is still fetching).
+#
+# The lease is a row of `job_leases` (supabase/schema.sql), taken and renewed through the
+# acquire/renew/release_job_lease functions, so it works across hosts. The holder renews it
+# from a background thread every TTL/3; a crashed holder stops renewing and its lease
+# expires after at most MEGABIKE_LEASE_TTL seconds (default 600). A run that finds the
+# lease taken waits up to MEGABIKE_LEASE_WAIT seconds (default 0) and then exits with
+# EXIT_BUSY. A holder that could not renew within the TTL, or finds the lease taken over,
+# has lost it: from then on every DB write of the run raises LeaseLost (a write guard on
+# the instrumented client), so it stops instead of racing the new holder.
+# Race-day watching (`daily_sync --watch`, running until evening) holds its own lease,
+# "ingest:watch", for the day, and takes the main lease only around each store and
+# recompute: the scheduled jobs still run between two updates, but never write next to one.
+# A watcher that cannot get the main lease within --watch-lease-wait retries at its next poll.
+# Sharded daily_sync runs (`--shard i/n`) each take their own lease, "ingest:shard-i-of-n",
+# so shards run side by side while an overrunning shard still blocks its next run. Shards
+# and main-lease jobs exclude each other through conflicting leases (lease_spec): a shard
+# does not start while the main lease is held, and other jobs do not start while a shard
+# lease is live. The finalize step takes the main lease and waits for the shards itself.
+# MEGABIKE_LEASE=0 disables the lease (e.g. a database without the job_leases table).
+
+LEASE_NAME = "ingest"
+WATCH_LEASE_NAME = f"{LEASE_NAME}:watch"
+SHARD_LEASES = f"{LEASE_NAME}:shard-*"
+LEASE_TTL_SECONDS = int(os.getenv("MEGABIKE_LEASE_TTL", "600"))
+LEASE_WAIT_SECONDS = float(os.getenv("MEGABIKE_LEASE_WAIT", "0"))
+POLL_SECONDS = 5.0
+EXIT_BUSY = 75  # EX_TEMPFAIL: cron can tell "skipped, try later" from a failure
+
+
+class LeaseBusy(RuntimeError):
+    def __init__(self, name: str, holder: dict[str, Any]) -> None:
+        super().__init__(
+            f"lease {name!r} is held by {holder.get('holder')} ({holder.get('job')}) until {holder.get('expires_at')}"
+        )
+        self.holder = holder
+
+
+class LeaseLost(RuntimeError):
+    pass
+
+
+def lease_enabled() -> bool:
+    return os.getenv("MEGABIKE_LEASE", "1") != "0"
+
+
+def lease_spec(argv: list[str]) -> tuple[str, tuple[str, ...]]:
+    """
+    (lease name, patterns of leases that must not be live) for a job's arguments:
+    a shard's own lease excluding the main one for `--shard i/n`, WATCH_LEASE_NAME for
+    `--watch`, else the main lease excluding the shards (except for `--finalize`, which
+    waits for them).
+    """
+    if "--watch" in argv:
+        return WATCH_LEASE_NAME, ()
+    for i, tok in enumerate(argv):
+        if tok == "--shard" and i + 1 < len(argv):
+            spec = argv[i + 1]
+        elif tok.startswith("--shard="):
+            spec = tok.split("=", 1)[1]
+        else:
+            continue
+        return f"{LEASE_NAME}:shard-{spec.replace('/', '-of-')}", (LEASE_NAME,)
+    return LEASE_NAME, (() if "--finalize" in argv else (SHARD_LEASES,))
+
+
+def active_leases(sb, pattern: str) -> list[dict[str, Any]]:
+    """
+    Unexpired leases whose name matches `pattern` (a name, or a prefix ending in `*`).
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    return (
+        sb.table("job_leases")
+        .select("name, holder, job, expires_at")
+        .like("name", pattern)
+        .gt("expires_at", now)
+        .order("name")
+        .execute()
+        .data
+        or []
+    )
+
+
+def _holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class RunLease:
+    def __init__(self, sb, job: str, name: str = LEASE_NAME, ttl: int = LEASE_TTL_SECONDS) -> None:
+        self.sb = sb
+        self.job = job
+        self.name = name
+        self.ttl = ttl
+        self.holder = _holder_id()
+        self.lost = False
+        self._valid_until = 0.0  # monotonic; past it, another run may hold the lease
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def try_acquire(self) -> dict[str, Any]:
+        """
+        One attempt. Returns the current lease row; we hold it if row["holder"] == self.holder.
+        """
+        params = {"p_name": self.name, "p_holder": self.holder, "p_job": self.job, "p_ttl_seconds": self.ttl}
+        rows = self.sb.rpc("acquire_job_lease", params).execute().data or []
+        return rows[0] if isinstance(rows, list) and rows else (rows or {})
+
+    def acquire(self, wait: float = 0.0) -> None:
+        """
+        Take the lease, polling for up to `wait` seconds. Raises LeaseBusy.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            row = self.try_acquire()
+            if row.get("holder") == self.holder:
+                self._valid_until = time.monotonic() + self.ttl
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                METRICS.incr("lease_busy")
+                raise LeaseBusy(self.name, row)
+            METRICS.incr("lease_waits")
+            time.sleep(min(POLL_SECONDS, remaining))
+        self._thread = threading.Thread(target=self._heartbeat, name=f"lease-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _heartbeat(self) -> None:
+        interval = max(1.0, self.ttl / 3)
+        while not self._stop.wait(interval):
+            renewed_at = time.monotonic()
+            try:
+                ok = self.sb.rpc(
+                    "renew_job_lease", {"p_name": self.name, "p_holder": self.holder, "p_ttl_seconds": self.ttl}
+                ).execute().data
+            except Exception as e:  # transient DB error: retry until the lease would have expired
+                print(f"[lease] renew failed: {e}", file=sys.stderr)
+                if time.monotonic() < self._valid_until:
+                    continue
+                ok = False
+            if not ok:
+                self.lost = True
+                METRICS.incr("lease_lost")
+                print(f"[lease] lost lease {self.name!r}; another run may have taken over", file=sys.stderr)
+                return
+            self._valid_until = renewed_at + self.ttl
+
+    def check(self) -> None:
+        """
+        Raise LeaseLost once the lease was taken over or not renewed within its TTL.
+        """
+        if not self.lost and time.monotonic() >= self._valid_until:
+            self.lost = True
+            METRICS.incr("lease_lost")
+        if self.lost:
+            raise LeaseLost(f"lease {self.name!r} was lost during the run")
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            # Only deletes the row while we still hold it.
+            self.sb.rpc("release_job_lease", {"p_name": self.name, "p_holder": self.holder}).execute()
+        except Exception as e:
+            print(f"[lease] release failed: {e}", file=sys.stderr)
+
+
+@contextmanager
+def job_lease(
+    job: str,
+    wait: float | None = None,
+    name: str = LEASE_NAME,
+    conflicts: tuple[str, ...] | None = None,
+    exit_busy: bool = True,
+) -> Iterator[RunLease | None]:
+    """
+    Hold the ingestion lease around a run. Exits the process with EXIT_BUSY (raises
+    LeaseBusy with `exit_busy=False`) when another run holds it, or a lease matching one
+    of `conflicts` is live, past `wait` seconds (default MEGABIKE_LEASE_WAIT). By default
+    the main lease conflicts with the shards. Nested leases guard writes together.
+    """
+    if conflicts is None:
+        conflicts = (SHARD_LEASES,) if name == LEASE_NAME else ()
+    if not lease_enabled():
+        yield None
+        return
+    from .supabase_client import get_supabase, set_write_guard
+
+    sb = get_supabase()
+    wait = LEASE_WAIT_SECONDS if wait is None else wait
+    deadline = time.monotonic() + wait
+    lease = RunLease(sb, job, name)
+    try:
+        lease.acquire(wait)
+        # Holding our lease meanwhile keeps new conflicting runs from starting.
+        while blockers := [r for pattern in conflicts for r in active_leases(sb, pattern)]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                lease.release()
+                METRICS.incr("lease_busy")
+                raise LeaseBusy(blockers[0]["name"], blockers[0])
+            METRICS.incr("lease_waits")
+            time.sleep(min(POLL_SECONDS, remaining))
+    except LeaseBusy as e:
+        if not exit_busy:
+            raise
+        print(f"[lease] {job}: skipped, {e}", file=sys.stderr)
+        raise SystemExit(EXIT_BUSY) from e
+    outer = set_write_guard(lease.check)
+    if outer is not None:
+        set_write_guard(lambda: (outer(), lease.check()))
+    try:
+        yield lease
+        lease.check()
+    finally:
+        set_write_guard(outer)
+        lease.release()
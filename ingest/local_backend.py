@@ -0,0 +1,666 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from .utils import chunked
+
+# Local stand-in for the Supabase/PostgREST backend, for running and timing the
+# ingestion jobs offline:
+#
+#   MEGABIKE_LOCAL_DB=.cache/local.sqlite3 python -m ingest.daily_sync ...
+#
+# `get_supabase()` returns a `LocalClient` when MEGABIKE_LOCAL_DB is set. Tables are
+# created in SQLite from supabase/schema.sql (types mapped, uuid/now() defaults and the
+# updated_at triggers emulated in Python). The query builder implements the subset of
+# supabase-py the jobs use: select (with many-to-one / one-to-many embeds), insert,
+# upsert(on_conflict), update, delete, eq/neq/gt/gte/lt/lte/like/ilike/in_/is_, not_,
+# order, limit, range, single/maybe_single, count="exact", and rpc via `register_rpc`.
+# Like PostgREST, a select returns at most `max_rows` (1000) rows per request.
+#
+# Seed scaled data with:
+#
+#   python -m ingest.local_backend --db .cache/local.sqlite3 seed --riders 5000 --teams 500
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "supabase" / "schema.sql"
+MAX_ROWS = 1000
+
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+
+class LocalAPIError(RuntimeError):
+    pass
+
+
+@dataclass
+class _Column:
+    name: str
+    kind: str  # text | int | float | bool | json
+    uuid_default: bool = False
+
+
+@dataclass
+class _Table:
+    name: str
+    columns: dict[str, _Column]
+    primary_key: tuple[str, ...]
+    references: dict[str, str] = field(default_factory=dict)  # column -> referenced table
+    touch_updated_at: bool = False
+    unique: set[str] = field(default_factory=set)  # columns unique on their own
+
+
+def _split_top_level(s: str) -> list[str]:
+    parts, depth, cur = [], 0, []
+    for ch in s:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(cur).strip())
+            cur = []
+        else:
+            cur.append(ch)
+    if "".join(cur).strip():
+        parts.append("".join(cur).strip())
+    return parts
+
+
+def _column_sql(item: str) -> tuple[str, _Column, str | None]:
+    """
+    Translate one Postgres column definition to SQLite.
+    Returns (sql, column, referenced_table).
+    """
+    name, pg_type, rest = (item.split(None, 2) + [""])[:3]
+    pg_type = pg_type.lower()
+    if pg_type.endswith("[]") or pg_type in ("jsonb", "json"):
+        sql_type, kind = "TEXT", "json"
+        rest = rest.replace("'{}'", "'[]'")
+    elif pg_type == "boolean":
+        sql_type, kind = "INTEGER", "bool"
+        rest = re.sub(r"default (true|false)", lambda m: f"default {int(m.group(1) == 'true')}", rest)
+    elif pg_type in ("int", "integer", "bigint", "smallint"):
+        sql_type, kind = "INTEGER", "int"
+    elif pg_type.startswith("numeric") or pg_type in ("real", "double"):
+        sql_type, kind = "REAL", "float"
+    else:
+        sql_type, kind = "TEXT", "text"
+    uuid_default = "gen_random_uuid()" in rest
+    rest = rest.replace("default gen_random_uuid()", "")
+    rest = rest.replace("default now()", f"default ({_NOW_SQL})")
+    rest = rest.replace("public.", "")
+    ref = re.search(r"references (\w+)\(", rest)
+    return f"{name} {sql_type} {rest}".strip(), _Column(name, kind, uuid_default), ref.group(1) if ref else None
+
+
+def load_schema(sql: str) -> tuple[list[str], dict[str, _Table]]:
+    """
+    Parse `create table` statements from schema.sql into SQLite DDL and table metadata.
+    Functions, triggers, extensions and indexes (gin/trgm) are not translated.
+    """
+    ddl: list[str] = []
+    tables: dict[str, _Table] = {}
+    touched = set(re.findall(r"before update on public\.(\w+)\s+for each row execute function public\.set_updated_at", sql))
+    for m in re.finditer(r"create table if not exists public\.(\w+)\s*\((.*?)\n\);", sql, re.S):
+        name, body = m.group(1), m.group(2)
+        body = re.sub(r"--[^\n]*", "", body)
+        items, columns, refs, pk, unique = [], {}, {}, (), set()
+        for item in _split_top_level(body):
+            head = item.split(None, 1)[0].lower()
+            if head in ("primary", "unique", "check", "foreign", "constraint"):
+                cols = tuple(c.strip() for c in item[item.index("(") + 1 : item.index(")")].split(",")) if "(" in item else ()
+                if head == "primary":
+                    pk = cols
+                if head in ("primary", "unique") and len(cols) == 1:
+                    unique.add(cols[0])
+                items.append(item.replace("public.", ""))
+                continue
+            sql_item, col, ref = _column_sql(item)
+            columns[col.name] = col
+            if ref:
+                refs[col.name] = ref
+            if "primary key" in item.lower():
+                pk = (col.name,)
+            if re.search(r"\b(primary key|unique)\b", item.lower()):
+                unique.add(col.name)
+            items.append(sql_item)
+        ddl.append(f"create table if not exists {name} (\n  " + ",\n  ".join(items) + "\n)")
+        tables[name] = _Table(name, columns, pk, refs, name in touched, unique)
+    return ddl, tables
+
+
+@dataclass
+class APIResponse:
+    data: Any
+    count: int | None = None
+
+
+# rpc functions: fn(client, **params) -> data. Registered with @register_rpc("name").
+_RPC: dict[str, Callable[..., Any]] = {}
+
+
+def register_rpc(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def deco(fn: Callable[..., Any]) -> Callable[..., Any]:
+        _RPC[name] = fn
+        return fn
+
+    return deco
+
+
+class _Rpc:
+    def __init__(self, client: "LocalClient", fn: str, params: dict[str, Any]) -> None:
+        self._client, self._fn, self._params = client, fn, params
+
+    def execute(self) -> APIResponse:
+        if self._fn not in _RPC:
+            raise LocalAPIError(f"Could not find the function public.{self._fn}")
+        with self._client.lock:
+            return APIResponse(_RPC[self._fn](self._client, **self._params))
+
+
+_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class LocalQuery:
+    def __init__(self, client: "LocalClient", table: str) -> None:
+        if table not in client.tables:
+            raise LocalAPIError(f"relation public.{table} does not exist")
+        self._c = client
+        self._t = client.tables[table]
+        self._verb = "select"
+        self._columns = "*"
+        self._count: str | None = None
+        self._payload: Any = None
+        self._on_conflict = ""
+        self._ignore_duplicates = False
+        self._where: list[tuple[str, list[Any]]] = []
+        self._order: list[str] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single: str | None = None
+        self._negate = False
+
+    # --- verbs ---------------------------------------------------------------
+    def select(self, columns: str = "*", count: str | None = None) -> "LocalQuery":
+        self._columns, self._count = columns, count
+        return self
+
+    def insert(self, rows: Any, **kwargs: Any) -> "LocalQuery":
+        self._verb, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "", ignore_duplicates: bool = False, **kwargs: Any) -> "LocalQuery":
+        self._verb, self._payload = "upsert", rows
+        self._on_conflict, self._ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: dict[str, Any], **kwargs: Any) -> "LocalQuery":
+        self._verb, self._payload = "update", values
+        return self
+
+    def delete(self, **kwargs: Any) -> "LocalQuery":
+        self._verb = "delete"
+        return self
+
+    # --- filters ---------------------------------------------------------------
+    def _col(self, column: str) -> str:
+        if column not in self._t.columns:
+            raise LocalAPIError(f"column {self._t.name}.{column} does not exist")
+        return column
+
+    def _filter(self, sql: str, params: list[Any]) -> "LocalQuery":
+        if self._negate:
+            sql, self._negate = f"NOT ({sql})", False
+        self._where.append((sql, params))
+        return self
+
+    @property
+    def not_(self) -> "LocalQuery":
+        self._negate = True
+        return self
+
+    def _cmp(self, op: str, column: str, value: Any) -> "LocalQuery":
+        return self._filter(f"{self._col(column)} {_OPS[op]} ?", [self._c.to_db(self._t, column, value)])
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._cmp("lte", column, value)
+
+    def like(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(f"{self._col(column)} LIKE ?", [pattern.replace("*", "%")])
+
+    def ilike(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(f"lower({self._col(column)}) LIKE lower(?)", [pattern.replace("*", "%")])
+
+    def in_(self, column: str, values: Any) -> "LocalQuery":
+        values = [self._c.to_db(self._t, column, v) for v in values]
+        if not values:
+            return self._filter("0", [])
+        return self._filter(f"{self._col(column)} IN ({','.join('?' * len(values))})", values)
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        lit = {None: "NULL", "null": "NULL", True: "1", "true": "1", False: "0", "false": "0"}[value]
+        return self._filter(f"{self._col(column)} IS {lit}", [])
+
+    # --- modifiers --------------------------------------------------------------
+    def order(self, column: str, desc: bool = False, nullsfirst: bool | None = None, **kwargs: Any) -> "LocalQuery":
+        nulls = "" if nullsfirst is None else (" NULLS FIRST" if nullsfirst else " NULLS LAST")
+        self._order.append(f"{self._col(column)} {'DESC' if desc else 'ASC'}{nulls}")
+        return self
+
+    def limit(self, size: int, **kwargs: Any) -> "LocalQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs: Any) -> "LocalQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "LocalQuery":
+        self._single = "single"
+        return self
+
+    def maybe_single(self) -> "LocalQuery":
+        self._single = "maybe"
+        return self
+
+    # --- execution -------------------------------------------------------------
+    def _where_sql(self) -> tuple[str, list[Any]]:
+        if not self._where:
+            return "", []
+        params: list[Any] = []
+        for _, p in self._where:
+            params.extend(p)
+        return " WHERE " + " AND ".join(f"({s})" for s, _ in self._where), params
+
+    def execute(self) -> APIResponse:
+        with self._c.lock:
+            if self._verb == "select":
+                rows, count = self._run_select()
+            elif self._verb in ("insert", "upsert"):
+                rows, count = self._run_write(), None
+            elif self._verb == "update":
+                rows, count = self._run_update(), None
+            else:
+                rows, count = self._run_delete(), None
+        if self._single is None:
+            return APIResponse(rows, count)
+        if len(rows) == 1:
+            return APIResponse(rows[0], count)
+        if self._single == "maybe" and not rows:
+            return APIResponse(None, count)
+        raise LocalAPIError(f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+
+    def _run_select(self) -> tuple[list[dict[str, Any]], int | None]:
+        plain, embeds = self._c.parse_columns(self._t, self._columns)
+        needed = set(plain)
+        for rel, _ in embeds:
+            needed.add(self._c.embed_key(self._t, rel)[0])
+        cols = ", ".join(sorted(needed)) or "rowid"
+        where, params = self._where_sql()
+        count = None
+        if self._count:
+            count = self._c.conn.execute(f"SELECT count(*) FROM {self._t.name}{where}", params).fetchone()[0]
+        sql = f"SELECT {cols} FROM {self._t.name}{where}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        limit = min(self._limit, self._c.max_rows) if self._limit is not None else self._c.max_rows
+        sql += f" LIMIT {int(limit)} OFFSET {int(self._offset)}"
+        rows = [self._c.from_db(self._t, dict(r)) for r in self._c.conn.execute(sql, params)]
+        for rel, rel_cols in embeds:
+            self._c.attach_embed(self._t, rows, rel, rel_cols)
+        for r in rows:
+            for k in needed - set(plain):
+                r.pop(k, None)
+        return rows, count
+
+    def _returning(self, cur: sqlite3.Cursor) -> list[dict[str, Any]]:
+        return [self._c.from_db(self._t, dict(r)) for r in cur.fetchall()]
+
+    def _run_write(self) -> list[dict[str, Any]]:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        target = [c.strip() for c in self._on_conflict.split(",") if c.strip()] or list(self._t.primary_key)
+        out: list[dict[str, Any]] = []
+        conn = self._c.conn
+        conn.execute("BEGIN")
+        try:
+            for row in rows:
+                values = {self._col(k): self._c.to_db(self._t, k, v) for k, v in row.items()}
+                for col in self._t.columns.values():
+                    if col.uuid_default and col.name not in values:
+                        values[col.name] = str(uuid.uuid4())
+                names = list(values)
+                sql = f"INSERT INTO {self._t.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+                if self._verb == "upsert":
+                    updates = [f"{k} = excluded.{k}" for k in row if k not in target]
+                    if self._t.touch_updated_at and "updated_at" not in row:
+                        updates.append(f"updated_at = {_NOW_SQL}")
+                    action = "DO NOTHING" if self._ignore_duplicates or not updates else "DO UPDATE SET " + ", ".join(updates)
+                    sql += f" ON CONFLICT ({', '.join(target)}) {action}"
+                try:
+                    out.extend(self._returning(conn.execute(sql + " RETURNING *", list(values.values()))))
+                except sqlite3.IntegrityError as e:
+                    raise LocalAPIError(f"{self._t.name}: {e}") from e
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return out
+
+    def _run_update(self) -> list[dict[str, Any]]:
+        values = {self._col(k): self._c.to_db(self._t, k, v) for k, v in self._payload.items()}
+        sets = [f"{k} = ?" for k in values]
+        if self._t.touch_updated_at and "updated_at" not in values:
+            sets.append(f"updated_at = {_NOW_SQL}")
+        where, params = self._where_sql()
+        try:
+            cur = self._c.conn.execute(
+                f"UPDATE {self._t.name} SET {', '.join(sets)}{where} RETURNING *", list(values.values()) + params
+            )
+        except sqlite3.IntegrityError as e:
+            raise LocalAPIError(f"{self._t.name}: {e}") from e
+        return self._returning(cur)
+
+    def _run_delete(self) -> list[dict[str, Any]]:
+        where, params = self._where_sql()
+        try:
+            cur = self._c.conn.execute(f"DELETE FROM {self._t.name}{where} RETURNING *", params)
+        except sqlite3.IntegrityError as e:
+            raise LocalAPIError(f"{self._t.name}: {e}") from e
+        return self._returning(cur)
+
+
+class LocalClient:
+    """
+    Drop-in for the supabase-py client (`table`/`from_`/`rpc`) backed by one SQLite file.
+    Safe to share across threads (asyncio.to_thread); statements are serialized.
+    """
+
+    def __init__(self, path: str | Path = ":memory:", schema: Path = SCHEMA_PATH, max_rows: int = MAX_ROWS) -> None:
+        self.path = str(path)
+        self.max_rows = max_rows
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA case_sensitive_like = ON")
+        self.lock = threading.RLock()
+        ddl, self.tables = load_schema(schema.read_text(encoding="utf-8"))
+        for stmt in ddl:
+            self.conn.execute(stmt)
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def from_(self, name: str) -> LocalQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: dict[str, Any] | None = None, **kwargs: Any) -> _Rpc:
+        return _Rpc(self, fn, params or {})
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --- value conversion ---------------------------------------------------------
+    @staticmethod
+    def to_db(table: _Table, column: str, value: Any) -> Any:
+        col = table.columns.get(column)
+        if value is None or col is None:
+            return value
+        if col.kind == "json":
+            return json.dumps(value)
+        if col.kind == "bool":
+            return int(value in (True, 1, "true", "t"))
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def from_db(table: _Table, row: dict[str, Any]) -> dict[str, Any]:
+        for k, v in row.items():
+            col = table.columns.get(k)
+            if v is None or col is None:
+                continue
+            if col.kind == "json":
+                row[k] = json.loads(v)
+            elif col.kind == "bool":
+                row[k] = bool(v)
+            elif col.kind == "float":
+                row[k] = float(v)
+        return row
+
+    # --- select parsing and embeds --------------------------------------------------
+    def parse_columns(self, table: _Table, columns: str) -> tuple[list[str], list[tuple[str, str]]]:
+        plain: list[str] = []
+        embeds: list[tuple[str, str]] = []
+        for part in _split_top_level(columns):
+            m = re.fullmatch(r"(\w+)\s*\((.*)\)", part, re.S)
+            if m:
+                embeds.append((m.group(1), m.group(2)))
+            elif part == "*":
+                plain.extend(table.columns)
+            elif part:
+                if part not in table.columns:
+                    raise LocalAPIError(f"column {table.name}.{part} does not exist")
+                plain.append(part)
+        return plain, embeds
+
+    def embed_key(self, table: _Table, rel: str) -> tuple[str, str, bool]:
+        """
+        (local column, remote column, single) joining `table` to `rel` through a foreign key.
+        `single`: the embed is one object (or null), as PostgREST returns it for a many-to-one
+        FK and for a reverse FK whose column is unique (one-to-one); otherwise a list.
+        """
+        if rel not in self.tables:
+            raise LocalAPIError(f"Could not find a relationship between {table.name} and {rel}")
+        for col, ref in table.references.items():
+            if ref == rel:
+                return col, "id", True
+        for col, ref in self.tables[rel].references.items():
+            if ref == table.name:
+                return table.primary_key[0], col, col in self.tables[rel].unique
+        raise LocalAPIError(f"Could not find a relationship between {table.name} and {rel}")
+
+    def attach_embed(self, table: _Table, rows: list[dict[str, Any]], rel: str, rel_cols: str) -> None:
+        local, remote, single = self.embed_key(table, rel)
+        keys = sorted({r[local] for r in rows if r.get(local) is not None})
+        rel_plain, rel_embeds = self.parse_columns(self.tables[rel], rel_cols)
+        fetch_cols = sorted(set(rel_plain) | {remote})
+        found: dict[Any, list[dict[str, Any]]] = {}
+        for batch in chunked(keys, 500):
+            sql = f"SELECT {', '.join(fetch_cols)} FROM {rel} WHERE {remote} IN ({','.join('?' * len(batch))})"
+            for r in self.conn.execute(sql, batch):
+                r = self.from_db(self.tables[rel], dict(r))
+                found.setdefault(r[remote], []).append(r)
+        nested = [r for rs in found.values() for r in rs]
+        for sub_rel, sub_cols in rel_embeds:
+            self.attach_embed(self.tables[rel], nested, sub_rel, sub_cols)
+        if remote not in rel_plain:
+            for r in nested:
+                r.pop(remote, None)
+        for row in rows:
+            matches = found.get(row.get(local), [])
+            row[rel] = (matches[0] if matches else None) if single else matches
+
+
+# --- schema.sql functions -----------------------------------------------------------
+
+
+@register_rpc("bump_sync_version")
+def _bump_sync_version(sb: LocalClient, p_season_year: int) -> int:
+    row = sb.conn.execute(
+        "INSERT INTO sync_state (season_year, version, updated_at) VALUES (?, 1, " + _NOW_SQL + ") "
+        "ON CONFLICT (season_year) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at "
+        "RETURNING version",
+        [p_season_year],
+    ).fetchone()
+    return int(row[0])
+
+
+
+def _in_seconds(n: int) -> str:
+    return f"strftime('%Y-%m-%dT%H:%M:%fZ', 'now', '+{int(n)} seconds')"
+
+
+@register_rpc("acquire_job_lease")
+def _acquire_job_lease(sb: LocalClient, p_name: str, p_holder: str, p_job: str | None, p_ttl_seconds: int) -> list[dict[str, Any]]:
+    sb.conn.execute(
+        "INSERT INTO job_leases AS l (name, holder, job, acquired_at, heartbeat_at, expires_at) "
+        f"VALUES (?, ?, ?, {_NOW_SQL}, {_NOW_SQL}, {_in_seconds(p_ttl_seconds)}) "
+        "ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, job = excluded.job, "
+        f"acquired_at = CASE WHEN l.holder = excluded.holder THEN l.acquired_at ELSE {_NOW_SQL} END, "
+        f"heartbeat_at = {_NOW_SQL}, expires_at = excluded.expires_at "
+        f"WHERE l.holder = excluded.holder OR l.expires_at < {_NOW_SQL}",
+        [p_name, p_holder, p_job],
+    )
+    return [dict(r) for r in sb.conn.execute("SELECT * FROM job_leases WHERE name = ?", [p_name])]
+
+
+@register_rpc("renew_job_lease")
+def _renew_job_lease(sb: LocalClient, p_name: str, p_holder: str, p_ttl_seconds: int) -> bool:
+    cur = sb.conn.execute(
+        f"UPDATE job_leases SET heartbeat_at = {_NOW_SQL}, expires_at = {_in_seconds(p_ttl_seconds)} "
+        "WHERE name = ? AND holder = ?",
+        [p_name, p_holder],
+    )
+    return cur.rowcount > 0
+
+
+@register_rpc("release_job_lease")
+def _release_job_lease(sb: LocalClient, p_name: str, p_holder: str) -> None:
+    sb.conn.execute("DELETE FROM job_leases WHERE name = ? AND holder = ?", [p_name, p_holder])
+
+
+def connect_local(path: str | Path | None = None) -> LocalClient:
+    return LocalClient(path or os.environ["MEGABIKE_LOCAL_DB"])
+
+
+def seed(
+    sb: LocalClient,
+    season_year: int,
+    n_riders: int,
+    n_teams: int,
+    roster_size: int = 12,
+    n_races: int = 0,
+    results_per_race: int = 175,
+    seed: int = 0,
+) -> dict[str, int]:
+    """
+    Insert synthetic riders/prices/users/teams/rosters (and optionally races with results)
+    at the requested scale. Rider slugs follow the synthetic PCS pages in
+    ingest/benchmarks/pages.py ("rider/rider-<n>"), so offline syncs resolve to them.
+    """
+    rnd = random.Random(seed)
+    riders = [
+        {"pcs_slug": f"rider/rider-{i}", "rider_name": f"RIDER{i} First{i}", "team_name": f"Team {i % 40}", "active": True}
+        for i in range(n_riders)
+    ]
+    for batch in chunked(riders, 500):
+        sb.table("riders").upsert(batch, on_conflict="pcs_slug").execute()
+    rider_ids = [r["id"] for r in _select_all(sb, "riders", "id")]
+    prices = [{"season_year": season_year, "rider_id": rid, "price": rnd.randrange(0, 3000)} for rid in rider_ids]
+    for batch in chunked(prices, 500):
+        sb.table("rider_prices").upsert(batch, on_conflict="season_year,rider_id").execute()
+
+    for t in range(n_teams):
+        code = sb.table("access_codes").upsert({"code": f"LOCAL-{t:05d}"}, on_conflict="code").execute().data[0]
+        user = sb.table("users").upsert(
+            {"access_code_id": code["id"], "display_name": f"Owner {t}"}, on_conflict="access_code_id"
+        ).execute().data[0]
+        team = sb.table("teams").upsert(
+            {"user_id": user["id"], "season_year": season_year, "team_name": f"Team #{t}"}, on_conflict="user_id,season_year"
+        ).execute().data[0]
+        picks = rnd.sample(rider_ids, min(roster_size, len(rider_ids)))
+        sb.table("team_riders").delete().eq("team_id", team["id"]).execute()
+        sb.table("team_riders").insert([{"team_id": team["id"], "slot": i + 1, "rider_id": rid} for i, rid in enumerate(picks)]).execute()
+
+    n_results = 0
+    start = date(season_year, 1, 20)
+    for r in range(n_races):
+        race = sb.table("races").upsert(
+            {
+                "pcs_slug": f"race/local-race-{r}/{season_year}",
+                "name": f"Local race {r}",
+                "race_date": (start + timedelta(days=2 * r)).isoformat(),
+            },
+            on_conflict="pcs_slug",
+        ).execute().data[0]
+        finishers = rnd.sample(rider_ids, min(results_per_race, len(rider_ids)))
+        rows = [
+            {"race_id": race["id"], "rider_id": rid, "rank": i + 1, "points_awarded": max(0, 100 - 5 * i)}
+            for i, rid in enumerate(finishers)
+        ]
+        for batch in chunked(rows, 500):
+            sb.table("race_results").upsert(batch, on_conflict="race_id,rider_id").execute()
+        n_results += len(rows)
+    return {"riders": len(rider_ids), "teams": n_teams, "races": n_races, "race_results": n_results}
+
+
+def _select_all(sb: LocalClient, table: str, columns: str) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    while True:
+        q = sb.table(table).select(columns).order(columns.split(",")[0].strip())
+        page = q.range(len(out), len(out) + sb.max_rows - 1).execute().data
+        out.extend(page)
+        if len(page) < sb.max_rows:
+            return out
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=str, default=None, help="SQLite path (default: $MEGABIKE_LOCAL_DB).")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    init = sub.add_parser("init", help="Create the schema.")
+    init.add_argument("--reset", action="store_true", help="Delete the database file first.")
+    s = sub.add_parser("seed", help="Insert synthetic data at scale.")
+    s.add_argument("--season-year", type=int, default=date.today().year)
+    s.add_argument("--riders", type=int, default=2000)
+    s.add_argument("--teams", type=int, default=200)
+    s.add_argument("--roster-size", type=int, default=12)
+    s.add_argument("--races", type=int, default=0, help="Also insert races with results.")
+    s.add_argument("--results-per-race", type=int, default=175)
+    args = ap.parse_args(argv)
+
+    path = args.db or os.getenv("MEGABIKE_LOCAL_DB")
+    if not path:
+        raise SystemExit("--db or MEGABIKE_LOCAL_DB is required")
+    if args.cmd == "init":
+        if args.reset:
+            for suffix in ("", "-wal", "-shm"):
+                Path(path + suffix).unlink(missing_ok=True)
+        LocalClient(path).close()
+        print(f"initialized {path}")
+        return
+    sb = LocalClient(path)
+    counts = seed(sb, args.season_year, args.riders, args.teams, args.roster_size, args.races, args.results_per_race)
+    print(" ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from .utils import cache_dir
+
+# Run-level instrumentation for the ingestion jobs.
+#
+# One process-wide `METRICS` collector accumulates:
+#   - stage wall time                      (metrics.stage("name"))
+#   - PCS requests / bytes / time by status (pcs_http), and requests suppressed by the
+#     negative cache (counter `http_suppressed`)
+#   - parse rows and time per parser        (pcs_parse, parse_pool)
+#   - DB round trips / rows / time per table and verb (supabase_client wrapper)
+# `run_report(job)` wraps a job's entrypoint and, when it ends, writes a JSON run report
+# and a Prometheus textfile to $MEGABIKE_METRICS_DIR (default: .cache/metrics).
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RunMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.time()
+        self.stages: dict[str, dict[str, float]] = {}
+        self.http: dict[int, dict[str, float]] = {}
+        self.parse: dict[str, dict[str, float]] = {}
+        self.db: dict[tuple[str, str], dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+
+    @staticmethod
+    def _add(bucket: dict, key: Any, **values: float) -> None:
+        cur = bucket.setdefault(key, {})
+        for k, v in values.items():
+            cur[k] = cur.get(k, 0) + v
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - t0)
+
+    def add_stage_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._add(self.stages, name, seconds=seconds, calls=1)
+
+    def record_http(self, status: int, nbytes: int, seconds: float) -> None:
+        with self._lock:
+            self._add(self.http, int(status), requests=1, bytes=nbytes, seconds=seconds)
+
+    def record_parse(self, parser: str, rows: int, seconds: float) -> None:
+        with self._lock:
+            self._add(self.parse, parser, pages=1, rows=rows, seconds=seconds)
+
+    def record_db(self, table: str, verb: str, rows: int, seconds: float) -> None:
+        with self._lock:
+            self._add(self.db, (table, verb), round_trips=1, rows=rows, seconds=seconds)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, job: str, ok: bool = True) -> dict[str, Any]:
+        with self._lock:
+            wall = time.time() - self.started
+            return {
+                "job": job,
+                "ok": ok,
+                "started_at": datetime.utcfromtimestamp(self.started).isoformat(timespec="seconds") + "Z",
+                "wall_seconds": round(wall, 3),
+                "stages": {k: {"seconds": round(v["seconds"], 3), "calls": int(v["calls"])} for k, v in self.stages.items()},
+                "http": {
+                    str(status): {"requests": int(v["requests"]), "bytes": int(v["bytes"]), "seconds": round(v["seconds"], 3)}
+                    for status, v in sorted(self.http.items())
+                },
+                "parse": {
+                    k: {
+                        "pages": int(v["pages"]),
+                        "rows": int(v["rows"]),
+                        "seconds": round(v["seconds"], 4),
+                        "rows_per_sec": round(v["rows"] / v["seconds"], 1) if v["seconds"] else None,
+                    }
+                    for k, v in self.parse.items()
+                },
+                "db": {
+                    f"{table}.{verb}": {"round_trips": int(v["round_trips"]), "rows": int(v["rows"]), "seconds": round(v["seconds"], 3)}
+                    for (table, verb), v in sorted(self.db.items())
+                },
+                "db_round_trips": int(sum(v["round_trips"] for v in self.db.values())),
+                "counters": dict(self.counters),
+            }
+
+    def prometheus(self, job: str, ok: bool = True) -> str:
+        r = self.report(job, ok)
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_: str, samples: list[tuple[dict[str, str], float]]) -> None:
+            lines.append(f"# HELP megabike_{name} {help_}")
+            lines.append(f"# TYPE megabike_{name} {kind}")
+            for labels, value in samples:
+                lbl = ",".join(f'{k}="{v}"' for k, v in {"job": job, **labels}.items())
+                lines.append(f"megabike_{name}{{{lbl}}} {value}")
+
+        metric("run_success", "gauge", "1 if the last run finished without error.", [({}, 1 if ok else 0)])
+        metric("run_timestamp_seconds", "gauge", "Start time of the last run.", [({}, round(self.started, 3))])
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.", [({}, r["wall_seconds"])])
+        metric("stage_seconds", "gauge", "Wall time per stage.", [({"stage": k}, v["seconds"]) for k, v in r["stages"].items()])
+        metric("http_requests", "gauge", "PCS requests by status.", [({"status": k}, v["requests"]) for k, v in r["http"].items()])
+        metric("http_bytes", "gauge", "PCS response bytes by status.", [({"status": k}, v["bytes"]) for k, v in r["http"].items()])
+        metric("parse_rows", "gauge", "Rows parsed per parser.", [({"parser": k}, v["rows"]) for k, v in r["parse"].items()])
+        metric("parse_seconds", "gauge", "Parse time per parser.", [({"parser": k}, v["seconds"]) for k, v in r["parse"].items()])
+        db_samples = [(dict(zip(("table", "verb"), k.split(".", 1))), v) for k, v in r["db"].items()]
+        metric("db_round_trips", "gauge", "Supabase round trips per table and verb.", [(l, v["round_trips"]) for l, v in db_samples])
+        metric("db_rows", "gauge", "Rows returned/written per table and verb.", [(l, v["rows"]) for l, v in db_samples])
+        metric("db_seconds", "gauge", "Supabase time per table and verb.", [(l, v["seconds"]) for l, v in db_samples])
+        metric("counter", "gauge", "Job-specific counters.", [({"name": k}, v) for k, v in r["counters"].items()])
+        return "\n".join(lines) + "\n"
+
+    def write(self, job: str, ok: bool = True, out_dir: Path | None = None) -> Path:
+        """
+        Write `<job>-<timestamp>.json` and `<job>.prom` (replaced atomically for the
+        node_exporter textfile collector). Returns the JSON report path.
+        """
+        out = out_dir or (Path(os.environ["MEGABIKE_METRICS_DIR"]) if os.getenv("MEGABIKE_METRICS_DIR") else cache_dir("metrics"))
+        out.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.utcfromtimestamp(self.started).strftime("%Y%m%dT%H%M%SZ")
+        json_path = out / f"{job}-{stamp}.json"
+        json_path.write_text(json.dumps(self.report(job, ok), indent=2) + "\n", encoding="utf-8")
+        prom_tmp = out / f".{job}.prom.tmp"
+        prom_tmp.write_text(self.prometheus(job, ok), encoding="utf-8")
+        prom_tmp.replace(out / f"{job}.prom")
+        return json_path
+
+
+METRICS = RunMetrics()
+
+
+def timed_parser(name: str) -> Callable[[F], F]:
+    """
+    Decorator for pcs_parse functions: records rows returned and parse time.
+    """
+
+    def deco(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            out = fn(*args, **kwargs)
+            METRICS.record_parse(name, len(out) if hasattr(out, "__len__") else 0, time.perf_counter() - t0)
+            return out
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+@contextmanager
+def run_report(job: str) -> Iterator[RunMetrics]:
+    """
+    Wrap a job's entrypoint; writes the run report even when the job fails.
+    """
+    METRICS.reset()
+    ok = False
+    try:
+        yield METRICS
+        ok = True
+    finally:
+        path = METRICS.write(job, ok)
+        r = METRICS.report(job, ok)
+        suppressed = r["counters"].get("http_suppressed", 0)
+        print(
+            f"[metrics] {job}: wall={r['wall_seconds']}s http={sum(v['requests'] for v in r['http'].values())} "
+            + (f"http_suppressed={suppressed} " if suppressed else "")
+            + f"db_round_trips={r['db_round_trips']} report={path}",
+            flush=True,
+        )
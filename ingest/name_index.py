@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Iterable, NamedTuple
+
+# In-memory fuzzy index over the `riders` table, to resolve raw rider names from team
+# CSVs ("POGACARTadej", "ArnaudDeLie", "Benoot", "Pogačar Tadej") to pcs_slugs.
+#
+# Every rider is indexed under its rider_name and its slug words ("tadej-pogacar"):
+#   - names are folded (accents stripped, ø/æ/ß/... transliterated, casefolded) and split
+#     into tokens, including camel-case boundaries ("ArnaudDeLie" -> arnaud de lie)
+#   - exact keys: sorted tokens (so surname-first and first-name-first both match) and the
+#     compact concatenation in both orders ("deltororomeroisaac")
+#   - surname keys (each token, the name minus its first or last token), for raw names
+#     that are a bare surname ("Benoot", "vanderPoel")
+#   - character trigrams of the compact forms, for misspellings, mangled accents and
+#     missing or extra name parts
+# resolve() tries the exact keys, then a surname key, then ranks trigram candidates by
+# Dice and by how much of the raw name they contain. Initials ("T.Benoot") only filter.
+# A match is `ambiguous` when its score is under `min_score` or the runner-up is within
+# `margin`.
+
+_TRANSLIT = str.maketrans({"ø": "o", "Ø": "O", "æ": "ae", "Æ": "AE", "ß": "ss", "đ": "d", "Đ": "D", "ł": "l", "Ł": "L", "þ": "th"})
+_TOKEN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def fold(text: str) -> str:
+    """
+    ASCII-fold `text` while keeping its case (camel-case boundaries are still needed).
+    """
+    decomposed = unicodedata.normalize("NFKD", text.translate(_TRANSLIT))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def name_tokens(raw: str) -> list[str]:
+    """
+    Folded lowercase tokens of a raw name or slug: "POGAČARTadej" -> ["pogacar", "tadej"].
+    """
+    raw = raw.rsplit("/", 1)[-1] if raw.startswith("rider/") else raw
+    return [t.lower() for t in _TOKEN.findall(fold(raw))]
+
+
+def _trigrams(compact: str) -> set[str]:
+    padded = f"  {compact} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatch(NamedTuple):
+    raw: str
+    pcs_slug: str | None
+    rider_id: str | None
+    rider_name: str | None
+    score: float
+    method: str  # exact | surname | trigram | none
+    ambiguous: bool
+    candidates: list[tuple[str, float]]  # (pcs_slug, score), best first
+
+
+class _Entry(NamedTuple):
+    rider_id: str
+    pcs_slug: str
+    rider_name: str
+    grams: list[set[str]]  # trigram sets of each indexed compact form
+
+
+class RiderNameIndex:
+    def __init__(self, min_score: float = 0.65, margin: float = 0.15) -> None:
+        self.min_score = min_score
+        self.margin = margin
+        self._entries: list[_Entry] = []
+        self._exact: dict[str, set[int]] = defaultdict(set)
+        self._surname: dict[str, set[int]] = defaultdict(set)
+        self._gram: dict[str, list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, rider_id: str, pcs_slug: str, rider_name: str | None) -> None:
+        i = len(self._entries)
+        forms = [name_tokens(pcs_slug)]
+        if rider_name:
+            forms.append(name_tokens(rider_name))
+        grams: list[set[str]] = []
+        seen: set[str] = set()
+        for tokens in forms:
+            if not tokens:
+                continue
+            self._exact[" ".join(sorted(tokens))].add(i)
+            for compact in ("".join(tokens), "".join(tokens[1:] + tokens[:1])):
+                self._exact[compact].add(i)
+                if compact not in seen:
+                    seen.add(compact)
+                    grams.append(_trigrams(compact))
+            # Surname keys: each token and the name without its first or last token
+            # ("van der poel" for mathieu-van-der-poel, whichever order the name uses).
+            for key in {*tokens, "".join(tokens[1:]), "".join(tokens[:-1])}:
+                if len(key) >= 3:
+                    self._surname[key].add(i)
+        for g in set().union(*grams) if grams else ():
+            self._gram[g].append(i)
+        self._entries.append(_Entry(rider_id, pcs_slug, rider_name or pcs_slug, grams))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]], **kwargs: Any) -> "RiderNameIndex":
+        index = cls(**kwargs)
+        for r in rows:
+            if r.get("id") and r.get("pcs_slug"):
+                index.add(str(r["id"]), str(r["pcs_slug"]), r.get("rider_name"))
+        return index
+
+    @classmethod
+    def from_db(cls, sb, **kwargs: Any) -> "RiderNameIndex":
+        """
+        Index every rider (paged by 1000, the PostgREST row limit).
+        """
+        rows: list[dict[str, Any]] = []
+        limit = 1000
+        while True:
+            batch = (
+                sb.table("riders")
+                .select("id, pcs_slug, rider_name")
+                .order("id")
+                .range(len(rows), len(rows) + limit - 1)
+                .execute()
+                .data
+                or []
+            )
+            rows.extend(batch)
+            if len(batch) < limit:
+                return cls.from_rows(rows, **kwargs)
+
+    def _match(self, raw: str, scored: list[tuple[int, float]], method: str) -> NameMatch:
+        scored.sort(key=lambda x: -x[1])
+        candidates = [(self._entries[i].pcs_slug, round(s, 3)) for i, s in scored[:5]]
+        if not scored:
+            return NameMatch(raw, None, None, None, 0.0, "none", True, [])
+        best, score = scored[0]
+        runner_up = scored[1][1] if len(scored) > 1 else 0.0
+        e = self._entries[best]
+        ambiguous = score < self.min_score or score - runner_up < self.margin
+        return NameMatch(raw, e.pcs_slug, e.rider_id, e.rider_name, round(score, 3), method, ambiguous, candidates)
+
+    def _initials_penalty(self, i: int, initials: list[str]) -> float:
+        names = name_tokens(self._entries[i].pcs_slug)
+        return 1.0 if all(any(t.startswith(c) for t in names) for c in initials) else 0.7
+
+    def resolve(self, raw: str) -> NameMatch:
+        tokens = name_tokens(raw)
+        # Single letters are initials ("T.Benoot"): matched against first letters only.
+        initials = [t for t in tokens if len(t) == 1 and t.isalpha()]
+        tokens = [t for t in tokens if t not in initials] or tokens
+        if not tokens:
+            return NameMatch(raw, None, None, None, 0.0, "none", True, [])
+
+        compact = "".join(tokens)
+        for key in (" ".join(sorted(tokens)), compact):
+            hits = self._exact.get(key)
+            if hits and not initials:
+                return self._match(raw, [(i, 1.0) for i in hits], "exact")
+
+        hits = self._surname.get(compact) if len(compact) >= 3 else None
+        if hits:
+            return self._match(raw, [(i, 0.9 * self._initials_penalty(i, initials)) for i in hits], "surname")
+
+        query = _trigrams(compact)
+        shared: Counter[int] = Counter()
+        for g in query:
+            shared.update(self._gram.get(g, ()))
+        scored: list[tuple[int, float]] = []
+        for i, _ in shared.most_common(20):
+            best = 0.0
+            for grams in self._entries[i].grams:
+                common = len(query & grams)
+                dice = 2 * common / (len(query) + len(grams))
+                # Containment either way: extra legal names on one side ("LANDA MEANA Mikel").
+                containment = common / min(len(query), len(grams))
+                best = max(best, 0.4 * dice + 0.6 * containment)
+            scored.append((i, best * self._initials_penalty(i, initials)))
+        return self._match(raw, scored, "trigram")
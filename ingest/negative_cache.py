@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .utils import cache_dir
+
+# Negative-result cache for PCS requests, persisted across runs.
+#
+# A URL that answered 404/410 is remembered with an expiry, and requests for it are
+# suppressed (answered locally with the cached status) until then:
+#   - race result page with a known future race date: until that date (PCS creates the
+#     page around the race); not cached on race day and the day after (results are
+#     being published); otherwise PCS_NEGATIVE_RACE_TTL_HOURS (default 12)
+#   - rider / search pages: PCS_NEGATIVE_TTL_DAYS (default 7)
+#   - 410 Gone: 30 days
+# Transient failures (403 challenge pages, 429, 5xx) are never cached.
+# The cache lives in .cache/pcs/negative.json; PCS_NEGATIVE_CACHE=0 disables it.
+
+CACHED_STATUSES = (404, 410)
+NEGATIVE_TTL_DAYS = float(os.getenv("PCS_NEGATIVE_TTL_DAYS", "7"))
+NEGATIVE_RACE_TTL_HOURS = float(os.getenv("PCS_NEGATIVE_RACE_TTL_HOURS", "12"))
+
+
+def race_page_expiry(race_date: str | None, now: float | None = None) -> float | None:
+    """
+    Expiry for a missing race result page: the start of `race_date` (UTC) when it is in
+    the future, `now` (= do not cache) on race day and the day after, None (= default
+    expiry) when the date is unknown or older.
+    """
+    if not race_date:
+        return None
+    try:
+        start = datetime.fromisoformat(str(race_date)[:10]).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+    now = now or time.time()
+    if start > now:
+        return start
+    if now < start + 2 * 86400:
+        return now
+    return None
+
+
+def default_expiry(url: str, status: int, now: float | None = None) -> float:
+    now = now or time.time()
+    if status == 410:
+        return now + 30 * 86400
+    path = url.split("procyclingstats.com/", 1)[-1]
+    if path.startswith("race/"):
+        return now + NEGATIVE_RACE_TTL_HOURS * 3600
+    return now + NEGATIVE_TTL_DAYS * 86400
+
+
+class NegativeCache:
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or cache_dir("pcs") / "negative.json"
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=0, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def lookup(self, url: str, now: float | None = None) -> int | None:
+        """
+        Cached status for `url` while its entry is unexpired, else None.
+        """
+        with self._lock:
+            e = self._load().get(url)
+            if e is None or e["expires_at"] <= (now or time.time()):
+                return None
+            return int(e["status"])
+
+    def record(self, url: str, status: int, expires_at: float | None = None) -> None:
+        """
+        Remember a response status: cacheable statuses are stored until `expires_at`
+        (default: `default_expiry`; an expiry not in the future stores nothing), any
+        other status clears the entry.
+        """
+        now = time.time()
+        expires_at = default_expiry(url, status, now) if expires_at is None else expires_at
+        with self._lock:
+            entries = self._load()
+            if status not in CACHED_STATUSES or expires_at <= now:
+                if entries.pop(url, None) is not None:
+                    self._save()
+                return
+            entries[url] = {"status": status, "expires_at": round(expires_at, 1), "at": round(now)}
+            # Drop expired entries while we are rewriting the file anyway.
+            for k in [k for k, v in entries.items() if v["expires_at"] <= now]:
+                del entries[k]
+            self._save()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+_CACHE: NegativeCache | None = None
+
+
+def negative_cache() -> NegativeCache | None:
+    """
+    Process-wide cache, or None when disabled with PCS_NEGATIVE_CACHE=0.
+    """
+    global _CACHE
+    if os.getenv("PCS_NEGATIVE_CACHE", "1") == "0":
+        return None
+    if _CACHE is None:
+        _CACHE = NegativeCache()
+    return _CACHE
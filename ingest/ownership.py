@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from typing import Any, Iterable
+
+from .lease import job_lease
+from .metrics import run_report
+from .supabase_client import get_supabase
+from .utils import chunked, select_in
+
+# Rider -> teams inverted index over `team_riders`, materialized per season in
+# `rider_ownership` (owner count + percentage of the season's teams).
+
+PAGE = 1000
+
+
+def load_team_rosters(sb, season_year: int) -> dict[str, list[str]]:
+    """
+    Returns {team_id: [rider_id, ...]} for every team in the season (empty rosters included).
+    """
+    teams = sb.table("teams").select("id").eq("season_year", season_year).execute().data or []
+    rosters: dict[str, list[str]] = {t["id"]: [] for t in teams if t.get("id")}
+    # Up to 30 slots per team: keep chunks under the PostgREST 1000-row page.
+    for row in select_in(sb, "team_riders", "team_id, rider_id", "team_id", list(rosters), size=30):
+        if row.get("rider_id"):
+            rosters[row["team_id"]].append(row["rider_id"])
+    return rosters
+
+
+def build_ownership_index(rosters: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    Invert {team_id: [rider_id]} into {rider_id: [team_id]} (team ids sorted).
+    """
+    index: dict[str, list[str]] = {}
+    for team_id, rider_ids in rosters.items():
+        for rid in set(rider_ids):
+            index.setdefault(rid, []).append(team_id)
+    for team_ids in index.values():
+        team_ids.sort()
+    return index
+
+
+def teams_owning(index: dict[str, list[str]], rider_ids: Iterable[str]) -> set[str]:
+    """
+    Teams whose roster contains any of `rider_ids` (the teams to recompute after a race).
+    """
+    out: set[str] = set()
+    for rid in rider_ids:
+        out.update(index.get(rid, ()))
+    return out
+
+
+def team_points_from_index(
+    index: dict[str, list[str]],
+    points_by_rider: dict[str, int],
+    team_ids: Iterable[str],
+) -> dict[str, int]:
+    """
+    Sum rider points per team by walking the index once (riders with points only).
+    Teams in `team_ids` without scoring riders get 0.
+    """
+    totals = {tid: 0 for tid in team_ids}
+    for rid, pts in points_by_rider.items():
+        if not pts:
+            continue
+        for tid in index.get(rid, ()):
+            if tid in totals:
+                totals[tid] += int(pts)
+    return totals
+
+
+def ownership_rows(index: dict[str, list[str]], n_teams: int, season_year: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "season_year": season_year,
+            "rider_id": rid,
+            "team_ids": team_ids,
+            "owner_count": len(team_ids),
+            "owner_pct": round(100.0 * len(team_ids) / n_teams, 2) if n_teams else 0,
+        }
+        for rid, team_ids in index.items()
+    ]
+
+
+def load_ownership(sb, season_year: int) -> dict[str, dict[str, Any]]:
+    """
+    Stored `rider_ownership` rows of the season by rider_id (paged).
+    """
+    rows: list[dict[str, Any]] = []
+    while True:
+        batch = (
+            sb.table("rider_ownership")
+            .select("rider_id, team_ids, owner_count, owner_pct")
+            .eq("season_year", season_year)
+            .order("rider_id")
+            .range(len(rows), len(rows) + PAGE - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(batch)
+        if len(batch) < PAGE:
+            return {r["rider_id"]: r for r in rows if r.get("rider_id")}
+
+
+def _same_ownership(row: dict[str, Any], stored: dict[str, Any] | None) -> bool:
+    return (
+        stored is not None
+        and sorted(stored.get("team_ids") or []) == row["team_ids"]
+        and int(stored.get("owner_count") or 0) == row["owner_count"]
+        and float(stored.get("owner_pct") or 0) == float(row["owner_pct"])
+    )
+
+
+def refresh_rider_ownership(
+    sb,
+    season_year: int,
+    rosters: dict[str, list[str]] | None = None,
+) -> dict[str, list[str]]:
+    """
+    Rebuild `rider_ownership` for the season and return the index.
+    Only rows that changed are written; riders no longer owned by any team are removed.
+    """
+    if rosters is None:
+        rosters = load_team_rosters(sb, season_year)
+    index = build_ownership_index(rosters)
+    stored = load_ownership(sb, season_year)
+    rows = [r for r in ownership_rows(index, len(rosters), season_year) if not _same_ownership(r, stored.get(r["rider_id"]))]
+    for batch in chunked(rows, 500):
+        sb.table("rider_ownership").upsert(batch, on_conflict="season_year,rider_id").execute()
+
+    stale = [rid for rid in stored if rid not in index]
+    for batch in chunked(stale, 200):
+        sb.table("rider_ownership").delete().eq("season_year", season_year).in_("rider_id", batch).execute()
+    return index
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
+    args = ap.parse_args(argv)
+
+    sb = get_supabase()
+    rosters = load_team_rosters(sb, args.season_year)
+    index = refresh_rider_ownership(sb, args.season_year, rosters)
+    print(f"teams={len(rosters)} owned_riders={len(index)}")
+
+
+if __name__ == "__main__":
+    with job_lease("ownership"), run_report("ownership"):
+        main()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .metrics import METRICS
+from .utils import cache_dir
+
+# Archive of fetched PCS pages, so parser fixes can be replayed without refetching
+# (see ingest/reparse.py).
+#
+# Every 200 answer for a result page (race/...), the races listing (races.php) or a
+# ranking page (rankings...) is stored gzip-compressed under its SHA-256:
+#   <dir>/objects/ab/abcdef....gz   one file per distinct body (unchanged refetches are free)
+#   <dir>/index.jsonl               {"url", "sha", "at", "bytes"}, appended when a URL's
+#                                   body changes, so a URL can be read back as of any time
+# The directory is .cache/pcs/archive ($PCS_ARCHIVE_DIR overrides); PCS_ARCHIVE=0 disables
+# archiving. Pages served by a page source (offline benchmarks, reparse) are not archived.
+
+PCS_BASE = "https://www.procyclingstats.com/"
+ARCHIVED_PREFIXES = ("race/", "races.php", "rankings")
+
+
+def normalize_url(url: str) -> str:
+    return url if url.startswith("http") else PCS_BASE + url.lstrip("/")
+
+
+def should_archive(url: str) -> bool:
+    return normalize_url(url).removeprefix(PCS_BASE).startswith(ARCHIVED_PREFIXES)
+
+
+class PageArchive:
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or (Path(os.environ["PCS_ARCHIVE_DIR"]) if os.getenv("PCS_ARCHIVE_DIR") else cache_dir("pcs", "archive"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+        self._versions: dict[str, list[tuple[float, str]]] | None = None  # url -> [(at, sha)] by time
+
+    def _object_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / f"{sha}.gz"
+
+    def _load(self) -> dict[str, list[tuple[float, str]]]:
+        if self._versions is None:
+            self._versions = {}
+            try:
+                with self.index_path.open(encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            e = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line after a crash
+                        self._versions.setdefault(e["url"], []).append((float(e["at"]), e["sha"]))
+            except OSError:
+                pass
+            for versions in self._versions.values():
+                versions.sort()
+        return self._versions
+
+    def put(self, url: str, body: bytes, at: float | None = None) -> str:
+        """
+        Store `body` as the current version of `url`. Returns its SHA-256.
+        """
+        url = normalize_url(url)
+        sha = hashlib.sha256(body).hexdigest()
+        at = at or time.time()
+        with self._lock:
+            versions = self._load().setdefault(url, [])
+            if versions and versions[-1][1] == sha:
+                METRICS.incr("archive_unchanged")
+                return sha
+            path = self._object_path(sha)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(gzip.compress(body, compresslevel=6, mtime=0))
+                tmp.replace(path)
+                METRICS.incr("archive_objects")
+            with self.index_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"url": url, "sha": sha, "at": round(at, 3), "bytes": len(body)}) + "\n")
+            versions.append((at, sha))
+            METRICS.incr("archive_versions")
+            return sha
+
+    def get(self, url: str, as_of: float | None = None) -> bytes | None:
+        """
+        Latest archived body of `url` fetched at or before `as_of` (default: latest), or None.
+        """
+        with self._lock:
+            versions = self._load().get(normalize_url(url)) or []
+        found = [sha for at, sha in versions if as_of is None or at <= as_of]
+        if not found:
+            return None
+        try:
+            return gzip.decompress(self._object_path(found[-1]).read_bytes())
+        except OSError:
+            return None
+
+    def urls(self) -> list[str]:
+        with self._lock:
+            return sorted(self._load())
+
+    def page_source(self, as_of: float | None = None):
+        """
+        A pcs_http page source serving archived pages (404 for pages not in the archive).
+        """
+
+        async def source(url: str) -> tuple[int, bytes]:
+            body = self.get(url, as_of)
+            if body is None:
+                METRICS.incr("archive_misses")
+                return 404, b""
+            METRICS.incr("archive_hits")
+            return 200, body
+
+        return source
+
+    def stats(self) -> dict[str, Any]:
+        objects = list((self.root / "objects").glob("*/*.gz"))
+        with self._lock:
+            versions = self._load()
+        return {
+            "urls": len(versions),
+            "versions": sum(len(v) for v in versions.values()),
+            "objects": len(objects),
+            "stored_bytes": sum(p.stat().st_size for p in objects),
+        }
+
+
+_ARCHIVE: PageArchive | None = None
+
+
+def page_archive() -> PageArchive | None:
+    """
+    Process-wide archive, or None when disabled with PCS_ARCHIVE=0.
+    """
+    global _ARCHIVE
+    if os.getenv("PCS_ARCHIVE", "1") == "0":
+        return None
+    if _ARCHIVE is None:
+        _ARCHIVE = PageArchive()
+    return _ARCHIVE
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Inspect the PCS page archive.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Count archived URLs, versions and stored bytes.")
+    cat = sub.add_parser("cat", help="Write an archived page to stdout.")
+    cat.add_argument("url")
+    cat.add_argument("--as-of", type=float, default=None, help="Unix time; default the latest version.")
+    args = ap.parse_args(argv)
+
+    archive = PageArchive()
+    if args.cmd == "stats":
+        print(" ".join(f"{k}={v}" for k, v in archive.stats().items()))
+        return
+    body = archive.get(args.url, args.as_of)
+    if body is None:
+        raise SystemExit(f"not archived: {args.url}")
+    sys.stdout.buffer.write(body)
+
+
+if __name__ == "__main__":
+    main()
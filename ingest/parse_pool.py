@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .metrics import METRICS
+from .pcs_parse import (
+    parse_race_details,
+    parse_race_result_table,
+    parse_rankings_php_uci_one_day,
+    parse_rider_ranking_table,
+)
+from .records import RankingRow, ResultRow
+
+# Optional process pool for selectolax parsing during bulk runs (multi-season backfills).
+#
+# Parsing runs on the event loop thread by default, which is fine for a handful of
+# pages. Above `threshold` pages per batch, pages are shipped to worker processes as
+# raw bytes and come back as record tuples (see records.py), so parsing scales across cores and
+# the event loop stays free for I/O.
+
+PARSE_POOL_THRESHOLD = int(os.getenv("PCS_PARSE_POOL_THRESHOLD", "16"))
+
+
+def _page_title(html: str | bytes) -> str | None:
+    from selectolax.parser import HTMLParser
+
+    h1 = HTMLParser(html).css_first(".page-title h1")
+    return " ".join(h1.text().split()) if h1 is not None else None
+
+
+def parse_result_page(html: str | bytes) -> tuple[str | None, str | None, list[ResultRow]]:
+    """
+    Everything daily_sync needs from a results page in one pass: (title, startdate, rows).
+    """
+    return _page_title(html), parse_race_details(html).get("startdate"), parse_race_result_table(html)
+
+
+def parse_ranking_page(html: str | bytes, rankings_php: bool = True) -> list[RankingRow]:
+    return parse_rankings_php_uci_one_day(html) if rankings_php else parse_rider_ranking_table(html)
+
+
+_KINDS = {
+    "result_page": parse_result_page,
+    "ranking_page": parse_ranking_page,
+}
+
+
+def _parse_worker(kind: str, payload: bytes, *args: Any) -> Any:
+    return _KINDS[kind](payload, *args)
+
+
+class ParseExecutor:
+    """
+    Runs parse jobs inline, or in a process pool when `use_pool` is set.
+    Use `ParseExecutor.for_batch(n)` to enable the pool automatically for large batches.
+    """
+
+    def __init__(self, use_pool: bool = False, max_workers: int | None = None) -> None:
+        self.use_pool = use_pool
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def for_batch(cls, n_pages: int, threshold: int = PARSE_POOL_THRESHOLD, max_workers: int | None = None) -> "ParseExecutor":
+        return cls(use_pool=n_pages >= threshold and (max_workers or os.cpu_count() or 1) > 1, max_workers=max_workers)
+
+    @property
+    def concurrency(self) -> int:
+        """Parse jobs worth running at once (one per worker process)."""
+        return self.max_workers if self.use_pool else 1
+
+    async def parse(self, kind: str, html: str | bytes, *args: Any) -> Any:
+        if not self.use_pool:
+            return _KINDS[kind](html, *args)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        payload = html.encode("utf-8") if isinstance(html, str) else html
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        out = await loop.run_in_executor(self._pool, _parse_worker, kind, payload, *args)
+        # Worker-side parser metrics stay in the worker; record the round trip here.
+        rows = out[2] if kind == "result_page" else out
+        METRICS.record_parse(f"pool.{kind}", len(rows), time.perf_counter() - t0)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ParseExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
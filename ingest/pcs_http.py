@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any
-
-import httpx
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from .env import PCS_COOKIE, PCS_COOKIES_JSON
+from .metrics import METRICS
+from .negative_cache import negative_cache
+from .page_archive import page_archive, should_archive
+from .pcs_async import to_thread
+
+if TYPE_CHECKING:
+    import httpx
+
+# Optional replacement for the network (offline benchmarks against the local backend):
+# an async callable url -> (status, html as str or bytes). See `set_page_source`.
+PageSource = Callable[[str], Awaitable[tuple[int, str | bytes]]]
+_PAGE_SOURCE: PageSource | None = None
+
+
+def set_page_source(source: PageSource | None) -> None:
+    """
+    Serve `fetch_pcs_html`/`fetch_pcs_bytes` from `source` instead of procyclingstats.com
+    (None restores HTTP).
+    """
+    global _PAGE_SOURCE
+    _PAGE_SOURCE = source
 
 
 def _parse_cookie_header(cookie_header: str) -> dict[str, str]:
@@ -41,30 +62,93 @@ def pcs_cookies() -> dict[str, str]:
     return {}
 
 
-async def fetch_pcs_html(relative_or_absolute_url: str) -> tuple[int, str]:
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# One pooled client per event loop, shared by every job run in that loop (keep-alive
+# connections instead of a new TLS handshake per page). Closed by `close_session()`.
+_SESSION: tuple[asyncio.AbstractEventLoop, "httpx.AsyncClient"] | None = None
+
+
+def pcs_session() -> "httpx.AsyncClient":
+    global _SESSION
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION[0] is not loop or _SESSION[1].is_closed:
+        import httpx
+
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(30.0, connect=30.0),
+            headers=_HEADERS,
+            cookies=pcs_cookies(),
+        )
+        _SESSION = (loop, client)
+    return _SESSION[1]
+
+
+async def close_session() -> None:
+    global _SESSION
+    if _SESSION is not None:
+        loop, client = _SESSION
+        _SESSION = None
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+
+
+async def _fetch(url: str, as_text: bool, not_found_until: float | None) -> tuple[int, Any]:
+    cache = negative_cache()
+    if cache is not None:
+        cached = cache.lookup(url)
+        if cached is not None:
+            # Known-missing page: answer locally instead of asking PCS again.
+            METRICS.incr("http_suppressed")
+            return cached, "" if as_text else b""
+
+    t0 = time.perf_counter()
+    if _PAGE_SOURCE is not None:
+        status, body = await _PAGE_SOURCE(url)
+        if as_text and isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        elif not as_text and isinstance(body, str):
+            body = body.encode("utf-8")
+        nbytes = len(body)
+    else:
+        r = await pcs_session().get(url)
+        status, body, nbytes = r.status_code, (r.text if as_text else r.content), len(r.content)
+        archive = page_archive() if status == 200 and should_archive(url) else None
+        if archive is not None:
+            # Raw page kept for offline reparsing (ingest/reparse.py); the gzip and file
+            # writes run off the event loop.
+            await to_thread(lambda: archive.put(url, r.content))
+    METRICS.record_http(status, nbytes, time.perf_counter() - t0)
+    if cache is not None:
+        cache.record(url, status, not_found_until)
+    return status, body
+
+
+async def fetch_pcs_bytes(relative_or_absolute_url: str, not_found_until: float | None = None) -> tuple[int, bytes]:
     """
-    Fetch PCS HTML with basic browser-like headers and optional cookies.
-    Returns (status_code, html_text).
+    Like `fetch_pcs_html` but returns the raw response body: no charset detection and
+    no decode to str. The pcs_parse parsers take bytes directly (selectolax works on
+    UTF-8 bytes internally), so parse-only callers should prefer this.
     """
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-
-    cookies = pcs_cookies()
-
-    async with httpx.AsyncClient(
-        follow_redirects=True,
-        timeout=httpx.Timeout(30.0, connect=30.0),
-        headers=headers,
-        cookies=cookies,
-    ) as client:
-        r = await client.get(relative_or_absolute_url)
-        return r.status_code, r.text
+    return await _fetch(relative_or_absolute_url, False, not_found_until)
+
 
+async def fetch_pcs_html(relative_or_absolute_url: str, not_found_until: float | None = None) -> tuple[int, str]:
+    """
+    Fetch PCS HTML with basic browser-like headers and optional cookies.
+    Returns (status_code, html_text).
 
+    404/410 answers go to the negative cache (see negative_cache) and later requests
+    for the URL are suppressed until `not_found_until` (timestamp, e.g. the race date)
+    or the default expiry for that kind of page.
+    """
+    return await _fetch(relative_or_absolute_url, True, not_found_until)
@@ -4,28 +4,32 @@ from typing import Any
 
 from selectolax.parser import HTMLParser
 
+from .metrics import timed_parser
+from .records import RaceListing, RankingRow, ResultRow
+
+
+# Parsers accept the page as str or as raw UTF-8 bytes (pcs_http.fetch_pcs_bytes);
+# bytes skip a decode/re-encode round trip before selectolax parses them.
+
 
 def _clean_text(s: str) -> str:
     return " ".join((s or "").split()).strip()
 
 
-def parse_race_result_table(html: str) -> list[dict[str, Any]]:
+@timed_parser("race_result")
+def parse_race_result_table(html: str | bytes) -> list[ResultRow]:
     """
     Parse a PCS one-day results page like:
       https://www.procyclingstats.com/race/milano-sanremo/2025/result
 
-    Returns rows with at least:
-      - rank (int)
-      - rider_name (str)
-      - rider_url (str, like 'rider/tadej-pogacar')
-      - team_name (str)
+    Returns ResultRow(rank, rider_name, rider_url like 'rider/tadej-pogacar', team_name).
     """
     tree = HTMLParser(html)
     table = tree.css_first("table")
     if table is None:
         return []
 
-    out: list[dict[str, Any]] = []
+    out: list[ResultRow] = []
     rows = table.css("tr") or []
     for tr in rows[1:]:
         tds = tr.css("td") or []
@@ -59,31 +63,24 @@ def parse_race_result_table(html: str) -> list[dict[str, Any]]:
         if rider_td_idx is not None and rider_td_idx + 1 < len(tds):
             team_name = _clean_text(tds[rider_td_idx + 1].text())
 
-        out.append(
-            {
-                "rank": rank,
-                "rider_name": rider_name,
-                "rider_url": rider_url,
-                "team_name": team_name,
-            }
-        )
+        out.append(ResultRow(rank, rider_name, rider_url, team_name))
     return out
 
 
-def parse_rider_ranking_table(html: str) -> list[dict[str, Any]]:
+@timed_parser("rider_ranking")
+def parse_rider_ranking_table(html: str | bytes) -> list[RankingRow]:
     """
     Parse PCS rider ranking table page like:
       https://www.procyclingstats.com/rankings/me/individual
 
-    Returns rows with:
-      - rider_name, rider_url, team_name, points (int)
+    Returns RankingRow(rider_name, rider_url, team_name, points).
     """
     tree = HTMLParser(html)
     table = tree.css_first("table")
     if table is None:
         return []
 
-    out: list[dict[str, Any]] = []
+    out: list[RankingRow] = []
     for tr in (table.css("tr") or [])[1:]:
         tds = tr.css("td") or []
         if not tds:
@@ -118,18 +115,12 @@ def parse_rider_ranking_table(html: str) -> list[dict[str, Any]]:
                 continue
 
         if rider_url and rider_name:
-            out.append(
-                {
-                    "rider_name": rider_name,
-                    "rider_url": rider_url,
-                    "team_name": team_name,
-                    "points": points_int,
-                }
-            )
+            out.append(RankingRow(rider_name, rider_url, team_name, points_int))
     return out
 
 
-def parse_rankings_php_uci_one_day(html: str) -> list[dict[str, Any]]:
+@timed_parser("rankings_php_uci_one_day")
+def parse_rankings_php_uci_one_day(html: str | bytes) -> list[RankingRow]:
     """
     Parse PCS rankings.php pages like:
       https://www.procyclingstats.com/rankings.php?p=uci-one-day-races&...&offset=100&filter=Filter
@@ -137,15 +128,14 @@ def parse_rankings_php_uci_one_day(html: str) -> list[dict[str, Any]]:
     Table headers observed:
       ['#', 'Prev.', 'Diff.', 'Rider', 'Team', 'Points']
 
-    Returns rows with:
-      - rider_name, rider_url, team_name, points (int)
+    Returns RankingRow(rider_name, rider_url, team_name, points).
     """
     tree = HTMLParser(html)
     table = tree.css_first("table")
     if table is None:
         return []
 
-    out: list[dict[str, Any]] = []
+    out: list[RankingRow] = []
     for tr in (table.css("tr") or [])[1:]:
         tds = tr.css("td") or []
         if not tds:
@@ -176,31 +166,23 @@ def parse_rankings_php_uci_one_day(html: str) -> list[dict[str, Any]]:
                 points_int = 0
 
         if rider_url and rider_name:
-            out.append(
-                {
-                    "rider_name": rider_name,
-                    "rider_url": rider_url,
-                    "team_name": team_name,
-                    "points": points_int,
-                }
-            )
+            out.append(RankingRow(rider_name, rider_url, team_name, points_int))
 
     return out
 
 
-def parse_races_php_one_day(html: str, year: int) -> dict[str, dict[str, Any]]:
+@timed_parser("races_php_one_day")
+def parse_races_php_one_day(html: str | bytes, year: int) -> dict[str, RaceListing]:
     """
     Parse PCS races listing page for one-day circuit:
       https://www.procyclingstats.com/races.php?year=2025&circuit=1...
 
-    Returns mapping keyed by race_key (slug without year), values:
-      - race_key
-      - pcs_result_slug (e.g. 'race/milano-sanremo/2025/result')
-      - name (display)
-      - date (YYYY-MM-DD) best-effort from the leading dd.mm token
+    Returns RaceListing rows keyed by race_key (slug without year); pcs_result_slug is
+    e.g. 'race/milano-sanremo/2025/result', date (YYYY-MM-DD) is best-effort from the
+    leading dd.mm token.
     """
     tree = HTMLParser(html)
-    out: dict[str, dict[str, Any]] = {}
+    out: dict[str, RaceListing] = {}
     table = tree.css_first("table")
     if table is None:
         return out
@@ -229,17 +211,13 @@ def parse_races_php_one_day(html: str, year: int) -> dict[str, dict[str, Any]]:
 
         name = _clean_text(a.text())
 
-        out[race_key] = {
-            "race_key": race_key,
-            "pcs_result_slug": href,
-            "name": name,
-            "date": date_iso,
-        }
+        out[race_key] = RaceListing(race_key, href, name, date_iso)
 
     return out
 
 
-def parse_race_details(html: str) -> dict[str, Any]:
+@timed_parser("race_details")
+def parse_race_details(html: str | bytes) -> dict[str, Any]:
     """
     Parse PCS race details page (results page often has this info in header).
     Extracts 'startdate'.
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from .metrics import METRICS
+
+# Minimal staged producer/consumer pipeline.
+#
+# Items flow source -> stage 1 -> ... -> stage N through bounded asyncio queues.
+# Each stage runs `concurrency` workers; a full queue blocks the upstream stage
+# (backpressure) instead of buffering without limit. A stage returning None drops
+# the item. The first exception cancels every worker and is re-raised.
+# Per-stage busy time (summed over workers) is recorded as `pipeline.<name>`.
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+
+
+async def run_pipeline(source: Iterable[Any], stages: list[Stage], queue_size: int = 2) -> list[Any]:
+    """
+    Push every item of `source` through `stages`; returns the outputs of the last stage
+    (completion order, not input order).
+    """
+    queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    results: list[Any] = []
+
+    async def feed() -> None:
+        for item in source:
+            await queues[0].put(item)
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(_DONE)
+
+    async def work(i: int) -> None:
+        stage = stages[i]
+        inbox = queues[i]
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            t0 = time.perf_counter()
+            out = await stage.fn(item)
+            METRICS.add_stage_time(f"pipeline.{stage.name}", time.perf_counter() - t0)
+            if out is None:
+                continue
+            if i + 1 < len(stages):
+                await queues[i + 1].put(out)
+            else:
+                results.append(out)
+
+    async def run_stage(i: int) -> None:
+        await asyncio.gather(*(work(i) for _ in range(stages[i].concurrency)))
+        # All workers of this stage are done: release every worker downstream.
+        if i + 1 < len(stages):
+            for _ in range(stages[i + 1].concurrency):
+                await queues[i + 1].put(_DONE)
+
+    tasks = [asyncio.create_task(feed())] + [asyncio.create_task(run_stage(i)) for i in range(len(stages))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return results
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from .metrics import METRICS, run_report
+from .supabase_client import get_supabase
+from .utils import chunked
+
+# Delta-encoded day-by-day history of rider_points and teams.points (`points_history`).
+#
+# Per (season, kind, day) the table holds either
+#   - delta rows: one per entity whose points changed since the previous day, or
+#   - checkpoint rows: the full value of every entity with points (a delta from 0), and a
+#     0 row for every entity that had points the day before but has none now, written by
+#     a full recompute when the last checkpoint is CHECKPOINT_EVERY days old.
+# The value of an entity on day D is the sum of its rows from the latest checkpoint on
+# or before D up to D, so a reader fetches one checkpoint plus a few days of deltas
+# instead of full daily copies. Recording twice on the same day replaces that day's rows.
+
+KINDS = ("rider", "team")
+CHECKPOINT_EVERY = 7
+PAGE = 1000
+
+
+def _day(d: date | str) -> str:
+    return d.isoformat() if isinstance(d, date) else str(d)[:10]
+
+
+def latest_checkpoint(sb, season_year: int, kind: str, day: date | str) -> str | None:
+    """
+    Latest checkpoint day on or before `day`, or None.
+    """
+    rows = (
+        sb.table("points_history")
+        .select("day")
+        .eq("season_year", season_year)
+        .eq("kind", kind)
+        .eq("checkpoint", True)
+        .lte("day", _day(day))
+        .order("day", desc=True)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return str(rows[0]["day"]) if rows else None
+
+
+def _rows_between(sb, season_year: int, kind: str, start: str | None, end: str, columns: str) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    while True:
+        q = sb.table("points_history").select(columns).eq("season_year", season_year).eq("kind", kind).lte("day", end)
+        if start is not None:
+            q = q.gte("day", start)
+        batch = q.order("day").order("entity_id").range(len(out), len(out) + PAGE - 1).execute().data or []
+        out.extend(batch)
+        if len(batch) < PAGE:
+            return out
+
+
+def points_as_of(sb, season_year: int, kind: str, day: date | str) -> dict[str, int]:
+    """
+    {entity_id: points} at the end of `day` (entities with 0 points are omitted).
+    """
+    cp = latest_checkpoint(sb, season_year, kind, day)
+    totals: dict[str, int] = {}
+    for r in _rows_between(sb, season_year, kind, cp, _day(day), "entity_id, delta"):
+        totals[r["entity_id"]] = totals.get(r["entity_id"], 0) + int(r["delta"])
+    return {k: v for k, v in totals.items() if v}
+
+
+def entity_series(sb, season_year: int, kind: str, entity_id: str) -> list[tuple[str, int]]:
+    """
+    [(day, points)] for every day the entity's points changed (or were checkpointed).
+    """
+    rows = (
+        sb.table("points_history")
+        .select("day, delta, checkpoint")
+        .eq("season_year", season_year)
+        .eq("kind", kind)
+        .eq("entity_id", entity_id)
+        .order("day")
+        .execute()
+        .data
+        or []
+    )
+    series: list[tuple[str, int]] = []
+    value = 0
+    for r in rows:
+        value = int(r["delta"]) if r.get("checkpoint") else value + int(r["delta"])
+        series.append((str(r["day"]), value))
+    return series
+
+
+def _clear_day(sb, season_year: int, kind: str, day: str, entity_ids: list[str] | None = None) -> None:
+    if entity_ids is None:
+        sb.table("points_history").delete().eq("season_year", season_year).eq("kind", kind).eq("day", day).execute()
+        return
+    for batch in chunked(entity_ids, 200):
+        (
+            sb.table("points_history")
+            .delete()
+            .eq("season_year", season_year)
+            .eq("kind", kind)
+            .eq("day", day)
+            .in_("entity_id", batch)
+            .execute()
+        )
+
+
+def record_points(
+    sb, season_year: int, kind: str, values: dict[str, int], day: date | str | None = None, full: bool = True
+) -> int:
+    """
+    Record today's `values` ({entity_id: points}). With `full`, `values` is every entity
+    of the kind (missing ones are 0) and a checkpoint is written when one is due; partial
+    calls (incremental recompute) only touch the given entities. Returns rows written.
+    """
+    day = _day(day or datetime.utcnow().date())
+    cp = latest_checkpoint(sb, season_year, kind, day)
+
+    prev_day = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+    if cp == day or (full and (cp is None or (date.fromisoformat(day) - date.fromisoformat(cp)).days >= CHECKPOINT_EVERY)):
+        # Checkpoint day: rows hold full values. Entities that dropped to 0 get an explicit
+        # 0 row, or entity_series would carry their old value across the checkpoint.
+        dropped = {k: 0 for k in points_as_of(sb, season_year, kind, prev_day) if not values.get(k)} if full else {}
+        rows = [
+            {"season_year": season_year, "kind": kind, "entity_id": k, "day": day, "delta": int(v), "checkpoint": True}
+            for k, v in {**values, **dropped}.items()
+            if v or not full or k in dropped
+        ]
+        if full:
+            _clear_day(sb, season_year, kind, day)
+        for batch in chunked(rows, 500):
+            sb.table("points_history").upsert(batch, on_conflict="season_year,kind,entity_id,day").execute()
+        METRICS.incr("history_checkpoint_rows", len(rows))
+        return len(rows)
+
+    prev = points_as_of(sb, season_year, kind, prev_day)
+    ids = set(values) | (set(prev) if full else set())
+    deltas = {k: int(values.get(k, 0)) - prev.get(k, 0) for k in ids}
+    rows = [
+        {"season_year": season_year, "kind": kind, "entity_id": k, "day": day, "delta": d, "checkpoint": False}
+        for k, d in sorted(deltas.items())
+        if d
+    ]
+    if full:
+        _clear_day(sb, season_year, kind, day)
+    else:
+        _clear_day(sb, season_year, kind, day, sorted(k for k, d in deltas.items() if not d))
+    for batch in chunked(rows, 500):
+        sb.table("points_history").upsert(batch, on_conflict="season_year,kind,entity_id,day").execute()
+    METRICS.incr("history_delta_rows", len(rows))
+    return len(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Print rider or team standings on a past day from points_history.")
+    ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
+    ap.add_argument("--kind", choices=KINDS, default="team")
+    ap.add_argument("--date", type=str, default=None, help="Day to reconstruct (YYYY-MM-DD, default today).")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    sb = get_supabase()
+    day = args.date or datetime.utcnow().date().isoformat()
+    standings = sorted(points_as_of(sb, args.season_year, args.kind, day).items(), key=lambda kv: -kv[1])
+    print(f"[history] {args.kind} standings on {day}: {len(standings)} with points")
+    for i, (entity_id, pts) in enumerate(standings[: args.top], start=1):
+        print(f"{i:4d}  {pts:6d}  {entity_id}")
+
+
+if __name__ == "__main__":
+    with run_report("points_history"):
+        main()
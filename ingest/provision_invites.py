@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import secrets
+import uuid
+from typing import Any
+
+from .lease import job_lease
+from .metrics import METRICS, run_report
+from .supabase_client import get_supabase
+from .utils import chunked
+
+# Bulk provisioning of league invites: access codes and their placeholder users.
+#
+# `--count N --prefix MB26-` makes sure N invites with that prefix exist, so a rerun
+# creates nothing and an interrupted run is completed:
+#   1. one paged select of the prefix's codes with their users
+#   2. new codes are generated locally (secrets, no look-alike characters) and checked
+#      against that select: any existing code equal to a new one starts with the prefix,
+#      so the check is complete. Ids are generated locally too, so a code is written
+#      already linked to its user: one bulk upsert on access_codes, one on users
+#   3. codes an earlier partial run left without a user or without the link back are
+#      repaired in the same two statements
+# The users FK points at access_codes, so codes are written first.
+
+ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+BATCH = 500
+
+
+def generate_codes(prefix: str, length: int, n: int, taken: set[str]) -> list[str]:
+    """
+    `n` random codes `prefix` + `length` characters, distinct from `taken` and each other.
+    """
+    out: list[str] = []
+    seen = set(taken)
+    while len(out) < n:
+        code = prefix + "".join(secrets.choice(ALPHABET) for _ in range(length))
+        if code not in seen:
+            seen.add(code)
+            out.append(code)
+    return out
+
+
+def load_prefix_codes(sb, prefix: str) -> list[dict[str, Any]]:
+    """
+    Existing codes starting with `prefix`, each with its `users` embed (see code_user).
+    """
+    rows: list[dict[str, Any]] = []
+    limit = 1000
+    while True:
+        batch = (
+            sb.table("access_codes")
+            .select("id, code, is_active, assigned_user_id, users(id, display_name)")
+            .like("code", f"{prefix}*")
+            .order("code")
+            .range(len(rows), len(rows) + limit - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(batch)
+        if len(batch) < limit:
+            return rows
+
+
+def code_user(code_row: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    The user linked to an access_codes row. `users.access_code_id` is unique, so PostgREST
+    embeds `users` as one object (or null); a list is accepted too.
+    """
+    users = code_row.get("users")
+    if isinstance(users, list):
+        return users[0] if users else None
+    return users or None
+
+
+def _placeholder_name(prefix: str, code: str) -> str:
+    return f"Rookie-{code[len(prefix):]}"
+
+
+def plan_invites(
+    existing: list[dict[str, Any]], prefix: str, count: int, length: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], int]:
+    """
+    (access_codes rows to upsert, users rows to insert, new code count) that bring the
+    prefix to `count` fully linked invites.
+    """
+    code_rows: list[dict[str, Any]] = []
+    user_rows: list[dict[str, Any]] = []
+    for c in existing:
+        user = code_user(c)
+        user_id = user["id"] if user else str(uuid.uuid4())
+        if user is None:
+            user_rows.append({"id": user_id, "access_code_id": c["id"], "display_name": _placeholder_name(prefix, c["code"])})
+        if c.get("assigned_user_id") != user_id:
+            code_rows.append({"id": c["id"], "code": c["code"], "is_active": c.get("is_active", True), "assigned_user_id": user_id})
+
+    new_codes = generate_codes(prefix, length, max(0, count - len(existing)), {c["code"] for c in existing})
+    for code in new_codes:
+        code_id, user_id = str(uuid.uuid4()), str(uuid.uuid4())
+        code_rows.append({"id": code_id, "code": code, "is_active": True, "assigned_user_id": user_id})
+        user_rows.append({"id": user_id, "access_code_id": code_id, "display_name": _placeholder_name(prefix, code)})
+    return code_rows, user_rows, len(new_codes)
+
+
+def provision_invites(sb, prefix: str, count: int, length: int = 6, dry_run: bool = False) -> list[dict[str, str]]:
+    """
+    Ensure `count` invites exist for `prefix`. Returns every invite of the prefix as
+    {code, display_name}.
+    """
+    existing = load_prefix_codes(sb, prefix)
+    code_rows, user_rows, created = plan_invites(existing, prefix, count, length)
+    repaired = len(code_rows) - created
+    print(
+        f"[invites] prefix={prefix} existing={len(existing)} new={created} "
+        f"repaired_links={repaired} new_users={len(user_rows)} dry_run={dry_run}"
+    )
+    if not dry_run:
+        for batch in chunked(code_rows, BATCH):
+            sb.table("access_codes").upsert(batch, on_conflict="id").execute()
+        for batch in chunked(user_rows, BATCH):
+            sb.table("users").upsert(batch, on_conflict="access_code_id", ignore_duplicates=True).execute()
+    METRICS.incr("invites_created", created)
+    METRICS.incr("invites_repaired", repaired)
+
+    names = {u["access_code_id"]: u["display_name"] for u in user_rows}
+    invites = [
+        {"code": c["code"], "display_name": (code_user(c) or {}).get("display_name") or names.get(c["id"], "")}
+        for c in existing
+    ]
+    invites += [{"code": c["code"], "display_name": names[c["id"]]} for c in code_rows[repaired:]]
+    return invites
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Create league invites (access codes + placeholder users) in bulk.")
+    ap.add_argument("--count", type=int, required=True, help="Number of invites the prefix should have.")
+    ap.add_argument("--prefix", type=str, default="MB26-")
+    ap.add_argument("--length", type=int, default=6, help="Random characters after the prefix.")
+    ap.add_argument("--out", type=str, default=None, help="Write all invites of the prefix to this CSV (code, display_name).")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+    if not re.fullmatch(r"[A-Za-z0-9-]+", args.prefix):
+        raise SystemExit("--prefix may only contain letters, digits and '-'")
+
+    invites = provision_invites(get_supabase(), args.prefix, args.count, args.length, args.dry_run)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["code", "display_name"])
+            w.writeheader()
+            w.writerows(invites)
+        print(f"[invites] wrote {len(invites)} invites to {args.out}")
+
+
+if __name__ == "__main__":
+    with job_lease("provision_invites"), run_report("provision_invites"):
+        main()
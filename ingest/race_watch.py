@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from .pcs_parse import parse_race_result_table
+from .records import ResultRow
+
+# Race-day watch loop used by `daily_sync --watch`.
+#
+# Each of today's races is polled on its own schedule:
+#   - before results appear: every `idle_interval` seconds
+#   - once the results table appears or changes: every `active_interval` seconds,
+#     doubling after each unchanged poll (capped at `idle_interval`)
+#   - after `stable_after` unchanged polls the race is considered final for today
+# Every changed result set is stored and scored immediately; a store that could not
+# run (returns False) is retried at the next poll, `active_interval` later. The whole
+# day shares one request budget; the loop stops when it is spent or the deadline passes.
+
+FetchFn = Callable[[str], Awaitable[tuple[str, int, bytes]]]
+StoreFn = Callable[[str, str, bytes], Awaitable[bool]]
+
+
+@dataclass
+class RaceWatch:
+    race_key: str
+    fingerprint: str | None = None
+    stable_polls: int = 0
+    polls: int = 0
+    updates: int = 0
+    due: float = 0.0
+    done: bool = False
+
+
+def results_fingerprint(rows: list[ResultRow]) -> str | None:
+    """
+    Order-sensitive hash of (rank, rider) pairs; None when the table is empty.
+    """
+    if not rows:
+        return None
+    h = hashlib.sha1()
+    for r in rows:
+        h.update(f"{r.rank}:{r.rider_url}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def next_interval(w: RaceWatch, idle_interval: float, active_interval: float) -> float:
+    if w.fingerprint is None:
+        return idle_interval
+    return min(idle_interval, active_interval * (2**w.stable_polls))
+
+
+async def watch_races(
+    race_keys: list[str],
+    fetch: FetchFn,
+    store: StoreFn,
+    *,
+    budget: int,
+    idle_interval: float,
+    active_interval: float,
+    stable_after: int,
+    deadline: float,
+    log: Callable[[str], None],
+) -> dict[str, RaceWatch]:
+    """
+    Poll `race_keys` until every race is stable, the request `budget` is spent,
+    or `deadline` (time.time()) passes. Returns the per-race watch state.
+    """
+    watches = {k: RaceWatch(race_key=k) for k in race_keys}
+    requests = 0
+    while True:
+        pending = [w for w in watches.values() if not w.done]
+        if not pending:
+            log("[watch] all races stable")
+            break
+        if requests >= budget:
+            log(f"[watch] request budget exhausted ({budget})")
+            break
+        w = min(pending, key=lambda x: x.due)
+        if max(w.due, time.time()) > deadline:
+            log("[watch] deadline reached")
+            break
+        wait = w.due - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        result_slug, status, html = await fetch(w.race_key)
+        requests += 1
+        w.polls += 1
+        rows = parse_race_result_table(html) if status == 200 else []
+        fp = results_fingerprint(rows)
+        retry = False
+
+        if fp is not None and fp != w.fingerprint:
+            log(
+                f"[watch] {w.race_key}: results {'appeared' if w.fingerprint is None else 'changed'} "
+                f"({len(rows)} rows), scoring"
+            )
+            if await store(w.race_key, result_slug, html):
+                w.fingerprint = fp
+                w.stable_polls = 0
+                w.updates += 1
+            else:
+                retry = True
+                log(f"[watch] {w.race_key}: not stored, retrying at the next poll")
+        elif fp is not None:
+            w.stable_polls += 1
+            if w.stable_polls >= stable_after:
+                w.done = True
+                log(f"[watch] {w.race_key}: stable after {w.polls} polls")
+        else:
+            log(f"[watch] {w.race_key}: no results yet (http {status})")
+
+        w.due = time.time() + (active_interval if retry else next_interval(w, idle_interval, active_interval))
+
+    log(f"[watch] requests used: {requests}/{budget}")
+    return watches
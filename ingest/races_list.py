@@ -1,46 +1,12 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
+from .season_rules import load_season_rules
 
 
-def load_race_keys_from_races_txt(repo_root: str, season_year: int | None = None) -> list[str]:
+def load_race_keys_from_races_txt(repo_root: str | None = None, season_year: int | None = None) -> list[str]:
     """
-    Loads the selected one-day race keys from `Races.txt` or `Races_{season}.txt`.
-    Supported formats:
-    - JSON list of strings: ["milano-sanremo", ...]
-    - Python-ish assignment: Races = ["milano-sanremo", ...]
+    Loads the selected one-day race keys from `Races_{season}.txt` or `Races.txt`.
+    Thin wrapper over `season_rules.load_season_rules` (cached, validated);
+    `repo_root` defaults to the rules directory (`references/`).
     """
-    p = Path(repo_root) / "Races.txt"
-    if season_year:
-        p_season = Path(repo_root) / f"Races_{season_year}.txt"
-        if p_season.exists():
-            p = p_season
-
-    if not p.exists():
-        txt = ""
-    else:
-        txt = p.read_text(encoding="utf-8").strip()
-
-    if not txt:
-        # Fallback: use the canonical in-code list.
-        from .megabike_rules import RACES
-
-        return list(RACES)
-    if txt.startswith("Races"):
-        # Allow "Races = [...]"
-        eq = txt.find("=")
-        if eq != -1:
-            txt = txt[eq + 1 :].strip()
-    data = json.loads(txt)
-    if not isinstance(data, list) or not all(isinstance(x, str) for x in data):
-        raise ValueError("Races.txt must be a JSON list of strings")
-    # normalize
-    out = []
-    for x in data:
-        x = x.strip().strip('"').strip()
-        if x:
-            out.append(x)
-    return out
-
-
+    return list(load_season_rules(season_year, root=repo_root).races)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from .utils import chunked, select_in
+
+# Read models are denormalized JSON snapshots of the views the frontend renders.
+# They are rebuilt at the end of each sync so a page load is a single fetch:
+#   - "leaderboard"      -> season standings
+#   - "latest_race"      -> most recent race with its top results
+#   - "team:<team_id>"   -> team detail with roster, prices and points
+# Team writes from the app drop the team's model and the leaderboard (trigger in
+# supabase/schema.sql); readers then query live until the next publish.
+# Publishing also bumps the season's sync version (`sync_state`), which invalidates the
+# read_api caches.
+
+
+def build_leaderboard(teams: list[dict[str, Any]]) -> dict[str, Any]:
+    ordered = sorted(teams, key=lambda t: int(t.get("points") or 0), reverse=True)
+    return {
+        "teams": [
+            {
+                "id": t["id"],
+                "teamName": t.get("team_name"),
+                "points": int(t.get("points") or 0),
+                "ownerName": (t.get("users") or {}).get("display_name"),
+            }
+            for t in ordered
+        ]
+    }
+
+
+def build_team_models(
+    sb,
+    season_year: int,
+    teams: list[dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """
+    Build one payload per team, keyed by "team:<team_id>".
+    Uses one query per table (chunked) instead of one query chain per team.
+    """
+    team_ids = [t["id"] for t in teams]
+    # Up to 30 slots per team: keep chunks under the PostgREST 1000-row page.
+    roster_rows = select_in(sb, "team_riders", "team_id, rider_id, slot", "team_id", team_ids, size=30)
+    rider_ids = sorted({r["rider_id"] for r in roster_rows if r.get("rider_id")})
+
+    riders = select_in(sb, "riders", "id, rider_name, team_name, nationality, active", "id", rider_ids)
+    rider_by_id = {r["id"]: r for r in riders}
+    price_by_id = {
+        r["rider_id"]: int(r.get("price") or 0)
+        for r in select_in(sb, "rider_prices", "rider_id, price", "rider_id", rider_ids, season_year=season_year)
+    }
+    points_by_id = {
+        r["rider_id"]: int(r.get("points") or 0)
+        for r in select_in(sb, "rider_points", "rider_id, points", "rider_id", rider_ids, season_year=season_year)
+    }
+
+    roster_by_team: dict[str, list[dict[str, Any]]] = {}
+    for row in sorted(roster_rows, key=lambda r: int(r.get("slot") or 0)):
+        roster_by_team.setdefault(row["team_id"], []).append(row)
+
+    out: dict[str, dict[str, Any]] = {}
+    for t in teams:
+        riders_out = []
+        for row in roster_by_team.get(t["id"], []):
+            r = rider_by_id.get(row["rider_id"])
+            if not r:
+                continue
+            riders_out.append(
+                {
+                    "id": r["id"],
+                    "rider_name": r.get("rider_name"),
+                    "team_name": r.get("team_name"),
+                    "nationality": r.get("nationality"),
+                    "active": r.get("active"),
+                    "price": price_by_id.get(r["id"], 0),
+                    "points": points_by_id.get(r["id"], 0),
+                }
+            )
+        out[f"team:{t['id']}"] = {
+            "id": t["id"],
+            "userId": t.get("user_id"),
+            "teamName": t.get("team_name"),
+            "ownerName": (t.get("users") or {}).get("display_name"),
+            "points": int(t.get("points") or 0),
+            "totalPrice": int(t.get("total_cost") or 0),
+            "season": season_year,
+            "riders": riders_out,
+        }
+    return out
+
+
+def build_latest_race(sb, season_year: int, today: str) -> dict[str, Any] | None:
+    race = (
+        sb.table("races")
+        .select("id, name, race_date")
+        .gte("race_date", f"{season_year}-01-01")
+        .lte("race_date", min(today, f"{season_year}-12-31"))
+        .order("race_date", desc=True)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    if not race:
+        return None
+    results = (
+        sb.table("race_results")
+        .select("rank, points_awarded, riders(rider_name, team_name)")
+        .eq("race_id", race[0]["id"])
+        .order("rank")
+        .limit(50)
+        .execute()
+        .data
+        or []
+    )
+    return {
+        "name": race[0]["name"],
+        "date": race[0]["race_date"],
+        "results": [
+            {
+                "rider": (r.get("riders") or {}).get("rider_name"),
+                "team": (r.get("riders") or {}).get("team_name") or "",
+                "points": r.get("points_awarded"),
+                "rank": r.get("rank"),
+            }
+            for r in results
+        ],
+    }
+
+
+def build_read_models(sb, season_year: int, today: str | None = None) -> dict[str, Any]:
+    """
+    Assemble all read-model payloads for a season, keyed by model_key.
+    """
+    today = today or datetime.utcnow().date().isoformat()
+    teams = (
+        sb.table("teams")
+        .select("id, user_id, team_name, points, total_cost, users(display_name)")
+        .eq("season_year", season_year)
+        .execute()
+        .data
+        or []
+    )
+    models: dict[str, Any] = {"leaderboard": build_leaderboard(teams)}
+    models.update(build_team_models(sb, season_year, teams))
+    latest = build_latest_race(sb, season_year, today)
+    if latest is not None:
+        models["latest_race"] = latest
+    return models
+
+
+def bump_sync_version(sb, season_year: int) -> int:
+    """
+    Increment the season's `sync_state.version` (atomically, in the DB) so caches of the
+    season's tables (read_api) reload. Returns the new version.
+    """
+    data = sb.rpc("bump_sync_version", {"p_season_year": season_year}).execute().data
+    return int(data[0] if isinstance(data, list) else data)
+
+
+def published_team_keys(sb, season_year: int) -> list[str]:
+    """
+    Every "team:<team_id>" key stored for the season (paged).
+    """
+    keys: list[str] = []
+    limit = 1000
+    while True:
+        batch = (
+            sb.table("read_models")
+            .select("model_key")
+            .eq("season_year", season_year)
+            .like("model_key", "team:*")
+            .order("model_key")
+            .range(len(keys), len(keys) + limit - 1)
+            .execute()
+            .data
+            or []
+        )
+        keys.extend(r["model_key"] for r in batch)
+        if len(batch) < limit:
+            return keys
+
+
+def publish_read_models(sb, season_year: int, version: str | None = None) -> int:
+    """
+    Rebuild and upsert every read model for the season, stamped with `version`
+    (the sync time, ISO-8601), delete the team models of teams that no longer exist,
+    then bump the season's sync version. Returns the number of models written.
+    """
+    version = version or datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    models = build_read_models(sb, season_year)
+    rows = [
+        {"season_year": season_year, "model_key": key, "version": version, "payload": payload}
+        for key, payload in models.items()
+    ]
+    for batch in chunked(rows, 100):
+        sb.table("read_models").upsert(batch, on_conflict="season_year,model_key").execute()
+    stale = [key for key in published_team_keys(sb, season_year) if key not in models]
+    for batch in chunked(stale, 200):
+        sb.table("read_models").delete().eq("season_year", season_year).in_("model_key", batch).execute()
+    bump_sync_version(sb, season_year)
+    return len(rows)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+# Typed rows returned by the pcs_parse parsers.
+#
+# NamedTuples carry no per-instance __dict__ (a few dozen bytes per row instead of a
+# ~200-byte dict plus its keys), pickle compactly to and from the parse pool, and give
+# consumers one attribute per field instead of multi-key `.get()` probing.
+
+
+class ResultRow(NamedTuple):
+    """One finisher on a race results page."""
+
+    rank: int
+    rider_name: str
+    rider_url: str  # "rider/<slug>", also the riders.pcs_slug
+    team_name: str
+
+
+class RankingRow(NamedTuple):
+    """One rider on a PCS ranking page (rankings.php or rankings/...)."""
+
+    rider_name: str
+    rider_url: str
+    team_name: str
+    points: int
+
+
+class RaceListing(NamedTuple):
+    """One race on the races.php season listing."""
+
+    race_key: str
+    pcs_result_slug: str
+    name: str
+    date: str | None  # YYYY-MM-DD, best effort
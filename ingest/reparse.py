@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from .lease import job_lease
+from .metrics import METRICS, run_report
+from .page_archive import PageArchive
+from .pcs_http import set_page_source
+
+# Replay a season from the page archive (ingest/page_archive.py) after a pcs_parse fix:
+#
+#   python -m ingest reparse --season-year 2026 [--as-of 2026-05-01]
+#
+# Runs `daily_sync --sync-all --full` with every PCS request answered from the archive
+# (pages missing from it answer 404 and their races are skipped), so every archived race
+# is parsed, scored and written again, followed by the season recompute. Results are
+# written as a diff, so only rows the fix changed are touched. Nothing is fetched from PCS.
+
+
+def _as_of(value: str | None) -> float | None:
+    """
+    "2026-05-01" (end of that day, UTC) or an ISO datetime -> unix time.
+    """
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    if len(value) == 10:
+        dt += timedelta(days=1) - timedelta(microseconds=1)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+async def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Reparse and rescore a season from the PCS page archive.")
+    ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
+    ap.add_argument("--as-of", type=str, default=None, help="Use pages as archived on this date/time (default: latest).")
+    ap.add_argument("--concurrency", type=int, default=16, help="Concurrent archive reads.")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    from . import daily_sync
+
+    archive = PageArchive()
+    # Archive misses are not PCS 404s: keep them out of the negative cache (and don't let
+    # cached PCS 404s hide archived pages).
+    negative_cache = os.environ.get("PCS_NEGATIVE_CACHE")
+    os.environ["PCS_NEGATIVE_CACHE"] = "0"
+    set_page_source(archive.page_source(_as_of(args.as_of)))
+    sync_argv = ["--season-year", str(args.season_year), "--sync-all", "--full", "--concurrency", str(args.concurrency)]
+    try:
+        await daily_sync.main(sync_argv + (["--verbose"] if args.verbose else []))
+    finally:
+        set_page_source(None)
+        if negative_cache is None:
+            os.environ.pop("PCS_NEGATIVE_CACHE", None)
+        else:
+            os.environ["PCS_NEGATIVE_CACHE"] = negative_cache
+    hits, misses = METRICS.counters.get("archive_hits", 0), METRICS.counters.get("archive_misses", 0)
+    print(f"[reparse] season={args.season_year} archived_pages={hits} missing={misses}", flush=True)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    with job_lease("reparse"), run_report("reparse"):
+        asyncio.run(main())
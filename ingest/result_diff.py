@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import METRICS
+from .utils import chunked
+
+# Minimal writes of one race's results.
+#
+# The stored race_results of a race are compared with the freshly scored rows, keyed by
+# rider_id:
+#   - rider only in the fresh set        -> insert
+#   - rank or points_awarded changed      -> update
+#   - rider only in the stored set        -> delete (disqualification, corrected classification)
+# Inserts and updates go out as one upsert, deletes as one `in_` delete. The diff's
+# affected rider ids drive the downstream points recompute.
+#
+# A fresh set that drops most of the stored rows is more likely a truncated page than a
+# real correction: deletes are skipped (and counted as `results_delete_guarded`) when the
+# fresh set is empty or keeps less than `min_kept` of the stored riders.
+
+
+@dataclass
+class ResultDiff:
+    inserts: list[dict[str, Any]] = field(default_factory=list)
+    updates: list[dict[str, Any]] = field(default_factory=list)
+    deletes: list[str] = field(default_factory=list)  # rider ids
+    unchanged: int = 0
+
+    @property
+    def affected_rider_ids(self) -> list[str]:
+        return sorted({r["rider_id"] for r in self.inserts + self.updates} | set(self.deletes))
+
+    def __bool__(self) -> bool:
+        return bool(self.inserts or self.updates or self.deletes)
+
+    def summary(self) -> str:
+        return f"+{len(self.inserts)} ~{len(self.updates)} -{len(self.deletes)} ={self.unchanged}"
+
+
+def diff_results(stored: list[dict[str, Any]], fresh: list[dict[str, Any]], min_kept: float = 0.5) -> ResultDiff:
+    """
+    Diff race_results rows (race_id, rider_id, rank, points_awarded) of one race.
+    """
+    before = {r["rider_id"]: r for r in stored}
+    diff = ResultDiff()
+    seen: set[str] = set()
+    for row in fresh:
+        rid = row["rider_id"]
+        if rid in seen:
+            continue
+        seen.add(rid)
+        old = before.get(rid)
+        if old is None:
+            diff.inserts.append(row)
+        elif int(old.get("rank") or 0) != int(row["rank"]) or int(old.get("points_awarded") or 0) != int(row["points_awarded"]):
+            diff.updates.append(row)
+        else:
+            diff.unchanged += 1
+
+    gone = sorted(rid for rid in before if rid not in seen)
+    kept = len(before) - len(gone)
+    if gone and (not seen or kept < min_kept * len(before)):
+        METRICS.incr("results_delete_guarded", len(gone))
+    else:
+        diff.deletes = gone
+    return diff
+
+
+def load_stored_results(sb, race_id: str) -> list[dict[str, Any]]:
+    return (
+        sb.table("race_results")
+        .select("rider_id, rank, points_awarded")
+        .eq("race_id", race_id)
+        .execute()
+        .data
+        or []
+    )
+
+
+def apply_diff(sb, race_id: str, diff: ResultDiff) -> None:
+    rows = diff.inserts + diff.updates
+    if rows:
+        sb.table("race_results").upsert(rows, on_conflict="race_id,rider_id").execute()
+    for batch in chunked(diff.deletes, 200):
+        sb.table("race_results").delete().eq("race_id", race_id).in_("rider_id", batch).execute()
+    METRICS.incr("results_inserted", len(diff.inserts))
+    METRICS.incr("results_updated", len(diff.updates))
+    METRICS.incr("results_deleted", len(diff.deletes))
+    METRICS.incr("results_unchanged", diff.unchanged)
+
+
+def sync_race_results(sb, race_id: str, fresh: list[dict[str, Any]]) -> ResultDiff:
+    """
+    Load, diff and apply one race's results. Returns the applied diff.
+    """
+    diff = diff_results(load_stored_results(sb, race_id), fresh)
+    if diff:
+        apply_diff(sb, race_id, diff)
+    else:
+        METRICS.incr("results_unchanged", diff.unchanged)
+    return diff
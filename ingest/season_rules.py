@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import ast
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .megabike_rules import RACES, RACES_RANK, RANK_POINTS
+from .scoring import points_for_rank
+
+# Single source of truth for per-season rules (races, tiers, points tables, calendar).
+#
+# Sources, in priority order, from the rules directory (`references/` by default):
+#   - Races_{year}.txt, then Races.txt        -> `Races = [...]` (or a JSON list)
+#   - Rankpoints.txt                          -> `races_rank = {...}`, `rank_points = {...}`
+#   - Calendar_{year}.txt (optional)          -> `Calendar = {"race-key": "YYYY-MM-DD", ...}`
+# Missing or empty files fall back to the canonical constants in `megabike_rules`.
+# Files are parsed as literals (never exec'd) and the result is cached per season
+# until one of the source files changes (mtime).
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class SeasonRules:
+    season_year: int | None
+    races: tuple[str, ...]
+    races_rank: dict[str, int]
+    rank_points: dict[int, list[int]]
+    race_dates: dict[str, str] = field(default_factory=dict)
+    sources: tuple[str, ...] = ()
+    # Compiled lookup: race_key -> points table for that race's tier.
+    _table_by_race: dict[str, tuple[int, ...]] = field(default_factory=dict, repr=False, compare=False)
+
+    def tier(self, race_key: str, default: int = 1) -> int:
+        return self.races_rank.get(race_key, default)
+
+    def points_for(self, race_key: str, rank: int) -> int:
+        """
+        Points awarded for `rank` (1-based) in `race_key`.
+        Races outside the season list score with the default tier.
+        """
+        table = self._table_by_race.get(race_key)
+        if table is None:
+            return points_for_rank(rank, self.tier(race_key), self.rank_points)
+        if rank <= 0 or not table:
+            return 0
+        return table[rank - 1] if rank <= len(table) else table[-1]
+
+
+def rules_dir() -> Path:
+    """
+    Directory holding the rules files: $MEGABIKE_RULES_DIR, else the repo's `references/`.
+    """
+    env_dir = os.getenv("MEGABIKE_RULES_DIR")
+    if env_dir:
+        return Path(env_dir)
+    return REPO_ROOT / "references"
+
+
+def _read_literals(path: Path) -> dict[str, Any]:
+    """
+    Read `name = <literal>` assignments (or a bare JSON/Python literal, stored under "")
+    from a trusted repo file without executing it.
+    """
+    if not path.exists():
+        return {}
+    txt = path.read_text(encoding="utf-8").strip()
+    if not txt:
+        return {}
+    try:
+        tree = ast.parse(txt, filename=str(path))
+    except SyntaxError:
+        return {"": json.loads(txt)}
+    out: dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            out[node.targets[0].id] = ast.literal_eval(node.value)
+        elif isinstance(node, ast.Expr):
+            out[""] = ast.literal_eval(node.value)
+    return out
+
+
+def _candidate_paths(root: Path, season_year: int | None) -> dict[str, list[Path]]:
+    races = [root / "Races.txt"]
+    calendar: list[Path] = []
+    if season_year:
+        races.insert(0, root / f"Races_{season_year}.txt")
+        calendar.append(root / f"Calendar_{season_year}.txt")
+    return {"races": races, "rankpoints": [root / "Rankpoints.txt"], "calendar": calendar}
+
+
+def _signature(paths: dict[str, list[Path]]) -> tuple[tuple[str, int | None], ...]:
+    sig = []
+    for group in paths.values():
+        for p in group:
+            try:
+                sig.append((str(p), p.stat().st_mtime_ns))
+            except OSError:
+                sig.append((str(p), None))
+    return tuple(sig)
+
+
+def _validate(races: list[str], races_rank: dict[str, int], rank_points: dict[int, list[int]]) -> None:
+    if len(set(races)) != len(races):
+        raise RuntimeError("Invalid rules: duplicate race keys in Races list")
+    missing_tier = [r for r in races if r not in races_rank]
+    if missing_tier:
+        raise RuntimeError(f"Invalid rules: races without a tier in races_rank: {missing_tier}")
+    for race_key, tier in races_rank.items():
+        if tier not in rank_points:
+            raise RuntimeError(f"Invalid rules: race {race_key!r} uses tier {tier} with no points table")
+    for tier, table in rank_points.items():
+        if not table or any(p < 0 for p in table):
+            raise RuntimeError(f"Invalid rules: points table for tier {tier} is empty or negative")
+        if any(a < b for a, b in zip(table, table[1:])):
+            raise RuntimeError(f"Invalid rules: points table for tier {tier} is not non-increasing")
+
+
+def _build(root: Path, season_year: int | None, paths: dict[str, list[Path]]) -> SeasonRules:
+    sources: list[str] = []
+
+    races: list[str] = list(RACES)
+    for p in paths["races"]:
+        ns = _read_literals(p)
+        value = ns.get("Races", ns.get(""))
+        if value is None:
+            continue
+        if not isinstance(value, list) or not all(isinstance(x, str) for x in value):
+            raise RuntimeError(f"Invalid {p.name} format: expected `Races = [..]` (list of strings)")
+        races = [x.strip().strip('"').strip() for x in value if x.strip()]
+        sources.append(str(p))
+        break
+
+    races_rank: dict[str, int] = dict(RACES_RANK)
+    rank_points: dict[int, list[int]] = {k: list(v) for k, v in RANK_POINTS.items()}
+    for p in paths["rankpoints"]:
+        ns = _read_literals(p)
+        if not ns:
+            continue
+        rr, rp = ns.get("races_rank"), ns.get("rank_points")
+        if not isinstance(rr, dict) or not isinstance(rp, dict):
+            raise RuntimeError(f"Invalid {p.name} format: expected `races_rank = {{...}}` and `rank_points = {{...}}`")
+        races_rank = {k: v for k, v in rr.items() if isinstance(k, str) and isinstance(v, int)}
+        rank_points = {
+            k: list(v)
+            for k, v in rp.items()
+            if isinstance(k, int) and isinstance(v, list) and all(isinstance(x, int) for x in v)
+        }
+        sources.append(str(p))
+
+    race_dates: dict[str, str] = {}
+    for p in paths["calendar"]:
+        ns = _read_literals(p)
+        value = ns.get("Calendar", ns.get(""))
+        if value is None:
+            continue
+        if not isinstance(value, dict):
+            raise RuntimeError(f"Invalid {p.name} format: expected `Calendar = {{race_key: date}}`")
+        race_dates = {str(k): str(v) for k, v in value.items()}
+        sources.append(str(p))
+
+    _validate(races, races_rank, rank_points)
+    table_by_race = {r: tuple(rank_points[races_rank[r]]) for r in races}
+    return SeasonRules(
+        season_year=season_year,
+        races=tuple(races),
+        races_rank=races_rank,
+        rank_points=rank_points,
+        race_dates=race_dates,
+        sources=tuple(sources),
+        _table_by_race=table_by_race,
+    )
+
+
+_CACHE: dict[tuple[str, int | None], tuple[tuple, SeasonRules]] = {}
+
+
+def load_season_rules(season_year: int | None = None, root: str | Path | None = None) -> SeasonRules:
+    """
+    Load (or return the cached) rules for a season. The cache entry is invalidated
+    when any candidate source file appears, disappears or changes mtime.
+    """
+    root_path = Path(root) if root is not None else rules_dir()
+    paths = _candidate_paths(root_path, season_year)
+    sig = _signature(paths)
+    key = (str(root_path.resolve()), season_year)
+    cached = _CACHE.get(key)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    rules = _build(root_path, season_year, paths)
+    _CACHE[key] = (sig, rules)
+    return rules
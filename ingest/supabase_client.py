@@ -1,12 +1,219 @@
 from __future__ import annotations
 
-from supabase import create_client
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
 
-from .env import SUPABASE_SERVICE_ROLE_KEY, SUPABASE_URL
+from .metrics import METRICS
 
+_VERBS = ("select", "insert", "upsert", "update", "delete")
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    """
+    One PostgREST round trip. `shape` lists the builder calls with their column
+    arguments but no values, e.g. ("select(id, pcs_slug)", "in_(pcs_slug)"), so
+    repeated per-row queries collapse to the same shape.
+    """
+
+    table: str
+    verb: str
+    shape: tuple[str, ...]
+    rows: int
+    seconds: float
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self) -> None:
+        self.records: list[QueryRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, rec: QueryRecord) -> None:
+        with self._lock:
+            self.records.append(rec)
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.records)
+
+    def by_shape(self) -> Counter:
+        return Counter((r.table, r.verb, r.shape) for r in self.records)
+
+    def summary(self, top: int = 10) -> str:
+        lines = [f"{self.round_trips} round trips"]
+        for (table, verb, shape), n in self.by_shape().most_common(top):
+            lines.append(f"  {n:5d} x {table}.{verb} {' '.join(shape)}")
+        return "\n".join(lines)
+
+
+_ACTIVE: list[QueryRecorder] = []
+
+# Called before every insert/upsert/update/delete; raising stops the write. The run lease
+# installs one so a run that lost its lease cannot keep writing (see lease.job_lease).
+_WRITE_GUARD: Callable[[], None] | None = None
+_WRITE_VERBS = ("insert", "upsert", "update", "delete")
+
+
+def set_write_guard(guard: Callable[[], None] | None) -> Callable[[], None] | None:
+    """
+    Install `guard`, called before every write; returns the previous guard.
+    """
+    global _WRITE_GUARD
+    previous, _WRITE_GUARD = _WRITE_GUARD, guard
+    return previous
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """
+    Record every round trip made through an instrumented client while active.
+    """
+    rec = QueryRecorder()
+    _ACTIVE.append(rec)
+    try:
+        yield rec
+    finally:
+        _ACTIVE.remove(rec)
+
+
+@contextmanager
+def round_trip_budget(max_round_trips: int, max_per_shape: int | None = None) -> Iterator[QueryRecorder]:
+    """
+    Fail (RoundTripBudgetExceeded) when the block makes more than `max_round_trips`
+    round trips, or repeats one query shape more than `max_per_shape` times (N+1).
+
+        with round_trip_budget(12, max_per_shape=3):
+            recompute_season(sb, 2026, log)
+    """
+    with record_queries() as rec:
+        yield rec
+    if rec.round_trips > max_round_trips:
+        raise RoundTripBudgetExceeded(f"budget {max_round_trips} exceeded: {rec.summary()}")
+    if max_per_shape is not None and rec.records:
+        n = rec.by_shape().most_common(1)[0][1]
+        if n > max_per_shape:
+            raise RoundTripBudgetExceeded(f"query shape repeated {n}x (max {max_per_shape}): {rec.summary()}")
+
+
+def _shape_part(name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    if name == "select":
+        return f"select({args[0] if args else '*'})"
+    if name in ("insert", "upsert"):
+        return f"{name}(on_conflict={kwargs['on_conflict']})" if kwargs.get("on_conflict") else name
+    if args and isinstance(args[0], str) and name not in ("update", "delete"):
+        return f"{name}({args[0]})"
+    return name
 
-def get_supabase():
-    # Service role key (server-side only)
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
+class _InstrumentedQuery:
+    """
+    Proxy over a postgrest request builder: forwards every call, remembers the verb
+    and filter shape, and records one DB round trip (table, verb, rows, latency)
+    on `.execute()`.
+    """
 
+    def __init__(self, builder: Any, table: str, verb: str, shape: tuple[str, ...] = ()) -> None:
+        self._builder = builder
+        self._table = table
+        self._verb = verb
+        self._shape = shape
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # e.g. `.not_` returns a builder: keep wrapping the chain.
+            if hasattr(attr, "execute"):
+                return _InstrumentedQuery(attr, self._table, self._verb, self._shape + (name,))
+            return attr
+        if name == "execute":
+            return self._execute
+        verb = name if name in _VERBS else self._verb
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            out = attr(*args, **kwargs)
+            if not hasattr(out, "execute"):
+                return out
+            return _InstrumentedQuery(out, self._table, verb, self._shape + (_shape_part(name, args, kwargs),))
+
+        return call
+
+    def _execute(self) -> Any:
+        if _WRITE_GUARD is not None and self._verb in _WRITE_VERBS:
+            _WRITE_GUARD()
+        t0 = time.perf_counter()
+        res = self._builder.execute()
+        seconds = time.perf_counter() - t0
+        data = getattr(res, "data", None)
+        rows = len(data) if isinstance(data, list) else (1 if data else 0)
+        METRICS.record_db(self._table, self._verb, rows, seconds)
+        if _ACTIVE:
+            rec = QueryRecord(self._table, self._verb, self._shape, rows, seconds)
+            for r in _ACTIVE:
+                r.add(rec)
+        return res
+
+
+class InstrumentedClient:
+    """
+    Supabase client wrapper counting every PostgREST call (see `metrics`,
+    `record_queries` and `round_trip_budget`).
+    Anything other than `table`/`from_`/`rpc` is passed through unchanged.
+    """
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    def table(self, name: str) -> _InstrumentedQuery:
+        return _InstrumentedQuery(self._client.table(name), name, "select")
+
+    def from_(self, name: str) -> _InstrumentedQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: dict[str, Any] | None = None, **kwargs: Any) -> _InstrumentedQuery:
+        return _InstrumentedQuery(self._client.rpc(fn, params or {}, **kwargs), f"rpc:{fn}", "rpc", ("rpc",))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def instrument_client(client: Any) -> InstrumentedClient:
+    return client if isinstance(client, InstrumentedClient) else InstrumentedClient(client)
+
+
+_CLIENT: InstrumentedClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_supabase() -> InstrumentedClient:
+    """
+    Process-wide client, created on first use (jobs chained by `python -m ingest` share it).
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = instrument_client(_create_client())
+        return _CLIENT
+
+
+def _create_client() -> Any:
+    from . import env  # loads .env (MEGABIKE_LOCAL_DB may be set there)
+
+    # Offline runs: SQLite stand-in for PostgREST (see local_backend).
+    if os.getenv("MEGABIKE_LOCAL_DB"):
+        from .local_backend import connect_local
+
+        return connect_local()
+
+    from supabase import create_client
+
+    # Service role key (server-side only)
+    return create_client(env.SUPABASE_URL, env.SUPABASE_SERVICE_ROLE_KEY)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .records import RaceListing
+
+# Calendar-aware planning for `daily_sync --sync-all`.
+#
+# Each season race gets one action:
+#   - "skip_future": race date is after today, PCS can't have results yet
+#   - "poll":        race ran today/yesterday, or is past but has no stored results
+#   - "recheck":     race has results but is within the correction window
+#   - "frozen":      race has results and is older than the correction window
+# Races with no known date are polled (we can't tell whether they ran).
+#
+# Sharded runs (`--shard i/n`) split the season race list before planning, round-robin in
+# rules order, so each shard gets a deterministic, calendar-spread subset and plans only
+# its own races.
+
+FETCH_ACTIONS = ("poll", "recheck")
+
+
+@dataclass(frozen=True)
+class PlannedRace:
+    race_key: str
+    action: str
+    race_date: str | None
+    reason: str
+
+    @property
+    def fetch(self) -> bool:
+        return self.action in FETCH_ACTIONS
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    "2/4" -> (2, 4); shards are numbered 1..n.
+    """
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError as e:
+        raise ValueError(f"invalid shard {spec!r}, expected i/n (e.g. 1/4)") from e
+    if not 1 <= index <= count:
+        raise ValueError(f"invalid shard {spec!r}, expected 1 <= i <= n")
+    return index, count
+
+
+def shard_races(race_keys: list[str] | tuple[str, ...], index: int, count: int) -> list[str]:
+    """
+    Races of shard `index` (1-based) out of `count`: every count-th race in rules order.
+    """
+    return list(race_keys[index - 1 :: count])
+
+
+def race_pcs_slug(race_key: str, season_year: int) -> str:
+    return f"race/{race_key}/{season_year}"
+
+
+def load_stored_state(sb, season_year: int) -> dict[str, dict[str, Any]]:
+    """
+    Returns {race_key: {"race_id", "race_date", "has_results"}} for races already in the DB.
+    Two queries: season races, then one winner row (rank 1) per race with results.
+    """
+    races = (
+        sb.table("races")
+        .select("id, pcs_slug, race_date")
+        .like("pcs_slug", f"race/%/{season_year}")
+        .execute()
+        .data
+        or []
+    )
+    by_id = {r["id"]: r for r in races if r.get("id")}
+    with_results: set[str] = set()
+    if by_id:
+        winners = sb.table("race_results").select("race_id").in_("race_id", list(by_id)).eq("rank", 1).execute().data or []
+        with_results = {w["race_id"] for w in winners}
+
+    out: dict[str, dict[str, Any]] = {}
+    for rid, r in by_id.items():
+        parts = str(r.get("pcs_slug") or "").split("/")
+        if len(parts) < 3:
+            continue
+        out[parts[1]] = {"race_id": rid, "race_date": r.get("race_date"), "has_results": rid in with_results}
+    return out
+
+
+def plan_sync(
+    race_keys: list[str] | tuple[str, ...],
+    today: date,
+    listing_by_key: dict[str, RaceListing] | None = None,
+    stored: dict[str, dict[str, Any]] | None = None,
+    calendar: dict[str, str] | None = None,
+    recheck_days: int = 3,
+) -> list[PlannedRace]:
+    """
+    Decide what to do with each race. Date sources, in order: PCS listing, rules calendar,
+    stored `races.race_date` (which falls back to the sync day, so it is trusted last).
+    """
+    listing_by_key = listing_by_key or {}
+    stored = stored or {}
+    calendar = calendar or {}
+
+    out: list[PlannedRace] = []
+    for race_key in race_keys:
+        st = stored.get(race_key) or {}
+        has_results = bool(st.get("has_results"))
+        listing = listing_by_key.get(race_key)
+        race_date = (listing.date if listing else None) or calendar.get(race_key) or st.get("race_date")
+
+        if not race_date:
+            out.append(PlannedRace(race_key, "poll", None, "date unknown"))
+            continue
+        try:
+            d = date.fromisoformat(str(race_date)[:10])
+        except ValueError:
+            out.append(PlannedRace(race_key, "poll", None, f"unparsable date {race_date!r}"))
+            continue
+
+        age = (today - d).days
+        if age < 0:
+            action, reason = "skip_future", f"runs in {-age}d"
+        elif age <= 1:
+            action, reason = "poll", "ran today/yesterday"
+        elif not has_results:
+            action, reason = "poll", "past race without stored results"
+        elif age <= recheck_days:
+            action, reason = "recheck", f"correction window ({age}d <= {recheck_days}d)"
+        else:
+            action, reason = "frozen", f"final since {(d + timedelta(days=recheck_days)).isoformat()}"
+        out.append(PlannedRace(race_key, action, d.isoformat(), reason))
+    return out
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import pytest
+
+from ingest import supabase_client
+from ingest.local_backend import connect_local
+
+
+@pytest.fixture
+def sb(tmp_path, monkeypatch):
+    """
+    Instrumented client over a fresh local SQLite backend, installed as get_supabase().
+    """
+    monkeypatch.setenv("MEGABIKE_LOCAL_DB", str(tmp_path / "local.sqlite3"))
+    monkeypatch.setenv("MEGABIKE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("MEGABIKE_METRICS_DIR", str(tmp_path / "metrics"))
+    monkeypatch.setenv("MEGABIKE_LEASE", "0")
+    client = supabase_client.instrument_client(connect_local(tmp_path / "local.sqlite3"))
+    monkeypatch.setattr(supabase_client, "_CLIENT", client)
+    return client
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from ingest.lease import LEASE_NAME, SHARD_LEASES, WATCH_LEASE_NAME, LeaseBusy, LeaseLost, RunLease, job_lease, lease_spec
+from ingest.supabase_client import set_write_guard
+
+
+def test_second_holder_is_refused_until_release(sb):
+    first = RunLease(sb, "daily_sync", ttl=30)
+    first.acquire()
+    with pytest.raises(LeaseBusy):
+        RunLease(sb, "yearly_refresh", ttl=30).acquire()
+    first.release()
+    second = RunLease(sb, "yearly_refresh", ttl=30)
+    second.acquire()
+    second.release()
+
+
+def test_busy_job_exits_with_busy_code(sb, monkeypatch):
+    monkeypatch.setenv("MEGABIKE_LEASE", "1")
+    holder = RunLease(sb, "other", ttl=30)
+    holder.acquire()
+    with pytest.raises(SystemExit) as exc:
+        with job_lease("daily_sync", wait=0):
+            pass
+    assert exc.value.code == 75
+    holder.release()
+
+
+def test_expired_lease_stops_writes(sb):
+    lease = RunLease(sb, "daily_sync", ttl=1)
+    lease.acquire()
+    lease._stop.set()  # heartbeat stalls (e.g. a hung process)
+    set_write_guard(lease.check)
+    try:
+        sb.table("sync_state").upsert({"season_year": 2026}, on_conflict="season_year").execute()
+        time.sleep(1.1)
+        taker = RunLease(sb, "daily_sync", ttl=30)
+        taker.acquire()
+        with pytest.raises(LeaseLost):
+            sb.table("sync_state").upsert({"season_year": 2027}, on_conflict="season_year").execute()
+        sb.table("sync_state").select("season_year").execute()  # reads still work
+    finally:
+        set_write_guard(None)
+    lease.release()  # must not drop the new holder's lease
+    assert sb.table("job_leases").select("holder").execute().data == [{"holder": taker.holder}]
+
+
+def test_lease_specs():
+    assert lease_spec(["--sync-all"]) == (LEASE_NAME, (SHARD_LEASES,))
+    assert lease_spec(["--finalize"]) == (LEASE_NAME, ())
+    assert lease_spec(["--watch"]) == (WATCH_LEASE_NAME, ())
+    assert lease_spec(["--sync-all", "--shard", "2/4"]) == (f"{LEASE_NAME}:shard-2-of-4", (LEASE_NAME,))
+
+
+def test_shards_and_main_lease_exclude_each_other(sb, monkeypatch):
+    monkeypatch.setenv("MEGABIKE_LEASE", "1")
+    with job_lease("daily_sync", wait=0, name=f"{LEASE_NAME}:shard-1-of-2", conflicts=(LEASE_NAME,)):
+        with pytest.raises(SystemExit):
+            with job_lease("yearly_refresh", wait=0):
+                pass
+        # The refused job released the main lease again: the second shard can start.
+        with job_lease("daily_sync", wait=0, name=f"{LEASE_NAME}:shard-2-of-2", conflicts=(LEASE_NAME,)):
+            pass
+        with job_lease("daily_sync", wait=0, conflicts=()):  # --finalize waits for shards itself
+            with pytest.raises(SystemExit):
+                with job_lease("daily_sync", wait=0, name=f"{LEASE_NAME}:shard-2-of-2", conflicts=(LEASE_NAME,)):
+                    pass
+
+
+def test_watch_updates_take_the_main_lease(sb, monkeypatch):
+    monkeypatch.setenv("MEGABIKE_LEASE", "1")
+    with job_lease("daily_sync", wait=0, name=WATCH_LEASE_NAME, conflicts=()) as watch:
+        # A scheduled job holds the main lease: the watcher's update is refused, not run.
+        with job_lease("daily_sync", wait=0):
+            with pytest.raises(LeaseBusy):
+                with job_lease("daily_sync:watch", wait=0, exit_busy=False):
+                    pass
+        # While an update holds the main lease, scheduled jobs are refused.
+        with job_lease("daily_sync:watch", wait=0, exit_busy=False):
+            sb.table("sync_state").upsert({"season_year": 2026}, on_conflict="season_year").execute()
+            with pytest.raises(SystemExit):
+                with job_lease("daily_sync", wait=0):
+                    pass
+        # After the update, the watch lease still guards the watcher's writes.
+        watch.lost = True
+        with pytest.raises(LeaseLost):
+            sb.table("sync_state").upsert({"season_year": 2027}, on_conflict="season_year").execute()
+        watch.lost = False
+
+
+def test_watch_retries_updates_it_could_not_store(monkeypatch):
+    import asyncio
+
+    from ingest import race_watch
+
+    row = race_watch.ResultRow(1, "A Rider", "rider/a", "A Team")
+    monkeypatch.setattr(race_watch, "parse_race_result_table", lambda html: [row])
+    stored: list[bool] = []
+
+    async def fetch(race_key):
+        return "race/x/2026/result", 200, b"<table/>"
+
+    async def store(race_key, result_slug, html):
+        stored.append(len(stored) > 0)  # main lease busy on the first attempt
+        return stored[-1]
+
+    watches = asyncio.run(
+        race_watch.watch_races(
+            ["x"],
+            fetch,
+            store,
+            budget=10,
+            idle_interval=0,
+            active_interval=0,
+            stable_after=2,
+            deadline=time.time() + 60,
+            log=lambda m: None,
+        )
+    )
+    assert stored == [False, True]
+    assert watches["x"].updates == 1 and watches["x"].done
+
+
+def test_finalize_requires_every_shard_to_finish(sb):
+    import asyncio
+
+    from ingest.daily_sync import finalize_shards, record_shard_done
+
+    day = "2026-05-01"
+    # No shard lease is live, but shard 2/3 never ran (or crashed before finishing).
+    with pytest.raises(SystemExit) as exc:
+        asyncio.run(finalize_shards(sb, 2026, day, 0, print))
+    assert exc.value.code == 75
+    record_shard_done(sb, 2026, day, (1, 3))
+    record_shard_done(sb, 2026, day, (3, 3))
+    with pytest.raises(SystemExit):
+        asyncio.run(finalize_shards(sb, 2026, day, 0, print))
+    record_shard_done(sb, 2026, "2026-04-30", (2, 3))  # yesterday's run does not count
+    with pytest.raises(SystemExit):
+        asyncio.run(finalize_shards(sb, 2026, day, 0, print))
+
+    record_shard_done(sb, 2026, day, (2, 3))
+    asyncio.run(finalize_shards(sb, 2026, day, 0, print))
+    assert sb.table("read_models").select("model_key").eq("model_key", "leaderboard").execute().data
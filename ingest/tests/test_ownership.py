@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from ingest.ownership import load_ownership, load_team_rosters, refresh_rider_ownership
+from ingest.supabase_client import record_queries
+
+
+def _writes(rec) -> int:
+    return sum(1 for r in rec.records if r.verb in ("upsert", "delete"))
+
+
+def test_refresh_writes_only_changed_rows(sb):
+    from ingest.local_backend import seed
+
+    seed(sb, 2026, n_riders=60, n_teams=4, roster_size=5)
+    index = refresh_rider_ownership(sb, 2026)
+    stored = load_ownership(sb, 2026)
+    assert set(stored) == set(index)
+
+    with record_queries() as rec:
+        refresh_rider_ownership(sb, 2026)
+    assert _writes(rec) == 0
+
+    rosters = load_team_rosters(sb, 2026)
+    team_id = sorted(rosters)[0]
+    dropped = rosters[team_id][0]
+    sb.table("team_riders").delete().eq("team_id", team_id).eq("rider_id", dropped).execute()
+    with record_queries() as rec:
+        index = refresh_rider_ownership(sb, 2026)
+    assert _writes(rec) >= 1
+    assert set(load_ownership(sb, 2026)) == set(index)
+    assert team_id not in index.get(dropped, [])
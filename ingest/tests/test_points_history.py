@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from ingest.points_history import CHECKPOINT_EVERY, entity_series, points_as_of, record_points
+
+
+def test_checkpoint_resets_entities_that_dropped_to_zero(sb):
+    record_points(sb, 2026, "rider", {"a": 10, "b": 5}, day="2026-03-01")  # checkpoint
+    record_points(sb, 2026, "rider", {"a": 12, "b": 5}, day="2026-03-02")
+    checkpoint_day = f"2026-03-{1 + CHECKPOINT_EVERY:02d}"
+    record_points(sb, 2026, "rider", {"a": 12, "b": 0}, day=checkpoint_day)
+
+    assert points_as_of(sb, 2026, "rider", checkpoint_day) == {"a": 12}
+    assert entity_series(sb, 2026, "rider", "b") == [("2026-03-01", 5), (checkpoint_day, 0)]
+    assert entity_series(sb, 2026, "rider", "a") == [("2026-03-01", 10), ("2026-03-02", 12), (checkpoint_day, 12)]
+
+    # Rerunning the checkpoint day keeps the 0 row.
+    record_points(sb, 2026, "rider", {"a": 12, "b": 0}, day=checkpoint_day)
+    assert entity_series(sb, 2026, "rider", "b")[-1] == (checkpoint_day, 0)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from ingest.provision_invites import code_user, load_prefix_codes, plan_invites, provision_invites
+
+
+def test_code_user_accepts_object_list_and_null():
+    assert code_user({"users": {"id": "u1"}}) == {"id": "u1"}
+    assert code_user({"users": [{"id": "u1"}]}) == {"id": "u1"}
+    assert code_user({"users": []}) is None
+    assert code_user({"users": None}) is None
+    assert code_user({}) is None
+
+
+def test_plan_with_object_embeds_only_repairs_missing_links():
+    existing = [
+        {"id": "c1", "code": "MB-AAAAAA", "is_active": True, "assigned_user_id": "u1", "users": {"id": "u1", "display_name": "x"}},
+        {"id": "c2", "code": "MB-BBBBBB", "is_active": True, "assigned_user_id": None, "users": {"id": "u2", "display_name": "y"}},
+        {"id": "c3", "code": "MB-CCCCCC", "is_active": True, "assigned_user_id": None, "users": None},
+    ]
+    code_rows, user_rows, created = plan_invites(existing, "MB-", 3, 6)
+    assert created == 0
+    assert [(r["id"], r["assigned_user_id"]) for r in code_rows[:1]] == [("c2", "u2")]
+    assert [u["access_code_id"] for u in user_rows] == ["c3"]
+    assert code_rows[1]["assigned_user_id"] == user_rows[0]["id"]
+
+
+def test_rerun_and_repair_against_local_backend(sb):
+    first = provision_invites(sb, "MB26-", 25)
+    assert len(first) == 25
+    codes = load_prefix_codes(sb, "MB26-")
+    assert all(isinstance(c["users"], dict) for c in codes)
+    assert all(c["assigned_user_id"] == c["users"]["id"] for c in codes)
+
+    # Rerun over claimed codes writes nothing and keeps the names.
+    rows, users, created = plan_invites(codes, "MB26-", 25, 6)
+    assert (rows, users, created) == ([], [], 0)
+    assert sorted(i["code"] for i in provision_invites(sb, "MB26-", 25)) == sorted(i["code"] for i in first)
+
+    # Half-done invite: code without its link, and a code without a user.
+    broken = codes[0]
+    sb.table("access_codes").update({"assigned_user_id": None}).eq("id", broken["id"]).execute()
+    orphan = sb.table("access_codes").insert({"code": "MB26-ZZZZZZ"}).execute().data[0]
+    provision_invites(sb, "MB26-", 26)
+    fixed = {c["code"]: c for c in load_prefix_codes(sb, "MB26-")}
+    assert len(fixed) == 26
+    assert fixed[broken["code"]]["assigned_user_id"] == broken["users"]["id"]
+    assert fixed[orphan["code"]]["users"]["display_name"] == "Rookie-ZZZZZZ"
+    assert fixed[orphan["code"]]["assigned_user_id"] == fixed[orphan["code"]]["users"]["id"]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from ingest.local_backend import seed
+from ingest.read_models import publish_read_models, published_team_keys
+
+
+def test_publish_deletes_models_of_deleted_teams(sb):
+    seed(sb, 2026, n_riders=40, n_teams=3, roster_size=5)
+    publish_read_models(sb, 2026)
+    keys = published_team_keys(sb, 2026)
+    assert len(keys) == 3
+
+    gone = keys[0].split(":", 1)[1]
+    sb.table("teams").delete().eq("id", gone).execute()
+    publish_read_models(sb, 2026)
+
+    assert published_team_keys(sb, 2026) == keys[1:]
+    assert sb.table("read_models").select("model_key").eq("model_key", "leaderboard").execute().data
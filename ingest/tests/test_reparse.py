@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+
+def test_reparse_restores_negative_cache_setting(sb, tmp_path, monkeypatch):
+    from ingest import daily_sync, reparse
+
+    seen = []
+
+    async def failing_sync(argv):
+        seen.append(os.environ.get("PCS_NEGATIVE_CACHE"))
+        raise RuntimeError("sync failed")
+
+    monkeypatch.setenv("PCS_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setenv("PCS_NEGATIVE_CACHE", "1")
+    monkeypatch.setattr(daily_sync, "main", failing_sync)
+    with pytest.raises(RuntimeError):
+        asyncio.run(reparse.main(["--season-year", "2026"]))
+    assert seen == ["0"]
+    assert os.environ["PCS_NEGATIVE_CACHE"] == "1"
+
+    monkeypatch.delenv("PCS_NEGATIVE_CACHE")
+    with pytest.raises(RuntimeError):
+        asyncio.run(reparse.main(["--season-year", "2026"]))
+    assert "PCS_NEGATIVE_CACHE" not in os.environ
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+
+from ingest.local_backend import seed
+from ingest.supabase_client import round_trip_budget
+
+# Round-trip budgets for the recompute and the team import against the local backend:
+# a change that brings back per-team or per-rider queries fails here.
+
+N_TEAMS = 20
+ROSTER = 12
+
+
+def test_recompute_season_round_trips(sb):
+    from ingest.daily_sync import recompute_season
+
+    seed(sb, 2026, n_riders=100, n_teams=N_TEAMS, roster_size=ROSTER, n_races=6, results_per_race=30)
+    # Every team's points change once: one update per team, the rest is per season.
+    with round_trip_budget(30 + N_TEAMS):
+        recompute_season(sb, 2026, print)
+    # Nothing changed: no per-team writes left.
+    with round_trip_budget(30, max_per_shape=5):
+        recompute_season(sb, 2026, print)
+
+
+def test_import_teams_round_trips(sb, tmp_path):
+    from ingest import import_teams_cleaned_2025
+
+    seed(sb, 2026, n_riders=100, n_teams=0)
+    path = tmp_path / "teams.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["team_name", "owner", "position", "standardized_rider", "points"])
+        for t in range(N_TEAMS):
+            for slot in range(1, ROSTER + 1):
+                w.writerow([f"Team #{t}", f"Owner {t}", slot, f"rider/rider-{(t * 7 + slot * 13) % 100}", 10])
+
+    # The import writes team by team, but a team costs a fixed number of round trips
+    # whatever its roster size (no per-rider queries).
+    argv = ["--season-year", "2026", "--csv", str(path), "--max-riders", str(ROSTER)]
+    with round_trip_budget(15 + 15 * N_TEAMS, max_per_shape=2 * N_TEAMS + 5):
+        asyncio.run(import_teams_cleaned_2025.main(argv))
+    assert len(sb.table("team_riders").select("team_id").execute().data) == N_TEAMS * ROSTER
+
+
+def test_incremental_recompute_matches_full_recompute(sb):
+    from ingest.daily_sync import recompute_riders, recompute_season
+
+    # 100 riders x 20 races is over the 1000-row page of one race_results select.
+    seed(sb, 2026, n_riders=200, n_teams=N_TEAMS, roster_size=ROSTER, n_races=20, results_per_race=150)
+    recompute_season(sb, 2026, print)
+    points = {r["rider_id"]: r["points"] for r in sb.table("rider_points").select("rider_id, points").execute().data}
+    teams = {t["id"]: t["points"] for t in sb.table("teams").select("id, points").execute().data}
+
+    riders = sorted(points)[:100]
+    recompute_riders(sb, 2026, riders, print)
+    after = {r["rider_id"]: r["points"] for r in sb.table("rider_points").select("rider_id, points").execute().data}
+    assert after == points
+    assert {t["id"]: t["points"] for t in sb.table("teams").select("id, points").execute().data} == teams
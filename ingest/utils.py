@@ -1,16 +1,42 @@
 from __future__ import annotations
 
 import hashlib
+import os
+from pathlib import Path
 from typing import Any, TypeVar
 
 T = TypeVar("T")
 
 
+def cache_dir(*parts: str) -> Path:
+    """
+    Local state directory for the worker (journals, caches): $MEGABIKE_CACHE_DIR or `<repo>/.cache`.
+    """
+    root = os.getenv("MEGABIKE_CACHE_DIR") or str(Path(__file__).resolve().parent.parent / ".cache")
+    p = Path(root, *parts)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
 def chunked(items: list[T], size: int) -> list[list[T]]:
     """Yield successive n-sized chunks from items."""
     return [items[i : i + size] for i in range(0, len(items), size)]
 
 
+def select_in(sb, table: str, columns: str, column: str, values: list[Any], size: int = 200, **eq: Any) -> list[dict[str, Any]]:
+    """
+    Select rows where `column` is in `values`, chunked to keep PostgREST URLs short.
+    Extra keyword args are applied as `.eq()` filters.
+    """
+    out: list[dict[str, Any]] = []
+    for batch in chunked(values, size):
+        q = sb.table(table).select(columns).in_(column, batch)
+        for k, v in eq.items():
+            q = q.eq(k, v)
+        out.extend(q.execute().data or [])
+    return out
+
+
 def stable_rider_slug(name: str, nationality: str | None = None) -> str:
     """
     Generate a stable slug for a rider if PCS URL is missing.
@@ -1,86 +1,176 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 import hashlib
 import sys
 from datetime import datetime
-from typing import Any
+from itertools import islice
+from typing import Any, AsyncIterator, Iterator, NamedTuple
 
-from .pcs_http import fetch_pcs_html
+from .lease import job_lease
+from .metrics import run_report
+from .pcs_async import to_thread
+from .pcs_http import fetch_pcs_bytes
 from .pcs_parse import parse_rankings_php_uci_one_day, parse_rider_ranking_table
+from .records import RankingRow
 from .supabase_client import get_supabase
-from .utils import chunked, derive_price_from_points, stable_rider_slug
+from .utils import derive_price_from_points, select_in, stable_rider_slug
 
 
-def _load_seed_csv(path: str) -> list[dict[str, Any]]:
+class SeedRow(NamedTuple):
+    """
+    One rider to seed, from a PCS ranking row or a CSV line. `price` is None when it
+    should be derived from `points`.
+    """
+
+    rider_name: str
+    pcs_slug: str
+    team_name: str | None
+    nationality: str | None
+    points: int
+    price: int | None
+
+    @classmethod
+    def from_ranking(cls, r: RankingRow) -> "SeedRow":
+        return cls(r.rider_name, r.rider_url, r.team_name, None, r.points, None)
+
+
+def _int_or_none(v: Any) -> int | None:
+    try:
+        return int(float(v)) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _iter_seed_csv(path: str) -> Iterator[SeedRow]:
     """
     CSV columns (minimal):
-      - rider_name (required)
+      - rider_name (required; `name` accepted)
       - price (optional int) OR points (optional int; used to derive price)
-      - pcs_slug (optional)
-      - team_name (optional)
+      - pcs_slug (optional; `rider_url` / `url` accepted)
+      - team_name (optional; `team` accepted)
       - nationality (optional)
     """
-    out: list[dict[str, Any]] = []
     with open(path, "r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             if not row:
                 continue
-            name = (row.get("rider_name") or row.get("name") or "").strip()
+            row = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
+            name = row.get("rider_name") or row.get("name") or ""
             if not name:
                 continue
-            out.append({k: (v.strip() if isinstance(v, str) else v) for k, v in row.items()})
-    return out
+            nationality = row.get("nationality") or None
+            slug = row.get("pcs_slug") or row.get("rider_url") or row.get("url") or row.get("rider")
+            yield SeedRow(
+                rider_name=name,
+                pcs_slug=slug or stable_rider_slug(name, nationality),
+                team_name=row.get("team_name") or row.get("team") or None,
+                nationality=nationality,
+                points=_int_or_none(row.get("points") or row.get("pcs_points")) or 0,
+                price=_int_or_none(row.get("price")),
+            )
 
 
-async def _try_parse_ranking(slug: str) -> dict[str, Any] | None:
+async def _try_parse_ranking(slug: str) -> list[RankingRow] | None:
     try:
         # Support both relative slugs ("rankings/me/individual") and absolute URLs
         url = slug if slug.startswith("http") else f"https://www.procyclingstats.com/{slug}"
-        status, html = await fetch_pcs_html(url)
+        status, html = await fetch_pcs_bytes(url)
         if status != 200:
             return None
         # Prefer rankings.php parser when applicable; otherwise use generic ranking table parser.
         if "rankings.php" in url and "uci-one-day-races" in url:
-            rows = parse_rankings_php_uci_one_day(html)
-        else:
-            rows = parse_rider_ranking_table(html)
-        return {"ranking": rows}
+            return parse_rankings_php_uci_one_day(html)
+        return parse_rider_ranking_table(html)
     except Exception:
         return None
 
 
+def _rankings_php_url(date_str: str, offset: int) -> str:
+    return (
+        "https://www.procyclingstats.com/rankings.php?"
+        f"p=uci-one-day-races&s=&date={date_str}&nation=&age=&page=smallerorequal&team=&"
+        f"offset={offset}&filter=Filter"
+    )
 
 
-
-async def _fetch_rankings_php_uci_one_day(date_str: str, limit: int = 1000) -> list[dict[str, Any]]:
+async def _iter_rankings_php_uci_one_day(date_str: str, limit: int = 1000) -> AsyncIterator[list[RankingRow]]:
     """
-    Fetch and parse the UCI one-day races ranking via rankings.php with offset pagination.
-    PCS uses offsets in steps of 100: 0, 100, 200, ...
+    Yield the UCI one-day races ranking page by page via rankings.php offset pagination
+    (PCS uses offsets in steps of 100: 0, 100, 200, ...). The next page is fetched while
+    the caller processes the current one.
     """
-    out: list[dict[str, Any]] = []
-    for offset in range(0, 10000, 100):
-        if len(out) >= limit:
-            break
-        url = (
-            "https://www.procyclingstats.com/rankings.php?"
-            f"p=uci-one-day-races&s=&date={date_str}&nation=&age=&page=smallerorequal&team=&"
-            f"offset={offset}&filter=Filter"
-        )
-        parsed = await _try_parse_ranking(url)
-        rows = (parsed or {}).get("ranking") or []
-        if not isinstance(rows, list) or not rows:
-            break
-        out.extend(rows)
-        # If PCS returns fewer than 100 rows, we're likely at the end.
-        if len(rows) < 50:
-            break
-    return out[:limit]
-
-
-async def main() -> None:
+    seen = 0
+    pending = asyncio.create_task(_try_parse_ranking(_rankings_php_url(date_str, 0)))
+    try:
+        for offset in range(0, 10000, 100):
+            rows = await pending
+            if not rows:
+                return
+            rows = rows[: limit - seen]
+            seen += len(rows)
+            # If PCS returns fewer than 100 rows, we're likely at the end.
+            last = seen >= limit or len(rows) < 50
+            if not last:
+                pending = asyncio.create_task(_try_parse_ranking(_rankings_php_url(date_str, offset + 100)))
+            yield rows
+            if last:
+                return
+    finally:
+        pending.cancel()
+
+
+def store_seed_batch(sb, season_year: int, rows: list[SeedRow]) -> int:
+    """
+    Upsert one batch of riders, map their ids and upsert their season prices.
+    Returns the number of priced riders.
+    """
+    if not rows:
+        return 0
+    riders = [
+        {
+            "pcs_slug": row.pcs_slug,
+            "rider_name": row.rider_name,
+            "team_name": row.team_name,
+            "nationality": row.nationality,
+            "active": True,
+        }
+        for row in rows
+    ]
+    # Upsert returns the stored rows: map ids by pcs_slug without another round trip
+    # (avoid duplicate names); re-select only slugs missing from the response.
+    upserted = sb.table("riders").upsert(riders, on_conflict="pcs_slug").execute().data or []
+    id_by_slug = {str(r["pcs_slug"]): str(r["id"]) for r in upserted if r.get("pcs_slug") and r.get("id")}
+    missing = [row.pcs_slug for row in rows if row.pcs_slug not in id_by_slug]
+    if missing:
+        for r in select_in(sb, "riders", "id, pcs_slug", "pcs_slug", missing, size=500):
+            id_by_slug[str(r["pcs_slug"])] = str(r["id"])
+
+    prices: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        rider_id = id_by_slug.get(row.pcs_slug)
+        if rider_id:
+            price = row.price if row.price is not None else derive_price_from_points(row.points)
+            prices[rider_id] = {"season_year": season_year, "rider_id": rider_id, "price": price}
+    if prices:
+        sb.table("rider_prices").upsert(list(prices.values()), on_conflict="season_year,rider_id").execute()
+    return len(prices)
+
+
+async def _csv_batches(path: str, limit: int, size: int = 500) -> AsyncIterator[list[SeedRow]]:
+    rows = islice(_iter_seed_csv(path), limit)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+async def _single_page(rows: list[RankingRow]) -> AsyncIterator[list[RankingRow]]:
+    yield rows
+
+
+async def main(argv: list[str] | None = None) -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--season-year", type=int, default=datetime.utcnow().year)
     ap.add_argument(
@@ -102,20 +192,23 @@ async def main() -> None:
         help="Fallback: seed riders/prices from a CSV if PCS scraping fails.",
     )
     ap.add_argument("--limit", type=int, default=800)
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     sb = get_supabase()
 
-    rows: list[Any] = []
-
-    # Preferred: seed riders from a broad PCS ranking list.
-    if not args.seed_csv:
-        parsed: dict[str, Any] | None = None
-
-        # New default: UCI one-day races ranking via rankings.php offsets.
+    # Riders are ingested as a stream of batches (one ranking page, or 500 CSV lines):
+    # each batch is upserted, resolved to ids and priced before the next one is consumed,
+    # while the next ranking page is already being fetched.
+    batches: AsyncIterator[list[SeedRow]]
+    if args.seed_csv:
+        # Fallback: seed from CSV
+        batches = _csv_batches(args.seed_csv, args.limit)
+    else:
+        # Preferred: seed riders from a broad PCS ranking list.
+        pages: AsyncIterator[list[RankingRow]]
         if args.ranking_slug in ("rankings.php?mode=uci_one_day", "uci-one-day-races"):
-            rows = await _fetch_rankings_php_uci_one_day(args.date, limit=args.limit)
-            parsed = {"ranking": rows} if rows else None
+            # New default: UCI one-day races ranking via rankings.php offsets.
+            pages = _iter_rankings_php_uci_one_day(args.date, limit=args.limit)
         else:
             candidates = [
                 args.ranking_slug,
@@ -123,139 +216,37 @@ async def main() -> None:
                 "rankings/me/individual",
                 "rankings/me/individual?date=" + args.date,
             ]
+            ranking: list[RankingRow] = []
             for slug in candidates:
-                parsed = await _try_parse_ranking(slug)
-                if parsed:
+                ranking = await _try_parse_ranking(slug) or []
+                if ranking:
                     break
-
-        if not parsed or not (parsed.get("ranking") or parsed.get("riders") or parsed.get("results")):
-            print(
-                "Failed to fetch/parse PCS ranking HTML.\n"
-                "This can happen if the slug is wrong or PCS serves a challenge/blocked page.\n"
-                "Fix options:\n"
-                "  1) Try another slug: --ranking-slug 'rankings/me/individual'\n"
-                "  2) Use CSV fallback: --seed-csv /path/to/riders.csv\n",
-                file=sys.stderr,
-            )
-            sys.exit(1)
-
-        # The exact structure depends on PCS HTML; keep this defensive.
-        rows_any = parsed.get("ranking") or parsed.get("riders") or parsed.get("results") or []
-        if isinstance(rows_any, list):
-            rows = rows_any
-
-    # Fallback: seed from CSV
-    seed_csv_rows: list[dict[str, Any]] = []
-    if args.seed_csv:
-        seed_csv_rows = _load_seed_csv(args.seed_csv)
-        rows = seed_csv_rows
-
-    riders_to_upsert: list[dict[str, Any]] = []
-    prices_to_upsert: list[dict[str, Any]] = []
-
-    for row in rows[: args.limit]:
-        if not isinstance(row, dict):
-            continue
-
-        name = row.get("rider_name") or row.get("name")
-        if not name:
-            continue
-
-        nationality = row.get("nationality")
-        team_name = row.get("team") or row.get("team_name")
-        pts = row.get("points") or row.get("pcs_points") or 0
-        try:
-            pts_int = int(pts)
-        except Exception:
-            pts_int = 0
-
-        # CSV can provide explicit price
-        price = row.get("price")
-        price_int: int | None = None
-        if price is not None and price != "":
-            try:
-                price_int = int(price)
-            except Exception:
-                price_int = None
-
-        pcs_slug = row.get("rider_url") or row.get("url") or row.get("rider") or stable_rider_slug(
-            str(name), str(nationality) if nationality else None
+            pages = _single_page(ranking[: args.limit])
+        batches = ([SeedRow.from_ranking(r) for r in page] async for page in pages)
+
+    n_batches = n_riders = n_priced = 0
+    async for batch in batches:
+        n_priced += await to_thread(lambda: store_seed_batch(sb, args.season_year, batch))
+        n_batches += 1
+        n_riders += len(batch)
+
+    if not n_riders and not args.seed_csv:
+        print(
+            "Failed to fetch/parse PCS ranking HTML.\n"
+            "This can happen if the slug is wrong or PCS serves a challenge/blocked page.\n"
+            "Fix options:\n"
+            "  1) Try another slug: --ranking-slug 'rankings/me/individual'\n"
+            "  2) Use CSV fallback: --seed-csv /path/to/riders.csv\n",
+            file=sys.stderr,
         )
-
-        riders_to_upsert.append(
-            {
-                "pcs_slug": pcs_slug,
-                "rider_name": name,
-                "team_name": team_name,
-                "nationality": nationality,
-                "active": True,
-            }
-        )
-
-    # Upsert riders by pcs_slug in chunks (safe for 1000+ riders)
-    for batch in chunked(riders_to_upsert, 500):
-        if batch:
-            sb.table("riders").upsert(batch, on_conflict="pcs_slug").execute()
-
-    # Fetch ids back for pricing upsert, keyed by pcs_slug (avoid duplicate names)
-    pcs_slugs = [r["pcs_slug"] for r in riders_to_upsert if r.get("pcs_slug")]
-    id_by_slug: dict[str, str] = {}
-    for batch in chunked([{"pcs_slug": s} for s in pcs_slugs], 500):
-        sl = [x["pcs_slug"] for x in batch]
-        fetched = sb.table("riders").select("id, pcs_slug").in_("pcs_slug", sl).execute().data or []
-        for r in fetched:
-            if r.get("pcs_slug") and r.get("id"):
-                id_by_slug[str(r["pcs_slug"])] = str(r["id"])
-
-    # Compute and upsert prices for *all* seeded riders
-    for row in rows[: args.limit]:
-        if not isinstance(row, dict):
-            continue
-        pcs_slug = row.get("rider_url") or row.get("url") or row.get("rider")
-        if not pcs_slug:
-            # last resort: try to map via name to the stable slug; skip if can't
-            name = row.get("rider_name") or row.get("name")
-            nationality = row.get("nationality")
-            if not name:
-                continue
-            pcs_slug = stable_rider_slug(str(name), str(nationality) if nationality else None)
-
-        rider_id = id_by_slug.get(str(pcs_slug))
-        if not rider_id:
-            continue
-
-        price = row.get("price")
-        if price is not None and price != "":
-            try:
-                price_int = int(price)
-            except Exception:
-                price_int = None
-        else:
-            price_int = None
-
-        pts = row.get("points") or row.get("pcs_points") or 0
-        try:
-            pts_int = int(float(pts))
-        except Exception:
-            pts_int = 0
-
-        final_price = price_int if price_int is not None else derive_price_from_points(pts_int)
-        prices_to_upsert.append(
-            {
-                "season_year": args.season_year,
-                "rider_id": rider_id,
-                "price": final_price,
-            }
-        )
-
-    for batch in chunked(prices_to_upsert, 500):
-        if batch:
-            sb.table("rider_prices").upsert(batch, on_conflict="season_year,rider_id").execute()
+        sys.exit(1)
+    print(f"[yearly] season={args.season_year} batches={n_batches} riders={n_riders} priced={n_priced}")
 
 
 if __name__ == "__main__":
     import asyncio
 
-    asyncio.run(main())
+    with job_lease("yearly_refresh"), run_report("yearly_refresh"):
+        asyncio.run(main())
 
 
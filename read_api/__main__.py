@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import argparse
+
+# Serve the read API with uvicorn (pip install -r read_api/requirements.txt):
+#   python -m read_api --port 8080
+# Data comes from get_supabase(), so MEGABIKE_LOCAL_DB serves the offline SQLite backend.
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Serve the cached Megabike read API.")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise SystemExit("uvicorn is required to serve the API: pip install -r read_api/requirements.txt") from e
+    uvicorn.run("read_api.app:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
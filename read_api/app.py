@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs
+
+from .snapshot import SeasonSnapshot, load_snapshot, read_sync_version
+
+# ASGI read service for the season views (no framework; any ASGI server can host `app`).
+#
+#   GET /seasons/{year}/leaderboard?limit=&cursor=   ranked teams, cursor-paginated
+#   GET /seasons/{year}/teams/{team_id}              team detail with roster
+#   GET /seasons/{year}/riders/{rider_id}            rider detail with season results
+#   GET /seasons/{year}/calendar?limit=&cursor=      season races by date, cursor-paginated
+#   GET /healthz
+#
+# Each season is served from an in-memory SeasonSnapshot. At most every `check_interval`
+# seconds a request re-reads the season's `sync_state.version` (bumped by daily_sync when
+# it publishes); a new version reloads the snapshot, one loader per season at a time,
+# while concurrent requests keep being served from the old one. Rendered bodies are
+# cached per snapshot with a content ETag (unchanged views keep theirs across syncs);
+# `If-None-Match` answers 304 without a body.
+# Cursors are opaque keyset positions, stable across reloads.
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MAX_CACHED_RESPONSES = 4096  # per snapshot; cursors are client-controlled
+
+_ROUTES = [
+    ("leaderboard", re.compile(r"^/seasons/(\d{4})/leaderboard/?$")),
+    ("calendar", re.compile(r"^/seasons/(\d{4})/calendar/?$")),
+    ("team", re.compile(r"^/seasons/(\d{4})/teams/([0-9a-fA-F-]{1,64})/?$")),
+    ("rider", re.compile(r"^/seasons/(\d{4})/riders/([0-9a-fA-F-]{1,64})/?$")),
+]
+
+
+class HTTPError(RuntimeError):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def encode_cursor(key: tuple[Any, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, first: type) -> tuple[Any, ...]:
+    """
+    Inverse of encode_cursor for a (first, str) key; 400 on anything else.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise HTTPError(400, "invalid cursor") from e
+    if not (isinstance(key, list) and len(key) == 2 and type(key[0]) is first and isinstance(key[1], str)):
+        raise HTTPError(400, "invalid cursor")
+    return tuple(key)
+
+
+class SnapshotCache:
+    def __init__(self, sb_factory: Callable[[], Any], check_interval: float = 5.0, max_seasons: int = 4) -> None:
+        self._sb_factory = sb_factory
+        self._sb: Any = None
+        self.check_interval = check_interval
+        self.max_seasons = max_seasons
+        self._snapshots: dict[int, SeasonSnapshot] = {}
+        self._checked: dict[int, float] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self.reloads = 0
+
+    @property
+    def sb(self) -> Any:
+        if self._sb is None:
+            self._sb = self._sb_factory()
+        return self._sb
+
+    async def get(self, season_year: int) -> SeasonSnapshot:
+        snap = self._snapshots.get(season_year)
+        if snap is not None and time.monotonic() - self._checked.get(season_year, 0.0) < self.check_interval:
+            return snap
+        lock = self._locks.setdefault(season_year, asyncio.Lock())
+        if snap is not None and lock.locked():
+            return snap  # another request is already checking / reloading
+        async with lock:
+            snap = self._snapshots.get(season_year)
+            if snap is not None and time.monotonic() - self._checked.get(season_year, 0.0) < self.check_interval:
+                return snap
+            version = await asyncio.to_thread(read_sync_version, self.sb, season_year)
+            if snap is None or snap.version != version:
+                snap = await asyncio.to_thread(load_snapshot, self.sb, season_year, version)
+                self._snapshots.pop(season_year, None)
+                self._snapshots[season_year] = snap
+                self.reloads += 1
+                while len(self._snapshots) > self.max_seasons:  # drop the least recently loaded
+                    self._snapshots.pop(next(iter(self._snapshots)))
+            self._checked[season_year] = time.monotonic()
+            return snap
+
+
+def _limit(params: dict[str, list[str]]) -> int:
+    raw = (params.get("limit") or [str(DEFAULT_LIMIT)])[0]
+    try:
+        limit = int(raw)
+    except ValueError as e:
+        raise HTTPError(400, "invalid limit") from e
+    return max(1, min(MAX_LIMIT, limit))
+
+
+def _render(snap: SeasonSnapshot, route: str, arg: str | None, params: dict[str, list[str]]) -> Any:
+    if route in ("leaderboard", "calendar"):
+        limit = _limit(params)
+        cursor = (params.get("cursor") or [None])[0]
+        after = decode_cursor(cursor, int if route == "leaderboard" else str) if cursor else None
+        page = snap.leaderboard_page if route == "leaderboard" else snap.calendar_page
+        items, next_key = page(after, limit)  # type: ignore[arg-type]
+        return {
+            "season": snap.season_year,
+            "items": items,
+            "nextCursor": encode_cursor(next_key) if next_key else None,
+        }
+    found = (snap.teams if route == "team" else snap.riders).get(arg or "")
+    if found is None:
+        raise HTTPError(404, f"{route} not found")
+    return found
+
+
+class ReadAPI:
+    def __init__(self, sb_factory: Callable[[], Any] | None = None, check_interval: float = 5.0, max_age: int = 5) -> None:
+        if sb_factory is None:
+            from ingest.supabase_client import get_supabase
+
+            sb_factory = get_supabase
+        self.cache = SnapshotCache(sb_factory, check_interval)
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        try:
+            status, headers, body = await self.handle(scope)
+        except HTTPError as e:
+            status, headers, body = e.status, [], json.dumps({"error": str(e)}).encode()
+        except Exception as e:  # never leak a traceback to clients
+            status, headers, body = 500, [], json.dumps({"error": type(e).__name__}).encode()
+        if status != 304:
+            headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope.get("method") == "HEAD" else body})
+
+    async def handle(self, scope: Scope) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        if scope.get("method") not in ("GET", "HEAD"):
+            raise HTTPError(405, "method not allowed")
+        path = scope["path"]
+        if path == "/healthz":
+            return 200, [], b'{"ok":true}'
+        for route, pattern in _ROUTES:
+            m = pattern.match(path)
+            if m:
+                break
+        else:
+            raise HTTPError(404, "not found")
+
+        season_year = int(m.group(1))
+        arg = m.group(2) if m.lastindex and m.lastindex > 1 else None
+        params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        snap = await self.cache.get(season_year)
+
+        key = (route, arg, tuple(sorted((k, tuple(v)) for k, v in params.items() if k in ("limit", "cursor"))))
+        cached = snap.responses.get(key)
+        if cached is None:
+            body = json.dumps(_render(snap, route, arg, params), separators=(",", ":"), default=str).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+            cached = (etag, body)
+            if len(snap.responses) < MAX_CACHED_RESPONSES:
+                snap.responses[key] = cached
+        etag, body = cached
+
+        headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", f"public, max-age={self.max_age}".encode()),
+            (b"x-sync-version", str(snap.version).encode()),
+        ]
+        if etag in _if_none_match(scope):
+            return 304, headers, b""
+        return 200, headers, body
+
+
+def _if_none_match(scope: Scope) -> list[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"if-none-match":
+            return [v.strip().removeprefix("W/") for v in value.decode("latin-1").split(",")]
+    return []
+
+
+app = ReadAPI()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Any
+
+# Load test for the read API: a mix of leaderboard pages (following cursors), team and
+# rider details and calendar pages, a share of them revalidated with If-None-Match.
+#   in process (ASGI calls, no network):  python -m read_api.loadtest --season-year 2026
+#   against a server:                      python -m read_api.loadtest --url http://127.0.0.1:8080
+# Prints requests/sec, latency percentiles and the status mix.
+
+
+async def _asgi_get(app, path: str, query: str = "", headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    await app(scope, receive, send)
+    start = sent[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, sent[1]["body"]
+
+
+def make_client(app, url: str | None):
+    """
+    Returns get(path, query, headers) -> (status, headers, body), and a close coroutine.
+    """
+    if url is None:
+
+        async def get(path: str, query: str = "", headers: dict[str, str] | None = None):
+            return await _asgi_get(app, path, query, headers)
+
+        async def close() -> None:
+            return None
+
+        return get, close
+
+    import httpx
+
+    client = httpx.AsyncClient(base_url=url, timeout=30.0, limits=httpx.Limits(max_connections=200))
+
+    async def get(path: str, query: str = "", headers: dict[str, str] | None = None):
+        res = await client.get(f"{path}?{query}" if query else path, headers=headers)
+        return res.status_code, dict(res.headers), res.content
+
+    return get, client.aclose
+
+
+async def run(args: argparse.Namespace) -> None:
+    app = None
+    if args.url is None:
+        from .app import ReadAPI
+
+        app = ReadAPI(check_interval=args.check_interval)
+    get, close = make_client(app, args.url)
+    base = f"/seasons/{args.season_year}"
+
+    # Discover ids through the API itself (also warms the snapshot).
+    t0 = time.perf_counter()
+    status, _, body = await get(f"{base}/leaderboard", "limit=200")
+    if status != 200:
+        raise SystemExit(f"leaderboard returned {status}: {body[:200]!r}")
+    print(f"[load] first request (snapshot load): {time.perf_counter() - t0:.3f}s")
+    teams = [t["id"] for t in json.loads(body)["items"]]
+    rider_ids: list[str] = []
+    for tid in teams[:20]:
+        _, _, tb = await get(f"{base}/teams/{tid}")
+        rider_ids.extend(r["id"] for r in json.loads(tb)["riders"])
+    if not teams:
+        raise SystemExit("no teams in this season")
+
+    rng = random.Random(args.seed)
+    etags: dict[tuple[str, str], str] = {}
+    statuses: Counter[int] = Counter()
+    latencies: list[float] = []
+    cursors: list[str] = [""]
+
+    def pick() -> tuple[str, str]:
+        x = rng.random()
+        if x < 0.35:
+            cursor = rng.choice(cursors)
+            return f"{base}/leaderboard", f"limit=50&cursor={cursor}" if cursor else "limit=50"
+        if x < 0.65:
+            return f"{base}/teams/{rng.choice(teams)}", ""
+        if x < 0.85 and rider_ids:
+            return f"{base}/riders/{rng.choice(rider_ids)}", ""
+        return f"{base}/calendar", "limit=50"
+
+    async def worker(n: int) -> None:
+        for _ in range(n):
+            path, query = pick()
+            headers = {}
+            if (path, query) in etags and rng.random() < args.revalidate:
+                headers["If-None-Match"] = etags[(path, query)]
+            t = time.perf_counter()
+            status, res_headers, res_body = await get(path, query, headers)
+            latencies.append(time.perf_counter() - t)
+            statuses[status] += 1
+            if status == 200:
+                etags[(path, query)] = res_headers.get("etag", "")
+                if path.endswith("/leaderboard") and len(cursors) < 50:
+                    nxt = json.loads(res_body).get("nextCursor")
+                    if nxt and nxt not in cursors:
+                        cursors.append(nxt)
+
+    per_worker = max(1, args.requests // args.concurrency)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(args.concurrency)))
+    seconds = time.perf_counter() - t0
+    await close()
+
+    latencies.sort()
+    total = len(latencies)
+    print(
+        f"[load] requests={total} concurrency={args.concurrency} seconds={seconds:.2f} "
+        f"rps={total / seconds:,.0f} p50={statistics.median(latencies) * 1000:.2f}ms "
+        f"p95={latencies[int(total * 0.95) - 1] * 1000:.2f}ms "
+        f"status=" + ",".join(f"{k}:{v}" for k, v in sorted(statuses.items()))
+    )
+    if app is not None:
+        print(f"[load] snapshot reloads={app.cache.reloads}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season-year", type=int, default=2026)
+    ap.add_argument("--url", type=str, default=None, help="Base URL of a running server (default: in-process ASGI).")
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--revalidate", type=float, default=0.3, help="Share of repeat requests sent with If-None-Match.")
+    ap.add_argument("--check-interval", type=float, default=5.0)
+    ap.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(ap.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any
+
+from ingest.utils import select_in
+
+# In-memory snapshot of one season, built from the schema tables (not the read_models
+# rows, so every view is available, including rider detail and the calendar):
+#   teams (+ users), team_riders, riders, rider_prices, rider_points, races, race_results
+# Views are precomputed once per snapshot; list views are kept sorted by their cursor key
+# so a page is a bisect plus a slice.
+
+PAGE = 1000
+
+
+def _paged(query_fn) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    while True:
+        batch = query_fn().range(len(out), len(out) + PAGE - 1).execute().data or []
+        out.extend(batch)
+        if len(batch) < PAGE:
+            return out
+
+
+def read_sync_version(sb, season_year: int) -> int:
+    rows = sb.table("sync_state").select("version").eq("season_year", season_year).execute().data or []
+    return int(rows[0]["version"]) if rows else 0
+
+
+@dataclass
+class SeasonSnapshot:
+    season_year: int
+    version: int
+    leaderboard: list[dict[str, Any]] = field(default_factory=list)  # sorted by (-points, id)
+    leaderboard_keys: list[tuple[int, str]] = field(default_factory=list)
+    calendar: list[dict[str, Any]] = field(default_factory=list)  # sorted by (date, id)
+    calendar_keys: list[tuple[str, str]] = field(default_factory=list)
+    teams: dict[str, dict[str, Any]] = field(default_factory=dict)
+    riders: dict[str, dict[str, Any]] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+    # Rendered responses of this snapshot: key -> (etag, body). Dropped with the snapshot.
+    responses: dict[tuple[Any, ...], tuple[str, bytes]] = field(default_factory=dict)
+
+    def leaderboard_page(self, after: tuple[int, str] | None, limit: int) -> tuple[list[dict[str, Any]], tuple[int, str] | None]:
+        start = bisect_right(self.leaderboard_keys, after) if after is not None else 0
+        items = self.leaderboard[start : start + limit]
+        more = start + limit < len(self.leaderboard)
+        return items, (self.leaderboard_keys[start + limit - 1] if more and items else None)
+
+    def calendar_page(self, after: tuple[str, str] | None, limit: int) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+        start = bisect_right(self.calendar_keys, after) if after is not None else 0
+        items = self.calendar[start : start + limit]
+        more = start + limit < len(self.calendar)
+        return items, (self.calendar_keys[start + limit - 1] if more and items else None)
+
+
+def load_snapshot(sb, season_year: int, version: int) -> SeasonSnapshot:
+    """
+    Read the season's tables (a handful of paged queries) and build every view.
+    """
+    t0 = time.perf_counter()
+    teams = _paged(
+        lambda: sb.table("teams")
+        .select("id, user_id, team_name, points, total_cost, users(display_name)")
+        .eq("season_year", season_year)
+        .order("id")
+    )
+    team_ids = [t["id"] for t in teams]
+    roster_rows = select_in(sb, "team_riders", "team_id, rider_id, slot", "team_id", team_ids, size=30)
+    races = _paged(
+        lambda: sb.table("races")
+        .select("id, pcs_slug, name, race_date")
+        .gte("race_date", f"{season_year}-01-01")
+        .lte("race_date", f"{season_year}-12-31")
+        .order("id")
+    )
+    race_ids = [r["id"] for r in races]
+    results: list[dict[str, Any]] = []
+    if race_ids:
+        results = _paged(
+            lambda: sb.table("race_results")
+            .select("race_id, rider_id, rank, points_awarded")
+            .in_("race_id", race_ids)
+            .order("race_id")
+            .order("rider_id")
+        )
+    rider_ids = sorted({r["rider_id"] for r in roster_rows} | {r["rider_id"] for r in results})
+    riders = {r["id"]: r for r in select_in(sb, "riders", "id, pcs_slug, rider_name, team_name, nationality, active", "id", rider_ids)}
+    price_by = {
+        r["rider_id"]: int(r.get("price") or 0)
+        for r in select_in(sb, "rider_prices", "rider_id, price", "rider_id", rider_ids, season_year=season_year)
+    }
+    points_by = {
+        r["rider_id"]: int(r.get("points") or 0)
+        for r in select_in(sb, "rider_points", "rider_id, points", "rider_id", rider_ids, season_year=season_year)
+    }
+
+    snap = SeasonSnapshot(season_year, version)
+
+    def rider_summary(rid: str) -> dict[str, Any]:
+        r = riders.get(rid) or {}
+        return {
+            "id": rid,
+            "riderName": r.get("rider_name"),
+            "teamName": r.get("team_name"),
+            "nationality": r.get("nationality"),
+            "price": price_by.get(rid, 0),
+            "points": points_by.get(rid, 0),
+        }
+
+    roster_by_team: dict[str, list[dict[str, Any]]] = {}
+    owners_by_rider: dict[str, list[str]] = {}
+    for row in sorted(roster_rows, key=lambda r: int(r.get("slot") or 0)):
+        roster_by_team.setdefault(row["team_id"], []).append(row)
+        owners_by_rider.setdefault(row["rider_id"], []).append(row["team_id"])
+
+    ordered = sorted(teams, key=lambda t: (-int(t.get("points") or 0), t["id"]))
+    for rank, t in enumerate(ordered, start=1):
+        owner = (t.get("users") or {}).get("display_name")
+        points = int(t.get("points") or 0)
+        snap.leaderboard.append({"rank": rank, "id": t["id"], "teamName": t.get("team_name"), "ownerName": owner, "points": points})
+        snap.leaderboard_keys.append((-points, t["id"]))
+        snap.teams[t["id"]] = {
+            "id": t["id"],
+            "userId": t.get("user_id"),
+            "teamName": t.get("team_name"),
+            "ownerName": owner,
+            "rank": rank,
+            "points": points,
+            "totalPrice": int(t.get("total_cost") or 0),
+            "season": season_year,
+            "riders": [{"slot": row.get("slot"), **rider_summary(row["rider_id"])} for row in roster_by_team.get(t["id"], [])],
+        }
+
+    race_by_id = {r["id"]: r for r in races}
+    results_by_rider: dict[str, list[dict[str, Any]]] = {}
+    winner_by_race: dict[str, str] = {}
+    results_count: dict[str, int] = {}
+    for row in results:
+        race = race_by_id.get(row["race_id"]) or {}
+        results_count[row["race_id"]] = results_count.get(row["race_id"], 0) + 1
+        if int(row.get("rank") or 0) == 1:
+            winner_by_race[row["race_id"]] = row["rider_id"]
+        results_by_rider.setdefault(row["rider_id"], []).append(
+            {
+                "raceId": row["race_id"],
+                "raceName": race.get("name"),
+                "date": race.get("race_date"),
+                "rank": row.get("rank"),
+                "points": int(row.get("points_awarded") or 0),
+            }
+        )
+
+    for rid in rider_ids:
+        snap.riders[rid] = {
+            **rider_summary(rid),
+            "pcsSlug": (riders.get(rid) or {}).get("pcs_slug"),
+            "season": season_year,
+            "ownerCount": len(owners_by_rider.get(rid, [])),
+            "results": sorted(results_by_rider.get(rid, []), key=lambda x: (str(x["date"] or ""), x["raceId"])),
+        }
+
+    for r in sorted(races, key=lambda r: (str(r.get("race_date") or ""), r["id"])):
+        winner = winner_by_race.get(r["id"])
+        snap.calendar.append(
+            {
+                "id": r["id"],
+                "name": r.get("name"),
+                "date": r.get("race_date"),
+                "pcsSlug": r.get("pcs_slug"),
+                "results": results_count.get(r["id"], 0),
+                "winner": {"id": winner, "riderName": (riders.get(winner) or {}).get("rider_name")} if winner else None,
+            }
+        )
+        snap.calendar_keys.append((str(r.get("race_date") or ""), r["id"]))
+
+    snap.load_seconds = time.perf_counter() - t0
+    return snap
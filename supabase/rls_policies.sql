@@ -9,6 +9,14 @@ alter table public.races enable row level security;
 alter table public.race_results enable row level security;
 alter table public.seasons enable row level security;
 alter table public.access_codes enable row level security;
+alter table public.read_models enable row level security;
+alter table public.rider_ownership enable row level security;
+alter table public.points_history enable row level security;
+alter table public.sync_state enable row level security;
+-- job_leases: no policies, only the ingestion worker (service role) reads/writes it.
+alter table public.job_leases enable row level security;
+-- shard_runs: no policies either (ingestion worker only).
+alter table public.shard_runs enable row level security;
 
 -- USERS
 -- Users can see their own profile
@@ -62,6 +70,10 @@ create policy "Public read points" on public.rider_points for select using (true
 create policy "Public read races" on public.races for select using (true);
 create policy "Public read results" on public.race_results for select using (true);
 create policy "Public read seasons" on public.seasons for select using (true);
+create policy "Public read read models" on public.read_models for select using (true);
+create policy "Public read ownership" on public.rider_ownership for select using (true);
+create policy "Public read points history" on public.points_history for select using (true);
+create policy "Public read sync state" on public.sync_state for select using (true);
 
 
 -- ACCESS CODES
@@ -134,4 +134,168 @@ create table if not exists public.race_results (
 
 create index if not exists race_results_race_rank_idx on public.race_results(race_id, rank asc);
 
+-- Read models: denormalized JSON snapshots rebuilt by the ingestion worker at the
+-- end of each sync (leaderboard, latest race, one per team). Versioned by sync time.
+create table if not exists public.read_models (
+  season_year int not null,
+  model_key text not null,
+  version timestamptz not null,
+  payload jsonb not null,
+  primary key (season_year, model_key)
+);
+
+create index if not exists read_models_key_idx on public.read_models(model_key);
+
+-- A team write (from the app) drops the snapshots it made stale, the team's own and the
+-- season leaderboard, so readers fall back to live queries until the next sync republishes
+-- them. Security definer: app users cannot write read_models themselves.
+create or replace function public.drop_team_read_models()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_team_id uuid;
+  v_season int;
+begin
+  if tg_table_name = 'teams' then
+    v_team_id := coalesce(new.id, old.id);
+    v_season := coalesce(new.season_year, old.season_year);
+  else
+    v_team_id := coalesce(new.team_id, old.team_id);
+    select season_year into v_season from public.teams where id = v_team_id;
+  end if;
+  if v_season is null then
+    -- team_riders rows cascaded from a deleted team: the teams trigger already dropped
+    -- that season's leaderboard, only the team's own snapshot is left.
+    delete from public.read_models where model_key = 'team:' || v_team_id;
+  else
+    delete from public.read_models
+    where season_year = v_season and model_key in ('team:' || v_team_id, 'leaderboard');
+  end if;
+  return null;
+end;
+$$;
+
+create trigger teams_drop_read_models
+after insert or delete or update of team_name, total_cost, user_id on public.teams
+for each row execute function public.drop_team_read_models();
+
+create trigger team_riders_drop_read_models
+after insert or update or delete on public.team_riders
+for each row execute function public.drop_team_read_models();
 
+-- Rider ownership: rider -> teams inverted index over team_riders, per season.
+-- Rebuilt by the ingestion worker after team imports and on every sync.
+create table if not exists public.rider_ownership (
+  season_year int not null,
+  rider_id uuid not null references public.riders(id) on delete cascade,
+  team_ids uuid[] not null default '{}',
+  owner_count int not null default 0 check (owner_count >= 0),
+  owner_pct numeric(5,2) not null default 0,
+  updated_at timestamptz not null default now(),
+  primary key (season_year, rider_id)
+);
+
+create index if not exists rider_ownership_season_count_idx on public.rider_ownership(season_year, owner_count desc);
+
+create trigger rider_ownership_set_updated_at
+before update on public.rider_ownership
+for each row execute function public.set_updated_at();
+
+-- Points history: day-by-day evolution of rider_points and teams.points, delta-encoded.
+-- Each sync writes one row per entity whose points changed that day (delta vs the
+-- previous day). Checkpoint days (every few days) hold the full value of every entity
+-- with points instead (a delta from 0); the value on any day is the sum of the rows from
+-- the latest checkpoint up to that day. Written by the ingestion worker.
+create table if not exists public.points_history (
+  season_year int not null,
+  kind text not null check (kind in ('rider', 'team')),
+  entity_id uuid not null,
+  day date not null,
+  delta int not null,
+  checkpoint boolean not null default false,
+  primary key (season_year, kind, entity_id, day)
+);
+
+create index if not exists points_history_day_idx on public.points_history(season_year, kind, day);
+
+-- Sync version per season, bumped by the ingestion worker each time it publishes new
+-- data. Readers (read_api) compare it to invalidate their caches.
+create table if not exists public.sync_state (
+  season_year int primary key,
+  version bigint not null default 0,
+  updated_at timestamptz not null default now()
+);
+
+create or replace function public.bump_sync_version(p_season_year int)
+returns bigint
+language sql
+as $$
+  insert into public.sync_state (season_year, version) values (p_season_year, 1)
+  on conflict (season_year) do update set version = public.sync_state.version + 1, updated_at = now()
+  returning version;
+$$;
+
+-- Run lease for the ingestion jobs: at most one holder per lease name. A holder renews
+-- (heartbeats) before `expires_at`; a crashed holder's lease simply expires and the next
+-- run takes it over. Written by the ingestion worker through the functions below.
+create table if not exists public.job_leases (
+  name text primary key,
+  holder text not null,
+  job text,
+  acquired_at timestamptz not null default now(),
+  heartbeat_at timestamptz not null default now(),
+  expires_at timestamptz not null
+);
+
+-- Take `p_name` for `p_holder` if it is free, expired or already held by `p_holder`.
+-- Returns the current lease row either way (compare its holder to know who won).
+create or replace function public.acquire_job_lease(p_name text, p_holder text, p_job text, p_ttl_seconds int)
+returns setof public.job_leases
+language sql
+as $$
+  insert into public.job_leases as l (name, holder, job, acquired_at, heartbeat_at, expires_at)
+  values (p_name, p_holder, p_job, now(), now(), now() + make_interval(secs => p_ttl_seconds))
+  on conflict (name) do update
+    set holder = excluded.holder,
+        job = excluded.job,
+        acquired_at = case when l.holder = excluded.holder then l.acquired_at else now() end,
+        heartbeat_at = now(),
+        expires_at = excluded.expires_at
+    where l.holder = excluded.holder or l.expires_at < now();
+  select * from public.job_leases where name = p_name;
+$$;
+
+-- Extend a lease still held by `p_holder`; false when it expired and was taken over.
+create or replace function public.renew_job_lease(p_name text, p_holder text, p_ttl_seconds int)
+returns boolean
+language sql
+as $$
+  with renewed as (
+    update public.job_leases
+    set heartbeat_at = now(), expires_at = now() + make_interval(secs => p_ttl_seconds)
+    where name = p_name and holder = p_holder
+    returning 1
+  )
+  select exists (select 1 from renewed);
+$$;
+
+create or replace function public.release_job_lease(p_name text, p_holder text)
+returns void
+language sql
+as $$
+  delete from public.job_leases where name = p_name and holder = p_holder;
+$$;
+
+-- Sharded daily_sync runs (`--shard i/n`): one row per shard that finished writing its
+-- races, keyed by run day. `--finalize` requires all n shards of the day before recomputing.
+create table if not exists public.shard_runs (
+  season_year int not null,
+  run_day date not null,
+  shards int not null check (shards >= 1),
+  shard int not null check (shard >= 1 and shard <= shards),
+  finished_at timestamptz not null default now(),
+  primary key (season_year, run_day, shards, shard)
+);